@@ -0,0 +1,260 @@
+"""
+Performance benchmarks for the analysis kernels, sweeps and figure rendering
+Results are saved as JSON; compare flags regressions against a baseline
+
+    python benchmarks.py run --output bench.json
+    python benchmarks.py compare bench_baseline.json bench.json --threshold 1.5
+
+bench_baseline.json is the committed reference run; its 'machine' entry
+records where it was taken. Timings only compare on similar hardware, so on
+another machine first record a local baseline from a clean checkout
+(python benchmarks.py run --output my_baseline.json) and compare against
+that. Refresh the committed file with a full run whenever an intended
+change moves the numbers.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIZES = (1, 10**3, 10**6)
+# The scalar analyze_frame is a Python call per point; larger sizes take minutes
+SCALAR_MAX_SIZE = 10**3
+
+def _time(func, min_time=0.2, repeat=5):
+    """Best seconds per call, looping until one repeat takes at least min_time"""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return best
+
+def _frame_inputs(n, rng):
+    return {
+        'frame_type': rng.choice(np.array(['X-frame', 'H-frame']), n),
+        'arm_length': rng.uniform(0.2, 0.6, n),
+        'width': rng.uniform(0.05, 0.25, n),
+        'motor_force': rng.uniform(5, 60, n),
+    }
+
+def bench_analyze_frame(n, rng):
+    import frame_design as fd
+    p = _frame_inputs(n, rng)
+    rows = list(zip(p['frame_type'], p['arm_length'], p['width'], p['motor_force']))
+    def run():
+        for frame_type, length, width, force in rows:
+            fd.analyze_frame(frame_type, length, width, force, fd.youngs_modulus, fd.moment_of_inertia)
+    return run
+
+def bench_analyze_frame_batch(n, rng):
+    import frame_design as fd
+    p = _frame_inputs(n, rng)
+    return lambda: fd.analyze_frame_batch(p['frame_type'], p['arm_length'], p['width'],
+                                          p['motor_force'], fd.youngs_modulus, fd.moment_of_inertia)
+
+def bench_axial(n, rng):
+    import material_properties as mp
+    force = rng.uniform(100, 1000, n)
+    width = rng.uniform(0.03, 0.10, n)
+    thickness = rng.uniform(0.003, 0.010, n)
+    E = mp.youngs_moduli[rng.integers(0, len(mp.youngs_moduli), n)]
+    def run():
+        stress = mp.axial_stress(force, width, thickness)
+        mp.axial_deformation(stress, E, mp.length_base)
+    return run
+
+def bench_frame_sweep(n, rng):
+    import frame_design as fd
+    from sweep import parameter_grid, run_sweep
+    side = max(1, int(round(n ** (1 / 3))))
+    grid = parameter_grid(arm_length=np.linspace(0.2, 0.6, side),
+                          width=np.linspace(0.05, 0.25, side),
+                          motor_force=np.linspace(5, 60, max(1, n // side**2)),
+                          frame_type=['X-frame'])
+    return lambda: run_sweep(fd.evaluate_frame_designs, grid, workers=1)
+
+def bench_plot_frame(n, rng):
+    """Render an n-element frame (arms refined into n/4 elements) to an Agg canvas"""
+    import frame_design as fd
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    nodes, deformed, _, _, elements, _ = fd.analyze_frame_fem(
+        'X-frame', fd.arm_length_base, fd.width_base, fd.motor_force_base,
+        fd.youngs_modulus, fd.moment_of_inertia, elements_per_arm=max(1, n // 4))
+    def run():
+        fig = Figure(figsize=(10, 8))
+        FigureCanvasAgg(fig)
+        fd.plot_frame(nodes, deformed, 'benchmark', fig, elements)
+        fig.canvas.draw()
+    return run
+
+def bench_vibration(n, rng):
+    """n frames, each replaying its own 1000-step thrust history"""
+    from vibration import simulate_frames
+    p = _frame_inputs(n, rng)
+    thrust = p['motor_force'][:, None] * (1 + 0.2 * rng.standard_normal((n, 1000)))
+    return lambda: simulate_frames(p['frame_type'], p['arm_length'], p['width'], thrust, 1e-3)
+
+def bench_fatigue(n, rng):
+    """Rainflow and damage over an n-sample, four-motor thrust log in 10 chunks"""
+    from fatigue import analyze_log
+    thrust = 20 + 5 * rng.standard_normal((n, 4))
+    chunks = np.array_split(thrust, min(10, n))
+    return lambda: analyze_log(chunks)
+
+def bench_screening(n, rng):
+    """Mass ranking over 3 materials x a tube catalogue x n geometries x 12 forces"""
+    from screening import screen
+    from sections import tube_catalogue
+    catalogue = tube_catalogue(np.linspace(0.005, 0.04, 200), np.linspace(0.0003, 0.006, 100))
+    side = max(1, int(np.sqrt(n / 2)))
+    return lambda: screen(catalogue, arm_lengths=np.linspace(0.1, 0.8, side),
+                          widths=np.linspace(0.05, 0.25, side), motor_forces=np.linspace(5, 60, 12), top=20)
+
+def bench_animate_frame(n, rng):
+    """Export 10 blitted GIF frames of an n-element frame over a force sweep"""
+    import frame_design as fd
+    from frame_render import export_animation
+    nodes, deformed, _, _, elements, _ = fd.analyze_frame_fem(
+        'X-frame', fd.arm_length_base, fd.width_base, np.linspace(0, 60, 10),
+        fd.youngs_modulus, fd.moment_of_inertia, elements_per_arm=max(1, n // 4))
+    path = os.path.join(tempfile.gettempdir(), 'bench_animation.gif')
+    return lambda: export_animation(path, nodes, elements, deformed, scale=20)
+
+def bench_layouts(n, rng):
+    """Space-frame solve of n hex frames with random arm lengths and droop"""
+    import frame_design as fd
+    arm_length = rng.uniform(0.2, 0.6, (n, 1))
+    dihedral = rng.uniform(-10, 0, (n, 1))
+    return lambda: fd.analyze_layout('hex', arm_length, fd.motor_force_base, fd.youngs_modulus,
+                                     fd.moment_of_inertia, dihedral=dihedral, motor_torque=0.3)
+
+def bench_nonlinear_sweep(n, rng):
+    """Warm-started Newton sweep of a plastic arm over n tip forces"""
+    import frame_design as fd
+    import nonlinear
+    from materials import MATERIALS
+    from sections import section_properties
+    section = section_properties('rectangular_tube', width=0.02, height=0.01, thickness=0.002)
+    E = MATERIALS.column('youngs_modulus')[MATERIALS.rows(['Plastic'])][0]
+    arm = nonlinear.cantilever(fd.arm_length_base * np.sqrt(2), E, section.area, section.I)
+    pattern = nonlinear.tip_load(arm, [0, 1])
+    return lambda: arm.sweep(pattern, np.linspace(0, 60, n + 1)[1:])
+
+# name -> (factory, sizes)
+KERNELS = {
+    'analyze_frame': (bench_analyze_frame, tuple(s for s in SIZES if s <= SCALAR_MAX_SIZE)),
+    'analyze_frame_batch': (bench_analyze_frame_batch, SIZES),
+    'axial_stress_strain': (bench_axial, SIZES),
+    'frame_sweep': (bench_frame_sweep, SIZES),
+    'plot_frame': (bench_plot_frame, (4, 400, 10**4)),
+    'animate_frame': (bench_animate_frame, (4, 10**4)),
+    # (batch, steps) thrust histories: 10^6 frames would need 8 GB of input
+    'vibration': (bench_vibration, (1, 10**3, 10**4)),
+    'fatigue': (bench_fatigue, (10**3, 10**6)),
+    'screening': (bench_screening, (10**3, 10**6)),
+    'layouts': (bench_layouts, (1, 10**3, 10**5)),
+    'nonlinear_sweep': (bench_nonlinear_sweep, (10, 100)),
+}
+
+SCRIPTS = ('frame_design.py', 'material_properties.py')
+
+def bench_script(script, repeat=3):
+    """Wall time of a headless end-to-end run, best of repeat"""
+    best = np.inf
+    with tempfile.TemporaryDirectory() as plot_dir:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(HERE, script), '--headless', '--no-cache',
+                            '--plot-dir', plot_dir], check=True, stdout=subprocess.DEVNULL, cwd=HERE)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmarks(kernels=None, scripts=True, max_size=None, seed=0):
+    """Time every kernel at every size; returns the JSON-ready result dict"""
+    rng = np.random.default_rng(seed)
+    results = {}
+    for name, (factory, sizes) in KERNELS.items():
+        if kernels and name not in kernels:
+            continue
+        for n in sizes:
+            if max_size and n > max_size:
+                continue
+            seconds = _time(factory(n, rng))
+            results[f'{name}[{n}]'] = {'seconds': seconds, 'points': n,
+                                       'points_per_second': n / seconds}
+            print(f'{name}[{n}]: {seconds*1e3:.4f} ms ({n/seconds:.3g} points/s)')
+    if scripts:
+        for script in SCRIPTS:
+            seconds = bench_script(script)
+            results[f'script:{script}'] = {'seconds': seconds}
+            print(f'script:{script}: {seconds:.3f} s')
+    return {
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                    'platform': platform.platform(), 'cpus': os.cpu_count()},
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+def compare(baseline, current, threshold=1.5):
+    """Return (name, baseline s, current s, ratio) rows and the regressed subset"""
+    rows = []
+    for name, entry in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        before = baseline['results'][name]['seconds']
+        rows.append((name, before, entry['seconds'], entry['seconds'] / before))
+    regressions = [row for row in rows if row[3] > threshold]
+    return rows, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmarks and save JSON')
+    run.add_argument('--output', default='bench.json')
+    run.add_argument('--kernel', action='append', help='only run these kernels (repeatable)')
+    run.add_argument('--max-size', type=int, help='skip sizes above this many points')
+    run.add_argument('--no-scripts', action='store_true', help='skip end-to-end script runs')
+
+    cmp = commands.add_parser('compare', help='flag regressions against a baseline')
+    cmp.add_argument('baseline')
+    cmp.add_argument('current')
+    cmp.add_argument('--threshold', type=float, default=1.5,
+                     help='slowdown ratio counted as a regression')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        sys.path.insert(0, HERE)
+        report = run_benchmarks(args.kernel, not args.no_scripts, args.max_size)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Saved {args.output}')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows, regressions = compare(baseline, current, args.threshold)
+    for name, before, after, ratio in rows:
+        flag = '  REGRESSION' if ratio > args.threshold else ''
+        print(f'{name:40s} {before*1e3:12.4f} ms -> {after*1e3:12.4f} ms  x{ratio:.2f}{flag}')
+    if regressions:
+        print(f'{len(regressions)} regression(s) above x{args.threshold:.2f}')
+        return 1
+    print('No regressions')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Streaming fatigue analysis of frame arms from flight thrust logs
+Logs are read a chunk at a time, thrust becomes arm root bending stress
+through σ = M*c/I, and rainflow cycles are counted incrementally, carrying
+only the unclosed reversals between chunks. Damage per arm accumulates by
+Miner's rule on a Goodman-corrected Basquin S-N curve
+"""
+
+import itertools
+import os
+
+import numpy as np
+
+import frame_design
+from instrument import profiled
+
+# Basquin exponents b in σa = σf * (2N)^b, with σf taken as the tensile strength
+FATIGUE_EXPONENTS = {
+    'Carbon Fiber': -0.07,
+    'Aluminum': -0.11,
+    'Plastic': -0.10,
+}
+
+def cycles_to_failure(amplitude, mean, strength, exponent):
+    """Cycles to failure at a stress amplitude and mean (Basquin with Goodman)"""
+    # Compressive means are not credited; a mean at or above the strength fails at once
+    margin = 1 - np.maximum(mean, 0) / strength
+    equivalent = np.where(margin > 0, amplitude / np.where(margin > 0, margin, 1), np.inf)
+    with np.errstate(divide='ignore'):
+        return 0.5 * (equivalent / strength) ** (1 / exponent)
+
+def reversals(series):
+    """Turning points of a series, keeping its first and last samples"""
+    series = np.asarray(series, dtype=float)
+    if len(series) < 3:
+        return series
+    # Flat stretches carry no reversal; drop repeated values first
+    series = series[np.concatenate([[True], np.diff(series) != 0])]
+    if len(series) < 3:
+        return series
+    slope = np.sign(np.diff(series))
+    turning = np.concatenate([[True], slope[1:] != slope[:-1], [True]])
+    return series[turning]
+
+def _alternate(candidates):
+    """Drop every second candidate in runs of adjacent ones so extracted pairs do not overlap"""
+    index = np.flatnonzero(candidates)
+    if len(index) == 0:
+        return index
+    run_start = np.concatenate([[True], np.diff(index) != 1])
+    start_position = np.maximum.accumulate(np.where(run_start, np.arange(len(index)), 0))
+    return index[(np.arange(len(index)) - start_position) % 2 == 0]
+
+def extract_cycles(points):
+    """Closed rainflow cycles of a reversal sequence (four-point method)
+
+    A pair of neighbouring reversals closes a cycle when its range is no
+    larger than the ranges on either side. Every such pair in the sequence
+    is removed in one vectorized pass, repeated until none is left. Returns
+    (ranges, means, residue); the residue holds the unclosed reversals.
+    """
+    points = np.asarray(points, dtype=float)
+    ranges, means = [], []
+    while len(points) >= 4:
+        r = np.abs(np.diff(points))
+        inner = r[1:-1]
+        pairs = _alternate((inner <= r[:-2]) & (inner <= r[2:])) + 1
+        if len(pairs) == 0:
+            break
+        ranges.append(r[pairs])
+        means.append((points[pairs] + points[pairs + 1]) / 2)
+        keep = np.ones(len(points), dtype=bool)
+        keep[pairs] = False
+        keep[pairs + 1] = False
+        points = points[keep]
+    if ranges:
+        return np.concatenate(ranges), np.concatenate(means), points
+    return np.zeros(0), np.zeros(0), points
+
+def residue_cycles(residue):
+    """Half cycles left in a residue at the end of a log"""
+    residue = np.asarray(residue, dtype=float)
+    return np.abs(np.diff(residue)), (residue[1:] + residue[:-1]) / 2
+
+class FatigueAccumulator:
+    """Single-pass rainflow and Miner's-rule damage for every arm of a frame
+
+    Feed thrust chunks shaped (samples, arms) to update(); only the unclosed
+    reversals of each arm are kept between chunks, so memory does not grow
+    with the log length. Stress at the arm root is bending_stress of the
+    thrust on the actual arm length, as in Question 2.
+    """
+
+    def __init__(self, frame_type='X-frame', arm_length=frame_design.arm_length_base,
+                 width=frame_design.width_base, outer_diameter=frame_design.beam_diameter,
+                 I=frame_design.moment_of_inertia, strength=frame_design.yield_strength_carbon,
+                 exponent=FATIGUE_EXPONENTS[frame_design.frame_material], sample_rate=None):
+        _, _, _, arm_lengths = frame_design.analyze_frame_batch(frame_type, arm_length, width, 0.0, 1.0, 1.0)
+        self.arm_length = float(arm_lengths[0])
+        self.outer_diameter = outer_diameter
+        self.I = I
+        self.strength = strength
+        self.exponent = exponent
+        self.sample_rate = sample_rate
+        self.samples = 0
+        self._residues = None
+        self.damage = None
+        self.cycles = None
+        self.max_range = None
+        self.max_stress = None
+
+    def stress(self, thrust):
+        return frame_design.bending_stress(thrust, self.arm_length, self.outer_diameter, self.I)
+
+    def _damage(self, ranges, means, weight=1.0):
+        return weight * np.sum(1 / cycles_to_failure(ranges / 2, means, self.strength, self.exponent))
+
+    @profiled('fatigue.update')
+    def update(self, thrust):
+        thrust = np.asarray(thrust, dtype=float)
+        thrust = thrust[:, None] if thrust.ndim == 1 else thrust
+        arms = thrust.shape[1]
+        if self._residues is None:
+            self._residues = [np.zeros(0)] * arms
+            self.damage = np.zeros(arms)
+            self.cycles = np.zeros(arms, dtype=np.int64)
+            self.max_range = np.zeros(arms)
+            self.max_stress = np.full(arms, -np.inf)
+        elif arms != len(self._residues):
+            raise ValueError(f'Chunk has {arms} arms, expected {len(self._residues)}')
+
+        stress = self.stress(thrust)
+        np.maximum(self.max_stress, stress.max(axis=0, initial=-np.inf), out=self.max_stress)
+        for arm in range(arms):
+            points = reversals(np.concatenate([self._residues[arm], stress[:, arm]]))
+            ranges, means, self._residues[arm] = extract_cycles(points)
+            if len(ranges):
+                self.damage[arm] += self._damage(ranges, means)
+                self.cycles[arm] += len(ranges)
+                self.max_range[arm] = max(self.max_range[arm], ranges.max())
+        self.samples += len(thrust)
+
+    def result(self):
+        """Damage per arm including the residue as half cycles
+
+        Returns a dict of per-arm arrays ('damage', 'cycles', 'half_cycles',
+        'max_stress_range', 'max_stress') plus 'samples' and, with a
+        sample rate, 'hours' of log and 'life_hours' until damage reaches 1.
+        """
+        if self._residues is None:
+            raise ValueError('No thrust data has been accumulated')
+        damage = self.damage.copy()
+        half_cycles = np.zeros(len(damage), dtype=np.int64)
+        max_range = self.max_range.copy()
+        for arm, residue in enumerate(self._residues):
+            ranges, means = residue_cycles(residue)
+            damage[arm] += self._damage(ranges, means, 0.5)
+            half_cycles[arm] = len(ranges)
+            if len(ranges):
+                max_range[arm] = max(max_range[arm], ranges.max())
+        result = {'damage': damage, 'cycles': self.cycles.copy(), 'half_cycles': half_cycles,
+                  'max_stress_range': max_range, 'max_stress': self.max_stress.copy(),
+                  'samples': self.samples}
+        if self.sample_rate:
+            hours = self.samples / self.sample_rate / 3600
+            result['hours'] = hours
+            with np.errstate(divide='ignore'):
+                result['life_hours'] = hours / damage
+        return result
+
+def iter_thrust_log(path, chunk_rows=1_000_000, columns=None, delimiter=','):
+    """Yield (rows, motors) thrust chunks from a .npy or delimited text log
+
+    .npy logs are memory-mapped and sliced. Text logs may start with a
+    header line; columns picks thrust columns by index or header name and
+    defaults to every column not named 'time'/'t'.
+    """
+    if os.path.splitext(path)[1] == '.npy':
+        data = np.load(path, mmap_mode='r')
+        data = data[:, None] if data.ndim == 1 else data
+        selected = slice(None) if columns is None else list(columns)
+        for start in range(0, len(data), chunk_rows):
+            yield np.array(data[start:start + chunk_rows, selected], dtype=float)
+        return
+
+    with open(path) as f:
+        first = f.readline()
+        fields = [field.strip() for field in first.split(delimiter)]
+        try:
+            [float(field) for field in fields]
+        except ValueError:
+            header, pending = fields, []
+        else:
+            header, pending = None, [first]
+        if columns is None:
+            selected = [i for i, name in enumerate(header or fields)
+                        if header is None or name.lower() not in ('time', 't')]
+        else:
+            selected = [header.index(c) if isinstance(c, str) else c for c in columns]
+        lines = itertools.chain(pending, f)
+        while True:
+            block = list(itertools.islice(lines, chunk_rows))
+            if not block:
+                return
+            yield np.loadtxt(block, delimiter=delimiter, usecols=selected, ndmin=2)
+
+@profiled()
+def analyze_log(source, chunk_rows=1_000_000, columns=None, **frame):
+    """Fatigue damage of each arm over a whole thrust log in one pass
+
+    source is a log path (see iter_thrust_log) or any iterable of thrust
+    chunks; frame keyword arguments configure the FatigueAccumulator.
+    """
+    accumulator = FatigueAccumulator(**frame)
+    chunks = iter_thrust_log(source, chunk_rows, columns) if isinstance(source, (str, os.PathLike)) else source
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.result()
@@ -3,8 +3,24 @@ Enhanced Python Script for Frame Design and Simulation
 This script answers all analysis questions systematically
 """
 
+import argparse
+import os
+
 import numpy as np
-import matplotlib.pyplot as plt
+
+import frame_fem
+import frame_layouts
+import instrument
+from instrument import profiled, span
+from materials import MATERIALS
+import nonlinear
+from plotting import FigureExporter
+from result_cache import ResultCache
+from sections import section_properties
+import uncertainty
+
+# Figures go to the matching Assets folder when run with --headless
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Assets', 'Frame Design')
 
 # Base Configuration
 arm_length_base = 0.4  # meters
@@ -12,14 +28,49 @@ width_base = 0.1  # meters (for H-frame)
 motor_force_base = 20  # N
 
 # Material properties (assuming Carbon Fiber for structural analysis)
-youngs_modulus = 70e9  # Pa
+frame_material = 'Carbon Fiber'
+youngs_modulus = MATERIALS[frame_material]['youngs_modulus']  # Pa
+yield_strength_carbon = MATERIALS[frame_material]['tensile_strength']  # Pa
 beam_thickness = 0.003  # m (3mm tube thickness)
 beam_diameter = 0.015  # m (15mm outer diameter)
-moment_of_inertia = np.pi * (beam_diameter**4 - (beam_diameter - 2*beam_thickness)**4) / 64
-
+beam_section = section_properties('circular_tube', diameter=beam_diameter, thickness=beam_thickness)
+moment_of_inertia = beam_section.I
+cross_section_area = beam_section.area
+poisson_ratio = 0.3  # for the torsional stiffness G*J of the tube
+
+# Scatter for the Monte Carlo mode: coefficients of variation for the layup
+# properties and thrust, standard deviations (m) for manufacturing tolerances
+carbon_modulus_cov = 0.10
+carbon_strength_cov = 0.15
+motor_force_cov = 0.10
+arm_length_tolerance = 0.001
+tube_diameter_tolerance = 0.0001
+tube_thickness_tolerance = 0.0002
+
+# Nonlinear check: elements per arm and the droop whose thrust compresses the arms
+nonlinear_elements = 16
+arm_droop_check = 10  # degrees
+
+def tip_deflection(force, length, E, I):
+    """Cantilever tip deflection δ = (F*L^3)/(3*E*I)
+
+    The cube is written as products, which round identically for scalars and
+    arrays, so analyze_frame and analyze_frame_batch agree bit for bit.
+    """
+    return (force * (length * length * length)) / (3 * E * I)
+
+@profiled()
 def analyze_frame(frame_type, arm_length, width, motor_force, E, I):
-    """Calculate frame response and deformation"""
-    
+    """Calculate frame response and deformation
+
+    frame_type is 'X-frame', 'H-frame' or a generated layout (a
+    frame_layouts name such as 'hex' or 'Y6', an arm count or a
+    FrameLayout), which is analyzed as a 3D space frame by analyze_layout
+    with arm_length along each arm; width only applies to H-frames.
+    """
+    if not (isinstance(frame_type, str) and frame_type in ('X-frame', 'H-frame')):
+        return analyze_layout(frame_type, arm_length, motor_force, E, I)[:4]
+
     # Define node positions
     if frame_type == 'X-frame':
         nodes = np.array([
@@ -44,7 +95,7 @@ def analyze_frame(frame_type, arm_length, width, motor_force, E, I):
         actual_arm_length = arm_length
     
     # Calculate cantilever beam deflection: δ = (F*L^3)/(3*E*I)
-    deflection_per_arm = (motor_force * actual_arm_length**3) / (3 * E * I)
+    deflection_per_arm = tip_deflection(motor_force, actual_arm_length, E, I)
     
     # Store arm lengths for each motor
     arm_lengths = actual_arm_length * np.ones(4)
@@ -59,279 +110,567 @@ def analyze_frame(frame_type, arm_length, width, motor_force, E, I):
     
     return nodes, deformed_nodes, max_displacement, arm_lengths
 
-def plot_frame(nodes, deformed_nodes, title_text):
-    """Plot original and deformed frame"""
-    element_connectivity = np.array([[0, 1], [0, 2], [0, 3], [0, 4]])
-    
-    plt.figure(figsize=(10, 8))
-    
-    # Plot original frame
-    for i in range(len(element_connectivity)):
-        conn = element_connectivity[i]
-        plt.plot([nodes[conn[0], 0], nodes[conn[1], 0]], 
-                [nodes[conn[0], 1], nodes[conn[1], 1]], 
-                'b-', linewidth=3, label='Original Frame' if i == 0 else '')
-    plt.plot(nodes[:, 0], nodes[:, 1], 'ro', markersize=10, 
-            markerfacecolor='r', label='Original Nodes')
-    
-    # Plot deformed frame
-    for i in range(len(element_connectivity)):
-        conn = element_connectivity[i]
-        plt.plot([deformed_nodes[conn[0], 0], deformed_nodes[conn[1], 0]], 
-                [deformed_nodes[conn[0], 1], deformed_nodes[conn[1], 1]], 
-                'r--', linewidth=2, label='Deformed Frame' if i == 0 else '')
-    plt.plot(deformed_nodes[:, 0], deformed_nodes[:, 1], 'bs', markersize=8, 
-            markerfacecolor='b', label='Deformed Nodes')
+# Unit node layout shared by both frame types: centre hub plus motors 1-4
+NODE_SIGNS = np.array([
+    [0, 0],
+    [1, 1],
+    [-1, 1],
+    [-1, -1],
+    [1, -1]
+])
+
+@profiled()
+def analyze_frame_batch(frame_type, arm_length, width, motor_force, E, I):
+    """Vectorized analyze_frame over arrays of design points.
+
+    Numeric arguments broadcast against each other; frame_type is either a
+    single 'X-frame'/'H-frame' string or an array of them with the same
+    broadcast shape. Returns nodes (..., 5, 2), deformed nodes (..., 5, 2),
+    max displacement (...) and arm lengths (..., 4), matching analyze_frame
+    point by point exactly.
+    """
+    frame_type, arm_length, width, motor_force, E, I = np.broadcast_arrays(
+        np.asarray(frame_type), arm_length, width, motor_force, E, I
+    )
+    is_x = frame_type == 'X-frame'
+    if not np.all(is_x | (frame_type == 'H-frame')):
+        raise ValueError(f'Unknown frame type in {np.unique(frame_type)}')
+
+    arm_length = arm_length.astype(float)
+    # X-frame motors sit on the diagonals, H-frame motors are offset by the width
+    half_x = np.where(is_x, arm_length, width)
+    half_y = arm_length
+    nodes = NODE_SIGNS * np.stack([half_x, half_y], axis=-1)[..., None, :]
+    actual_arm_length = np.where(is_x, np.sqrt(2) * arm_length, arm_length)
+
+    # Cantilever beam deflection: δ = (F*L^3)/(3*E*I)
+    deflection_per_arm = tip_deflection(motor_force, actual_arm_length, E, I)
+
+    arm_lengths = np.repeat(actual_arm_length[..., None], 4, axis=-1)
+
+    # Motors 1-4 deflect downward in Y, the hub stays put
+    deformed_nodes = nodes.copy()
+    deformed_nodes[..., 1:, 1] -= deflection_per_arm[..., None]
+
+    return nodes, deformed_nodes, deflection_per_arm, arm_lengths
+
+# Hub (node 0) joined to each of the four motors
+ELEMENT_CONNECTIVITY = np.array([[0, 1], [0, 2], [0, 3], [0, 4]])
+
+def frame_nodes(frame_type, arm_length, width):
+    """Node coordinates (5, 2) of an undeformed X-frame or H-frame"""
+    if frame_type == 'X-frame':
+        half_x = arm_length
+    elif frame_type == 'H-frame':
+        half_x = width
+    else:
+        raise ValueError(f'Unknown frame type {frame_type!r}')
+    return NODE_SIGNS * np.array([half_x, arm_length], dtype=float)
+
+@profiled()
+def analyze_frame_fem(frame_type, arm_length, width, motor_force, E, I,
+                      G=None, J=None, elements_per_arm=1):
+    """Finite-element version of analyze_frame
+
+    The hub is clamped and each motor node carries motor_force out of the
+    frame plane. Arms can be refined into several elements; the extra nodes
+    are appended after the hub and motors. G defaults to E/(2(1+ν)) and J to
+    the polar moment 2I of a circular tube. An array of motor forces is
+    solved as a batch of load cases against one cached factorization.
+    Returns nodes, deformed nodes (deflection drawn along -Y as in
+    analyze_frame), max displacement, arm lengths, plus elements and the
+    full [w, θx, θy] nodal solution; the load-dependent outputs gain the
+    leading shape of motor_force.
+    """
+    if G is None:
+        G = E / (2 * (1 + poisson_ratio))
+    if J is None:
+        J = 2 * I
+
+    nodes, elements = frame_fem.refine_mesh(frame_nodes(frame_type, arm_length, width),
+                                            ELEMENT_CONNECTIVITY, elements_per_arm)
+    motor_force = np.asarray(motor_force, dtype=float)
+    loads = np.zeros(motor_force.shape + (len(nodes),))
+    loads[..., 1:5] = motor_force[..., None]
+    displacements = frame_fem.solve_frame(nodes, elements, loads, E, I, G, J, fixed_nodes=[0], per_dof=False)
+
+    deformed_nodes = np.broadcast_to(nodes, displacements.shape[:-1] + (2,)).copy()
+    deformed_nodes[..., 1] -= displacements[..., 0]
+    max_displacement = np.abs(displacements[..., 0]).max(axis=-1)
+    arm_lengths = np.hypot(nodes[1:5, 0], nodes[1:5, 1])
+
+    return nodes, deformed_nodes, max_displacement, arm_lengths, elements, displacements
+
+@profiled()
+def analyze_layout(layout, arm_length, motor_force, E, I, G=None, J=None, area=cross_section_area,
+                   **kwargs):
+    """Space-frame analysis of a generated multirotor layout with the base tube
+
+    Wraps frame_layouts.analyze_layouts with G defaulting to E/(2(1+ν)), J
+    to the polar moment 2I of a circular tube and the tube's cross-section
+    area; kwargs (dihedral, motor_torque, coaxial_spacing, elements_per_arm)
+    pass through. Inputs broadcast over batches of frames and load cases.
+    Returns nodes, deformed nodes, max displacement, arm lengths, elements
+    and the full nodal solution, all in 3D.
+    """
+    if G is None:
+        G = np.asarray(E) / (2 * (1 + poisson_ratio))
+    if J is None:
+        J = 2 * np.asarray(I)
+    return frame_layouts.analyze_layouts(layout, arm_length, motor_force, E, I, area, G, J, **kwargs)
+
+def bending_stress(force, arm_length, outer_diameter, I):
+    """Root bending stress of a cantilever arm: σ = M*c/I with M = F*L, c = outer radius"""
+    bending_moment = force * arm_length
+    return bending_moment * (outer_diameter/2) / I
+
+def safety_factor(stress, yield_strength):
+    """Ratio of yield strength to working stress"""
+    return yield_strength / stress
+
+@profiled()
+def evaluate_frame_designs(params):
+    """Sweep kernel: frame response for a chunk of design points
+
+    params holds equal-length arrays 'frame_type', 'arm_length', 'width' and
+    'motor_force'; 'youngs_modulus', 'moment_of_inertia', 'beam_diameter'
+    and 'yield_strength' default to the base tube. Suitable for
+    sweep.run_sweep and uncertainty.monte_carlo.
+    """
+    E = params.get('youngs_modulus', youngs_modulus)
+    I = params.get('moment_of_inertia', moment_of_inertia)
+    _, _, max_displacement, arm_lengths = analyze_frame_batch(
+        params['frame_type'], params['arm_length'], params['width'], params['motor_force'], E, I
+    )
+    stress = bending_stress(params['motor_force'], arm_lengths[..., 0],
+                            params.get('beam_diameter', beam_diameter), I)
+    return {
+        'max_displacement': max_displacement,
+        'arm_length_actual': arm_lengths[..., 0],
+        'bending_stress': stress,
+        'safety_factor': safety_factor(stress, params.get('yield_strength', yield_strength_carbon)),
+    }
+
+@profiled()
+def plot_frame(nodes, deformed_nodes, title_text, fig=None, element_connectivity=None):
+    """Plot original and deformed frame, one collection artist per layer
+
+    3D nodes from analyze_layout get a plan view and a side elevation;
+    pass their elements as element_connectivity.
+    """
+    from frame_render import FrameRenderer
+    if element_connectivity is None:
+        element_connectivity = ELEMENT_CONNECTIVITY
+    nodes = np.asarray(nodes)
+    deformed_nodes = np.asarray(deformed_nodes)
     
-    plt.legend(loc='best')
-    plt.title(title_text)
-    plt.xlabel('X-axis (m)')
-    plt.ylabel('Y-axis (m)')
-    plt.axis('equal')
-    plt.grid(True)
-    plt.tight_layout()
+    if fig is None:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(10, 8) if nodes.shape[-1] == 2 else (14, 6))
+    if nodes.shape[-1] == 2:
+        views = [(fig.add_subplot(), [0, 1], 'Y-axis (m)', '')]
+    else:
+        views = [(fig.add_subplot(1, 2, 1), [0, 1], 'Y-axis (m)', ' (plan)'),
+                 (fig.add_subplot(1, 2, 2), [0, 2], 'Z-axis (m)', ' (side)')]
+    for ax, columns, ylabel, view in views:
+        FrameRenderer(ax, nodes[:, columns], element_connectivity, deformed_nodes[:, columns])
+        
+        ax.legend(loc='best')
+        ax.set_title(title_text + view)
+        ax.set_xlabel('X-axis (m)')
+        ax.set_ylabel(ylabel)
+        ax.axis('equal')
+        ax.grid(True)
+    fig.tight_layout()
+    return fig
 
 # ========================================================================
 # QUESTION 1: X-frame vs H-frame Comparison
 # ========================================================================
-print('=== QUESTION 1: X-frame vs H-frame Comparison ===\n')
-
-# Analyze X-frame
-nodes_X, deformed_X, max_disp_X, arm_len_X = analyze_frame(
-    'X-frame', arm_length_base, width_base, motor_force_base, 
-    youngs_modulus, moment_of_inertia
-)
-
-print('X-frame Analysis:')
-print(f'  Arm Length (diagonal): {arm_len_X[0]:.4f} m')
-print(f'  Maximum Displacement: {max_disp_X:.6f} m ({max_disp_X*1000:.4f} mm)')
-print(f'  Motor Force: {motor_force_base:.1f} N\n')
-
-# Analyze H-frame
-nodes_H, deformed_H, max_disp_H, arm_len_H = analyze_frame(
-    'H-frame', arm_length_base, width_base, motor_force_base, 
-    youngs_modulus, moment_of_inertia
-)
-
-print('H-frame Analysis:')
-print(f'  Arm Length (vertical): {arm_len_H[0]:.4f} m')
-print(f'  Maximum Displacement: {max_disp_H:.6f} m ({max_disp_H*1000:.4f} mm)')
-print(f'  Motor Force: {motor_force_base:.1f} N\n')
-
-# Comparison
-ratio_q1 = max_disp_X / max_disp_H
-print('Comparison:')
-print(f'  X-frame displacement / H-frame displacement = {ratio_q1:.3f}')
-print(f'  X-frame has {(ratio_q1-1)*100:.1f}% MORE deformation than H-frame\n')
-
-# Plot both frames
-plot_frame(nodes_X, deformed_X, 'X-frame: Original vs Deformed (20N per motor)')
-plot_frame(nodes_H, deformed_H, 'H-frame: Original vs Deformed (20N per motor)')
-
-# Comparison bar chart
-plt.figure(figsize=(10, 6))
-plt.bar(['X-frame', 'H-frame'], [max_disp_X*1000, max_disp_H*1000])
-plt.title('Frame Deformation Comparison')
-plt.xlabel('Frame Type')
-plt.ylabel('Maximum Displacement (mm)')
-plt.grid(True, alpha=0.3)
-plt.tight_layout()
-
-print('ANSWER Q1: H-frame is MORE STABLE (less deformation).')
-print(f'Reason: X-frame has longer effective arm length ({arm_len_X[0]/arm_len_H[0]:.2f}x) due to diagonal geometry.')
-print('Deflection increases with L^3, so longer arms deform much more.\n')
+def question_1(plots):
+    print('=== QUESTION 1: X-frame vs H-frame Comparison ===\n')
+
+    # Analyze X-frame
+    nodes_X, deformed_X, max_disp_X, arm_len_X = analyze_frame(
+        'X-frame', arm_length_base, width_base, motor_force_base, 
+        youngs_modulus, moment_of_inertia
+    )
+
+    print('X-frame Analysis:')
+    print(f'  Arm Length (diagonal): {arm_len_X[0]:.4f} m')
+    print(f'  Maximum Displacement: {max_disp_X:.6f} m ({max_disp_X*1000:.4f} mm)')
+    print(f'  Motor Force: {motor_force_base:.1f} N\n')
+
+    # Analyze H-frame
+    nodes_H, deformed_H, max_disp_H, arm_len_H = analyze_frame(
+        'H-frame', arm_length_base, width_base, motor_force_base, 
+        youngs_modulus, moment_of_inertia
+    )
+
+    print('H-frame Analysis:')
+    print(f'  Arm Length (vertical): {arm_len_H[0]:.4f} m')
+    print(f'  Maximum Displacement: {max_disp_H:.6f} m ({max_disp_H*1000:.4f} mm)')
+    print(f'  Motor Force: {motor_force_base:.1f} N\n')
+
+    # Comparison
+    ratio_q1 = max_disp_X / max_disp_H
+    print('Comparison:')
+    print(f'  X-frame displacement / H-frame displacement = {ratio_q1:.3f}')
+    print(f'  X-frame has {(ratio_q1-1)*100:.1f}% MORE deformation than H-frame\n')
+
+    # Plot both frames
+    if plots.enabled:
+        fig = plot_frame(nodes_X, deformed_X, 'X-frame: Original vs Deformed (20N per motor)',
+                         plots.figure(figsize=(10, 8)))
+        plots.save(fig, 'X_frame.png')
+        fig = plot_frame(nodes_H, deformed_H, 'H-frame: Original vs Deformed (20N per motor)',
+                         plots.figure(figsize=(10, 8)))
+        plots.save(fig, 'H_frame.png')
+
+    # Comparison bar chart
+    if plots.enabled:
+        fig = plots.figure(figsize=(10, 6))
+        ax = fig.add_subplot()
+        ax.bar(['X-frame', 'H-frame'], [max_disp_X*1000, max_disp_H*1000])
+        ax.set_title('Frame Deformation Comparison')
+        ax.set_xlabel('Frame Type')
+        ax.set_ylabel('Maximum Displacement (mm)')
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        plots.save(fig, 'deform_compare.png')
+
+    print('ANSWER Q1: H-frame is MORE STABLE (less deformation).')
+    print(f'Reason: X-frame has longer effective arm length ({arm_len_X[0]/arm_len_H[0]:.2f}x) due to diagonal geometry.')
+    print('Deflection increases with L^3, so longer arms deform much more.\n')
 
 # ========================================================================
 # QUESTION 2: Effect of Motor Force
 # ========================================================================
-print('=== QUESTION 2: Effect of Motor Force on Deformation ===\n')
+def question_2(plots):
+    print('=== QUESTION 2: Effect of Motor Force on Deformation ===\n')
 
-motor_forces = np.array([5, 10, 20, 30, 40, 50, 60])  # N
-displacements_X = np.zeros(len(motor_forces))
-displacements_H = np.zeros(len(motor_forces))
+    motor_forces = np.array([5, 10, 20, 30, 40, 50, 60])  # N
 
-# Critical stress analysis
-cross_section_area = np.pi * ((beam_diameter/2)**2 - ((beam_diameter-2*beam_thickness)/2)**2)
-yield_strength_carbon = 500e6  # Pa (typical for carbon fiber)
+    print(f'Testing motor forces from {motor_forces[0]:.0f} N to {motor_forces[-1]:.0f} N:\n')
 
-print(f'Testing motor forces from {motor_forces[0]:.0f} N to {motor_forces[-1]:.0f} N:\n')
+    _, _, displacements_X, _ = analyze_frame_batch('X-frame', arm_length_base, width_base,
+                                                   motor_forces, youngs_modulus, moment_of_inertia)
+    _, _, displacements_H, _ = analyze_frame_batch('H-frame', arm_length_base, width_base,
+                                                   motor_forces, youngs_modulus, moment_of_inertia)
 
-for i, force in enumerate(motor_forces):
-    _, _, disp_X, _ = analyze_frame('X-frame', arm_length_base, width_base, 
-                                    force, youngs_modulus, moment_of_inertia)
-    _, _, disp_H, _ = analyze_frame('H-frame', arm_length_base, width_base, 
-                                    force, youngs_modulus, moment_of_inertia)
-    
-    displacements_X[i] = disp_X
-    displacements_H[i] = disp_H
-    
-    # Calculate bending stress: σ = M*c/I where M = F*L, c = outer_radius
-    arm_length_X_actual = np.sqrt(2) * arm_length_base
-    bending_moment = force * arm_length_X_actual
-    max_stress = bending_moment * (beam_diameter/2) / moment_of_inertia
-    safety_factor = yield_strength_carbon / max_stress
-    
-    print(f'Force = {force:.0f} N: X-frame = {disp_X*1000:.4f} mm, H-frame = {disp_H*1000:.4f} mm, '
-          f'Stress = {max_stress/1e6:.1f} MPa, Safety Factor = {safety_factor:.2f}')
-
-print()
-
-# Plot force vs deformation
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-
-ax1.plot(motor_forces, displacements_X*1000, 'b-o', linewidth=2, markersize=8, label='X-frame')
-ax1.plot(motor_forces, displacements_H*1000, 'r-s', linewidth=2, markersize=8, label='H-frame')
-ax1.set_title('Deformation vs Motor Force')
-ax1.set_xlabel('Motor Force (N)')
-ax1.set_ylabel('Maximum Displacement (mm)')
-ax1.legend()
-ax1.grid(True, alpha=0.3)
-
-# Calculate stresses
-stresses = np.zeros(len(motor_forces))
-for i, force in enumerate(motor_forces):
-    arm_length_actual = np.sqrt(2) * arm_length_base
-    bending_moment = force * arm_length_actual
-    stresses[i] = bending_moment * (beam_diameter/2) / moment_of_inertia
-
-ax2.plot(motor_forces, stresses/1e6, 'g-o', linewidth=2, markersize=8, label='Actual Stress')
-ax2.axhline(y=yield_strength_carbon/1e6, color='r', linestyle='--', linewidth=2, label='Yield Strength')
-ax2.set_title('Bending Stress vs Motor Force (X-frame)')
-ax2.set_xlabel('Motor Force (N)')
-ax2.set_ylabel('Maximum Bending Stress (MPa)')
-ax2.legend()
-ax2.grid(True, alpha=0.3)
-
-plt.tight_layout()
-
-print('ANSWER Q2: Deformation increases LINEARLY with motor force.')
-print('Structural integrity compromised when stress exceeds yield strength (500 MPa).')
-print('For this design, forces above ~50N approach the safety limit.\n')
+    # Critical stress analysis on the longer X-frame (diagonal) arm
+    stresses = bending_stress(motor_forces, np.sqrt(2) * arm_length_base, beam_diameter, moment_of_inertia)
+    safety_factors = safety_factor(stresses, yield_strength_carbon)
+
+    for i, force in enumerate(motor_forces):
+        disp_X = displacements_X[i]
+        disp_H = displacements_H[i]
+
+        print(f'Force = {force:.0f} N: X-frame = {disp_X*1000:.4f} mm, H-frame = {disp_H*1000:.4f} mm, '
+              f'Stress = {stresses[i]/1e6:.1f} MPa, Safety Factor = {safety_factors[i]:.2f}')
+
+    print()
+
+    # Plot force vs deformation
+    if plots.enabled:
+        fig, (ax1, ax2) = plots.subplots(1, 2, figsize=(14, 5))
+
+        ax1.plot(motor_forces, displacements_X*1000, 'b-o', linewidth=2, markersize=8, label='X-frame')
+        ax1.plot(motor_forces, displacements_H*1000, 'r-s', linewidth=2, markersize=8, label='H-frame')
+        ax1.set_title('Deformation vs Motor Force')
+        ax1.set_xlabel('Motor Force (N)')
+        ax1.set_ylabel('Maximum Displacement (mm)')
+        ax1.legend()
+        ax1.grid(True, alpha=0.3)
+
+        ax2.plot(motor_forces, stresses/1e6, 'g-o', linewidth=2, markersize=8, label='Actual Stress')
+        ax2.axhline(y=yield_strength_carbon/1e6, color='r', linestyle='--', linewidth=2, label='Yield Strength')
+        ax2.set_title('Bending Stress vs Motor Force (X-frame)')
+        ax2.set_xlabel('Motor Force (N)')
+        ax2.set_ylabel('Maximum Bending Stress (MPa)')
+        ax2.legend()
+        ax2.grid(True, alpha=0.3)
+
+        fig.tight_layout()
+        plots.save(fig, 'deform_motorF.png')
+
+    print('ANSWER Q2: Deformation increases LINEARLY with motor force.')
+    print('Structural integrity compromised when stress exceeds yield strength (500 MPa).')
+    print('For this design, forces above ~50N approach the safety limit.\n')
 
 # ========================================================================
 # QUESTION 3: Effect of Frame Dimensions
 # ========================================================================
-print('=== QUESTION 3: Impact of Frame Dimensions ===\n')
-
-# Test varying arm lengths (X-frame)
-arm_lengths = np.array([0.2, 0.3, 0.4, 0.5, 0.6])  # meters
-displacements_arm = np.zeros(len(arm_lengths))
-
-print('--- Effect of Arm Length (X-frame, Force = 20N) ---')
-for i, length in enumerate(arm_lengths):
-    _, _, disp, _ = analyze_frame('X-frame', length, width_base, 
-                                  motor_force_base, youngs_modulus, moment_of_inertia)
-    displacements_arm[i] = disp
-    print(f'Arm Length = {length:.2f} m: Displacement = {disp*1000:.4f} mm')
-
-print()
-
-# Test varying width (H-frame)
-widths = np.array([0.05, 0.1, 0.15, 0.2, 0.25])  # meters
-displacements_width = np.zeros(len(widths))
-
-print('--- Effect of Width (H-frame, Arm Length = 0.4m, Force = 20N) ---')
-for i, w in enumerate(widths):
-    _, _, disp, _ = analyze_frame('H-frame', arm_length_base, w, 
-                                  motor_force_base, youngs_modulus, moment_of_inertia)
-    displacements_width[i] = disp
-    # Calculate moment arm for stability
-    moment_arm = 2 * w  # Distance between left and right motors
-    print(f'Width = {w:.2f} m: Displacement = {disp*1000:.4f} mm, Stability Arm = {moment_arm:.2f} m')
-
-print()
-
-# Plotting
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-
-ax1.plot(arm_lengths, displacements_arm*1000, 'b-o', linewidth=2, markersize=8)
-ax1.set_title('Effect of Arm Length on Deformation (X-frame)')
-ax1.set_xlabel('Arm Length (m)')
-ax1.set_ylabel('Maximum Displacement (mm)')
-ax1.grid(True, alpha=0.3)
-
-ax2.plot(widths, displacements_width*1000, 'r-s', linewidth=2, markersize=8)
-ax2.set_title('Effect of Width on Deformation (H-frame)')
-ax2.set_xlabel('Width (m)')
-ax2.set_ylabel('Maximum Displacement (mm)')
-ax2.grid(True, alpha=0.3)
-
-plt.tight_layout()
-
-print('ANSWER Q3:')
-print('- Arm Length: Deformation increases CUBICALLY (L^3). Shorter arms = better.')
-print('- Width: Does NOT affect deformation but INCREASES stability (larger moment arm).')
-print('- Optimal design: Minimize arm length while maximizing width for stability.\n')
+def question_3(plots):
+    print('=== QUESTION 3: Impact of Frame Dimensions ===\n')
+
+    # Test varying arm lengths (X-frame)
+    arm_lengths = np.array([0.2, 0.3, 0.4, 0.5, 0.6])  # meters
+    _, _, displacements_arm, _ = analyze_frame_batch('X-frame', arm_lengths, width_base,
+                                                     motor_force_base, youngs_modulus, moment_of_inertia)
+
+    print('--- Effect of Arm Length (X-frame, Force = 20N) ---')
+    for length, disp in zip(arm_lengths, displacements_arm):
+        print(f'Arm Length = {length:.2f} m: Displacement = {disp*1000:.4f} mm')
+
+    print()
+
+    # Test varying width (H-frame)
+    widths = np.array([0.05, 0.1, 0.15, 0.2, 0.25])  # meters
+    _, _, displacements_width, _ = analyze_frame_batch('H-frame', arm_length_base, widths,
+                                                       motor_force_base, youngs_modulus, moment_of_inertia)
+
+    print('--- Effect of Width (H-frame, Arm Length = 0.4m, Force = 20N) ---')
+    for w, disp in zip(widths, displacements_width):
+        # Calculate moment arm for stability
+        moment_arm = 2 * w  # Distance between left and right motors
+        print(f'Width = {w:.2f} m: Displacement = {disp*1000:.4f} mm, Stability Arm = {moment_arm:.2f} m')
+
+    print()
+
+    # Plotting
+    if plots.enabled:
+        fig, (ax1, ax2) = plots.subplots(1, 2, figsize=(14, 5))
+
+        ax1.plot(arm_lengths, displacements_arm*1000, 'b-o', linewidth=2, markersize=8)
+        ax1.set_title('Effect of Arm Length on Deformation (X-frame)')
+        ax1.set_xlabel('Arm Length (m)')
+        ax1.set_ylabel('Maximum Displacement (mm)')
+        ax1.grid(True, alpha=0.3)
+
+        ax2.plot(widths, displacements_width*1000, 'r-s', linewidth=2, markersize=8)
+        ax2.set_title('Effect of Width on Deformation (H-frame)')
+        ax2.set_xlabel('Width (m)')
+        ax2.set_ylabel('Maximum Displacement (mm)')
+        ax2.grid(True, alpha=0.3)
+
+        fig.tight_layout()
+        plots.save(fig, 'frame_deformation.png')
+
+    print('ANSWER Q3:')
+    print('- Arm Length: Deformation increases CUBICALLY (L^3). Shorter arms = better.')
+    print('- Width: Does NOT affect deformation but INCREASES stability (larger moment arm).')
+    print('- Optimal design: Minimize arm length while maximizing width for stability.\n')
 
 # ========================================================================
 # QUESTION 4: Design Recommendation
 # ========================================================================
-print('=== QUESTION 4: Design Recommendation ===\n')
-
-# Test optimal configurations
-configs = [
-    ('X-frame, L=0.3m', 'X-frame', 0.3, 0.1),
-    ('X-frame, L=0.4m', 'X-frame', 0.4, 0.1),
-    ('H-frame, L=0.3m, W=0.1m', 'H-frame', 0.3, 0.1),
-    ('H-frame, L=0.3m, W=0.15m', 'H-frame', 0.3, 0.15),
-    ('H-frame, L=0.4m, W=0.15m', 'H-frame', 0.4, 0.15),
-]
-
-print('Comparing Different Configurations:\n')
-results = np.zeros((len(configs), 3))  # [displacement, stability_score, overall_score]
-
-for i, (name, frame_type, length, w) in enumerate(configs):
-    _, _, disp, _ = analyze_frame(frame_type, length, w, 
-                                  motor_force_base, youngs_modulus, moment_of_inertia)
-    
-    # Calculate stability metric (moment arm for roll/pitch control)
-    if frame_type == 'X-frame':
-        stability_arm = np.sqrt(2) * length
-    else:
-        stability_arm = w  # Width provides roll stability
-    
-    results[i, 0] = disp * 1000  # mm
-    results[i, 1] = stability_arm
-    results[i, 2] = stability_arm / (disp * 1000)  # Stability per mm deformation
-    
-    print(f'{name}:')
-    print(f'  Displacement: {results[i, 0]:.4f} mm')
-    print(f'  Stability Arm: {results[i, 1]:.3f} m')
-    print(f'  Performance Ratio: {results[i, 2]:.2f}\n')
-
-# Visualization
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-
-config_names = [c[0] for c in configs]
-ax1.bar(range(len(configs)), results[:, 0])
-ax1.set_xticks(range(len(configs)))
-ax1.set_xticklabels(config_names, rotation=45, ha='right')
-ax1.set_title('Deformation Comparison')
-ax1.set_ylabel('Displacement (mm)')
-ax1.grid(True, alpha=0.3)
-
-ax2.bar(range(len(configs)), results[:, 2])
-ax2.set_xticks(range(len(configs)))
-ax2.set_xticklabels(config_names, rotation=45, ha='right')
-ax2.set_title('Performance Ratio (Stability/Deformation)')
-ax2.set_ylabel('Performance Ratio')
-ax2.grid(True, alpha=0.3)
-
-plt.tight_layout()
-
-print('=== FINAL RECOMMENDATION ===')
-print('Best Design: H-frame with moderate arm length (0.3-0.4m) and increased width (0.15m)\n')
-print('Reasoning:')
-print('1. STABILITY: H-frame has shorter vertical arms → less deformation')
-print('2. CONTROL: Wider frame provides better roll/pitch control authority')
-print('3. STRENGTH: Shorter arms experience less bending stress')
-print('4. PAYLOAD: H-frame can accommodate larger payloads in center')
-print('5. TRADE-OFF: Slightly larger size but significantly better structural performance\n')
-print('Specific Recommendation: H-frame, Arm Length = 0.35m, Width = 0.15m')
-print('This provides excellent balance between:')
-print('  - Minimal deformation (< 1mm at 20N per motor)')
-print('  - Good stability (30cm moment arm)')
-print('  - Sufficient size for components')
-print('  - High safety factor (> 3.0)')
-
-plt.show()
\ No newline at end of file
+def question_4(plots):
+    print('=== QUESTION 4: Design Recommendation ===\n')
+
+    # Test optimal configurations
+    configs = [
+        ('X-frame, L=0.3m', 'X-frame', 0.3, 0.1),
+        ('X-frame, L=0.4m', 'X-frame', 0.4, 0.1),
+        ('H-frame, L=0.3m, W=0.1m', 'H-frame', 0.3, 0.1),
+        ('H-frame, L=0.3m, W=0.15m', 'H-frame', 0.3, 0.15),
+        ('H-frame, L=0.4m, W=0.15m', 'H-frame', 0.4, 0.15),
+    ]
+
+    print('Comparing Different Configurations:\n')
+    results = np.zeros((len(configs), 3))  # [displacement, stability_score, overall_score]
+
+    _, config_types, config_lengths, config_widths = zip(*configs)
+    _, _, config_disps, _ = analyze_frame_batch(np.array(config_types), np.array(config_lengths),
+                                                np.array(config_widths), motor_force_base,
+                                                youngs_modulus, moment_of_inertia)
+
+    for i, (name, frame_type, length, w) in enumerate(configs):
+        disp = config_disps[i]
+
+        # Calculate stability metric (moment arm for roll/pitch control)
+        if frame_type == 'X-frame':
+            stability_arm = np.sqrt(2) * length
+        else:
+            stability_arm = w  # Width provides roll stability
+
+        results[i, 0] = disp * 1000  # mm
+        results[i, 1] = stability_arm
+        results[i, 2] = stability_arm / (disp * 1000)  # Stability per mm deformation
+
+        print(f'{name}:')
+        print(f'  Displacement: {results[i, 0]:.4f} mm')
+        print(f'  Stability Arm: {results[i, 1]:.3f} m')
+        print(f'  Performance Ratio: {results[i, 2]:.2f}\n')
+
+    # Visualization
+    if plots.enabled:
+        fig, (ax1, ax2) = plots.subplots(1, 2, figsize=(14, 5))
+
+        config_names = [c[0] for c in configs]
+        ax1.bar(range(len(configs)), results[:, 0])
+        ax1.set_xticks(range(len(configs)))
+        ax1.set_xticklabels(config_names, rotation=45, ha='right')
+        ax1.set_title('Deformation Comparison')
+        ax1.set_ylabel('Displacement (mm)')
+        ax1.grid(True, alpha=0.3)
+
+        ax2.bar(range(len(configs)), results[:, 2])
+        ax2.set_xticks(range(len(configs)))
+        ax2.set_xticklabels(config_names, rotation=45, ha='right')
+        ax2.set_title('Performance Ratio (Stability/Deformation)')
+        ax2.set_ylabel('Performance Ratio')
+        ax2.grid(True, alpha=0.3)
+
+        fig.tight_layout()
+        plots.save(fig, 'deform_stability.png')
+
+    # Search the full design space instead of the hand-picked configs
+    from optimizer import optimize_frame, recommend_design
+
+    min_safety_factor = 3.0
+    displacement_limit = 0.005  # m
+    front = optimize_frame(motor_force_base, min_safety_factor, displacement_limit)
+    base_mass = MATERIALS[frame_material]['density'] * cross_section_area * 4 * np.sqrt(2) * arm_length_base
+
+    print('=== OPTIMIZED DESIGN SEARCH ===')
+    print(f'Constraints: Safety Factor >= {min_safety_factor:.1f}, '
+          f'Displacement <= {displacement_limit*1000:.1f} mm at {motor_force_base:.0f} N per motor')
+    print(f'Pareto front (stability vs deformation vs mass): {len(front["mass"])} designs\n')
+
+    def describe(i):
+        width_text = f', W={front["width"][i]:.2f}m' if front['frame_type'][i] == 'H-frame' else ''
+        return (f'{front["frame_type"][i]}, L={front["arm_length"][i]:.2f}m{width_text}, '
+                f'{front["material_name"][i]} tube {front["tube_diameter"][i]*1000:.1f}x'
+                f'{front["tube_thickness"][i]*1000:.1f} mm')
+
+    for label, i in [('Lightest', np.argmin(front['mass'])),
+                     ('Stiffest', np.argmin(front['max_displacement'])),
+                     ('Most stable', np.argmax(front['stability_arm']))]:
+        print(f'{label}: {describe(i)}')
+        print(f'  Displacement = {front["max_displacement"][i]*1000:.4f} mm, '
+              f'Stability Arm = {front["stability_arm"][i]:.3f} m, Mass = {front["mass"][i]*1000:.1f} g')
+    print()
+
+    print('=== FINAL RECOMMENDATION ===')
+    best = recommend_design(front, base_mass)
+    if best is None:
+        print(f'No Pareto design is lighter than the base X-frame arms ({base_mass*1000:.1f} g)')
+        return
+    print(f'Best Design: {describe(best)}\n')
+    print(f'Highest performance ratio on the Pareto front within the base X-frame arm mass ({base_mass*1000:.1f} g):')
+    print(f'  Displacement: {front["max_displacement"][best]*1000:.4f} mm')
+    print(f'  Stability Arm: {front["stability_arm"][best]:.3f} m')
+    print(f'  Performance Ratio: {front["stability_arm"][best]/(front["max_displacement"][best]*1000):.2f}')
+    print(f'  Mass: {front["mass"][best]*1000:.1f} g')
+    print(f'  Safety Factor: {front["safety_factor"][best]:.2f}')
+
+# ========================================================================
+# MONTE CARLO: Scatter in Properties and Dimensions
+# ========================================================================
+def _scattered_tube(params):
+    section = section_properties('circular_tube', diameter=params['beam_diameter'],
+                                 thickness=params['beam_thickness'])
+    return evaluate_frame_designs({**params, 'moment_of_inertia': section.I})
+
+def monte_carlo_analysis(plots, samples, seed=0):
+    """Deflection and safety-factor spread of both base frames under scatter"""
+    print(f'=== MONTE CARLO: {samples:,} samples per frame (seed {seed}) ===\n')
+    for frame_type in ['X-frame', 'H-frame']:
+        inputs = {
+            'frame_type': frame_type,
+            'arm_length': uncertainty.Normal(arm_length_base, arm_length_tolerance),
+            'width': width_base,
+            'motor_force': uncertainty.normal_cov(motor_force_base, motor_force_cov),
+            'youngs_modulus': uncertainty.LogNormal(youngs_modulus, carbon_modulus_cov),
+            'yield_strength': uncertainty.LogNormal(yield_strength_carbon, carbon_strength_cov),
+            'beam_diameter': uncertainty.Normal(beam_diameter, tube_diameter_tolerance),
+            'beam_thickness': uncertainty.Normal(beam_thickness, tube_thickness_tolerance, lower=0.0005),
+        }
+        result = uncertainty.monte_carlo(
+            _scattered_tube, inputs, samples, seed=seed,
+            failure=lambda params, out: out['bending_stress'] > params['yield_strength'])
+        result['outputs'].pop('arm_length_actual')
+        print(f'{frame_type}:')
+        print(uncertainty.format_summary(result, scales={'max_displacement': 1000, 'bending_stress': 1e-6},
+                                         units={'max_displacement': ' (mm)', 'bending_stress': ' (MPa)'}))
+        print()
+
+# ========================================================================
+# NONLINEAR CHECK: Large Deflection and Buckling of the Arms
+# ========================================================================
+def nonlinear_analysis(plots):
+    """Question 2 forces on co-rotational arm models, with a drooped-arm buckling check"""
+    print('=== NONLINEAR CHECK: Large Deflection and Buckling of the Arms ===\n')
+
+    motor_forces = np.array([5, 10, 20, 30, 40, 50, 60])  # N
+    c = beam_diameter / 2
+    results = {}
+    for frame_type in ['X-frame', 'H-frame']:
+        _, _, linear, arm_lengths = analyze_frame_batch(frame_type, arm_length_base, width_base,
+                                                        motor_forces, youngs_modulus, moment_of_inertia)
+        arm = nonlinear.cantilever(arm_lengths[0, 0], youngs_modulus, cross_section_area, moment_of_inertia,
+                                   elements=nonlinear_elements)
+        sweep = arm.sweep(nonlinear.tip_load(arm, [0, 1]), motor_forces)
+        deflection = sweep['displacements'][:, -1, 1]
+        root = sweep['member_forces'][:, 0]
+        stress = np.abs(root[:, 1]) * c / moment_of_inertia + np.abs(root[:, 0]) / cross_section_area
+        linear_stress = bending_stress(motor_forces, arm_lengths[0, 0], beam_diameter, moment_of_inertia)
+        results[frame_type] = (linear, deflection)
+
+        print(f'{frame_type} arm ({arm_lengths[0, 0]:.3f} m):')
+        for i, force in enumerate(motor_forces):
+            print(f'Force = {force:.0f} N: linear = {linear[i]*1000:.4f} mm, '
+                  f'nonlinear = {deflection[i]*1000:.4f} mm ({(deflection[i]/linear[i] - 1)*100:+.2f}%), '
+                  f'root stress = {stress[i]/1e6:.1f} MPa (linear {linear_stress[i]/1e6:.1f} MPa)')
+        print(f'Newton: {arm.stats["iterations"]} iterations, {arm.stats["factorizations"]} factorizations '
+              f'over {len(motor_forces)} forces\n')
+
+        drooped = nonlinear.cantilever(arm_lengths[0, 0], youngs_modulus, cross_section_area,
+                                       moment_of_inertia, elements=nonlinear_elements, angle=-arm_droop_check)
+        (critical,), _ = drooped.linear_buckling(nonlinear.tip_load(drooped, [0, 1]))
+        print(f'Drooped {arm_droop_check}° arms buckle at {critical:.0f} N of thrust '
+              f'({critical / motor_forces[-1]:.0f}x the largest motor force)\n')
+
+    if plots.enabled:
+        fig = plots.figure(figsize=(10, 6))
+        ax = fig.add_subplot()
+        for (frame_type, (linear, deflection)), style in zip(results.items(), ['b', 'r']):
+            ax.plot(motor_forces, linear*1000, f'{style}--', linewidth=2, label=f'{frame_type} linear')
+            ax.plot(motor_forces, deflection*1000, f'{style}-o', linewidth=2, markersize=6,
+                    label=f'{frame_type} nonlinear')
+        ax.set_title('Linear vs Nonlinear Arm Deflection')
+        ax.set_xlabel('Motor Force (N)')
+        ax.set_ylabel('Tip Deflection (mm)')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+        fig.tight_layout()
+        plots.save(fig, 'nonlinear_deflection.png')
+
+    print('ANSWER: Stiff carbon arms stay within a fraction of a percent of the linear result up to 60 N;')
+    print('buckling only matters for drooped arms at thrusts far beyond the motors.\n')
+
+def parse_args(argv=None):
+    """Command line of the script, made of the flags of each optional module
+
+    Unknown or abbreviated flags are an error rather than silently ignored.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter, allow_abbrev=False,
+        parents=[FigureExporter.arguments(ASSET_DIR), ResultCache.arguments(), instrument.arguments(),
+                 uncertainty.arguments(), nonlinear.arguments()])
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run every question and print the full report"""
+    args = parse_args(argv)
+    trace_path = instrument.configure(args)
+    plots = FigureExporter.from_args(args)
+    samples, seed = uncertainty.configure(args)
+    cache = ResultCache.from_args(args)
+    for number, question in enumerate([question_1, question_2, question_3, question_4], start=1):
+        with span(f'question_{number}'):
+            cache.run(f'question_{number}', question, plots)
+    if nonlinear.configure(args):
+        with span('nonlinear'):
+            cache.run('nonlinear', nonlinear_analysis, plots)
+    if samples:
+        with span('monte_carlo'):
+            cache.run('monte_carlo', monte_carlo_analysis, plots, samples, seed)
+    with span('finish_plots'):
+        plots.finish()
+    cache.report()
+    instrument.report(trace_path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,521 @@
+"""
+Finite-element solvers for beam frames
+Planar frames loaded out of plane use Euler-Bernoulli beams with bending and
+torsion (grillage elements); nodes carry [w, θx, θy] = deflection and its
+slopes along X and Y. Frames in 3D use space-frame elements with axial
+stretch, torsion and bending about both section axes; nodes carry
+[u, v, w, θx, θy, θz]
+"""
+
+import functools
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+DOF_PER_NODE = 3
+SPACE_DOF_PER_NODE = 6
+
+# Euler-Bernoulli bending of one element over [w1, θ1, w2, θ2], times EI/L^3,
+# with the power of L each term picks up (rows/cols with a slope add an L)
+BENDING = np.array([[12, 6, -12, 6],
+                    [6, 4, -6, 2],
+                    [-12, -6, 12, -6],
+                    [6, 2, -6, 4]], dtype=float)
+BENDING_POWERS = np.array([[0, 1, 0, 1],
+                           [1, 2, 1, 2],
+                           [0, 1, 0, 1],
+                           [1, 2, 1, 2]])
+
+@functools.lru_cache(maxsize=None)
+def sparse_modules():
+    """(scipy.sparse, scipy.sparse.linalg), or (None, None) without SciPy
+
+    Imported on first use, since SciPy dominates the scripts' start-up time
+    and most analyses never build a sparse matrix.
+    """
+    try:
+        import scipy.sparse as sp
+        import scipy.sparse.linalg as spla
+    except ImportError:  # NumPy CSR + conjugate gradient fallback
+        return None, None
+    return sp, spla
+
+def refine_mesh(nodes, elements, elements_per_member):
+    """Split every element into equal sub-elements
+
+    The original nodes keep their indices; new interior nodes are appended
+    after them, so node numbering used for loads and supports is unchanged.
+    nodes may carry leading batch axes, (..., n_nodes, dim), for a batch of
+    frames sharing one connectivity.
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    elements = np.asarray(elements)
+    n = int(elements_per_member)
+    if n < 1:
+        raise ValueError('elements_per_member must be at least 1')
+    if n == 1:
+        return nodes, elements
+
+    start, end = nodes[..., elements[:, 0], :], nodes[..., elements[:, 1], :]
+    t = np.arange(1, n) / n
+    interior = start[..., :, None, :] + t[:, None] * (end - start)[..., :, None, :]
+    n_nodes = nodes.shape[-2]
+    interior_ids = n_nodes + np.arange(len(elements) * (n - 1)).reshape(len(elements), n - 1)
+
+    # Chain of node ids along each member: start, interior..., end
+    chain = np.concatenate([elements[:, :1], interior_ids, elements[:, 1:]], axis=1)
+    refined = np.stack([chain[:, :-1], chain[:, 1:]], axis=-1).reshape(-1, 2)
+    interior = interior.reshape(nodes.shape[:-2] + (-1, nodes.shape[-1]))
+    return np.concatenate([nodes, interior], axis=-2), refined
+
+def element_stiffness(nodes, elements, E, I, G, J):
+    """Global-axis stiffness matrices for all elements, shape (n_elements, 6, 6)
+
+    E, I, G and J are scalars or per-element arrays.
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    elements = np.asarray(elements)
+    d = nodes[elements[:, 1]] - nodes[elements[:, 0]]
+    L = np.hypot(d[:, 0], d[:, 1])
+    c, s = d[:, 0] / L, d[:, 1] / L
+    EI = np.broadcast_to(np.asarray(E, dtype=float) * I, L.shape)
+    GJ = np.broadcast_to(np.asarray(G, dtype=float) * J, L.shape)
+
+    # Local DOFs per node: [w, slope along the element, twist about it]
+    k = np.zeros((len(L), 6, 6))
+    b = EI / L**3
+    bend_idx = np.array([0, 1, 3, 4])
+    k[:, bend_idx[:, None], bend_idx] = b[:, None, None] * BENDING * L[:, None, None]**BENDING_POWERS
+    torsion = GJ / L
+    k[:, 2, 2] = k[:, 5, 5] = torsion
+    k[:, 2, 5] = k[:, 5, 2] = -torsion
+
+    # Global slopes (θx, θy) -> local (slope along, twist about) is a plane rotation
+    T = np.zeros((len(L), 6, 6))
+    for offset in (0, 3):
+        T[:, offset, offset] = 1
+        T[:, offset + 1, offset + 1] = c
+        T[:, offset + 1, offset + 2] = s
+        T[:, offset + 2, offset + 1] = -s
+        T[:, offset + 2, offset + 2] = c
+    return np.einsum('eji,ejk,ekl->eil', T, k, T)
+
+def element_dofs(elements, dof_per_node=DOF_PER_NODE):
+    """Global DOF numbers of each element, shape (n_elements, 2*dof_per_node)"""
+    elements = np.asarray(elements)
+    return (elements[:, :, None] * dof_per_node + np.arange(dof_per_node)).reshape(len(elements), -1)
+
+def assemble_stiffness(nodes, elements, E, I, G, J, fixed_dofs=()):
+    """Assemble the sparse global stiffness with fixed DOFs eliminated
+
+    Returns (K, free_dofs) where K is a scipy CSR matrix, or a CSRMatrix when
+    SciPy is not installed, over the free DOFs only.
+    """
+    n_dof = len(nodes) * DOF_PER_NODE
+    ke = element_stiffness(nodes, elements, E, I, G, J)
+    dofs = element_dofs(elements)
+    rows = np.repeat(dofs, 6, axis=1).ravel()
+    cols = np.tile(dofs, (1, 6)).ravel()
+    vals = ke.ravel()
+
+    # Eliminate supports at the triplet level so no dense slicing is needed
+    free = np.ones(n_dof, dtype=bool)
+    free[np.asarray(fixed_dofs, dtype=np.intp)] = False
+    free_dofs = np.flatnonzero(free)
+    renumber = np.full(n_dof, -1)
+    renumber[free_dofs] = np.arange(len(free_dofs))
+    keep = free[rows] & free[cols]
+    rows, cols, vals = renumber[rows[keep]], renumber[cols[keep]], vals[keep]
+
+    n = len(free_dofs)
+    sp, _ = sparse_modules()
+    if sp is not None:
+        K = sp.csr_matrix((vals, (rows, cols)), shape=(n, n))
+    else:
+        K = CSRMatrix.from_coo(rows, cols, vals, n)
+    return K, free_dofs
+
+def solve(K, f):
+    """Solve K u = f for a matrix from assemble_stiffness"""
+    sp, spla = sparse_modules()
+    if sp is not None:
+        return spla.spsolve(K.tocsc(), f)
+    return K.solve(f)
+
+def fixed_node_dofs(fixed_nodes, dof_per_node=DOF_PER_NODE):
+    """All DOFs of clamped nodes"""
+    fixed_nodes = np.atleast_1d(np.asarray(fixed_nodes, dtype=np.intp))
+    return (fixed_nodes[:, None] * dof_per_node + np.arange(dof_per_node)).ravel()
+
+def nodal_loads(loads, n_nodes, dof_per_node=DOF_PER_NODE, load_dof=0, per_dof=None):
+    """Expand (..., n_nodes) point forces on load_dof to full (..., n_nodes, dof_per_node) loads
+
+    per_dof=True takes loads as already full, False as point forces, and
+    None infers it from the trailing axes. When n_nodes equals dof_per_node
+    an input of two or more axes fits both readings, so inference raises
+    ValueError and per_dof must be given.
+    """
+    loads = np.asarray(loads, dtype=float)
+    full_shape = loads.shape[-2:] == (n_nodes, dof_per_node)
+    if per_dof is None:
+        if full_shape and n_nodes == dof_per_node:
+            raise ValueError(f'Loads of shape {loads.shape} are ambiguous for {n_nodes} nodes with '
+                             f'{dof_per_node} DOFs each; pass per_dof=True or per_dof=False')
+        per_dof = full_shape
+    if per_dof:
+        if not full_shape:
+            raise ValueError(f'Expected (..., {n_nodes}, {dof_per_node}) loads, got shape {loads.shape}')
+        return loads
+    if loads.shape[-1] != n_nodes:
+        raise ValueError(f'Expected loads for {n_nodes} nodes, got shape {loads.shape}')
+    full = np.zeros(loads.shape + (dof_per_node,))
+    full[..., load_dof] = loads
+    return full
+
+class FactorizedFrame:
+    """Stiffness of one frame factorized once and reused for any load case
+
+    Plain nodal force arrays are applied on load_dof: the grillage
+    deflection w by default, or 2 (w along Z) for space frames.
+    """
+
+    def __init__(self, K, free_dofs, n_nodes, dof_per_node=DOF_PER_NODE, load_dof=0):
+        self.free_dofs = free_dofs
+        self.n_nodes = n_nodes
+        self.dof_per_node = dof_per_node
+        self.load_dof = load_dof
+        sp, spla = sparse_modules()
+        if sp is not None:
+            self._lu = spla.splu(K.tocsc())
+            self._K = None
+        else:
+            # No sparse factorization without SciPy; CG against the cached matrix
+            self._lu = None
+            self._K = K
+
+    def solve(self, loads, per_dof=None):
+        """Nodal displacements for one or many load cases
+
+        loads is (n_nodes,) or (n_nodes, dof_per_node) for a single case, or
+        (n_cases, n_nodes) / (n_cases, n_nodes, dof_per_node) for a batch,
+        which is solved as one multi-right-hand-side back substitution;
+        per_dof selects the reading when the shape fits both (see
+        nodal_loads). Returns (..., n_nodes, dof_per_node) displacements,
+        [w, θx, θy] for grillages.
+        """
+        loads = nodal_loads(loads, self.n_nodes, self.dof_per_node, self.load_dof, per_dof)
+        batch_shape = loads.shape[:-2]
+        f = loads.reshape(-1, self.n_nodes * self.dof_per_node)[:, self.free_dofs].T
+
+        if self._lu is not None:
+            u_free = self._lu.solve(np.ascontiguousarray(f))
+        else:
+            u_free = np.column_stack([self._K.solve(column) for column in f.T])
+
+        u = np.zeros((f.shape[1], self.n_nodes * self.dof_per_node))
+        u[:, self.free_dofs] = u_free.T
+        return u.reshape(batch_shape + (self.n_nodes, self.dof_per_node))
+
+class FactorizationCache:
+    """LRU cache of factorized frames keyed on geometry, material and section"""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(nodes, elements, E, I, G, J, fixed_nodes):
+        digest = hashlib.sha1()
+        n_elements = len(elements)
+        for value in (nodes, elements, fixed_nodes):
+            value = np.ascontiguousarray(value)
+            digest.update(str(value.shape).encode())
+            digest.update(value.tobytes())
+        for value in (E, I, G, J):
+            digest.update(np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=float),
+                                                               (n_elements,))).tobytes())
+        return digest.hexdigest()
+
+    def get(self, nodes, elements, E, I, G, J, fixed_nodes=(0,)):
+        """Return the FactorizedFrame for these inputs, factorizing on a miss"""
+        nodes = np.asarray(nodes, dtype=float)
+        elements = np.asarray(elements)
+        fixed_nodes = np.atleast_1d(np.asarray(fixed_nodes, dtype=np.intp))
+        key = self.key(nodes, elements, E, I, G, J, fixed_nodes)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        K, free_dofs = assemble_stiffness(nodes, elements, E, I, G, J, fixed_node_dofs(fixed_nodes))
+        entry = FactorizedFrame(K, free_dofs, len(nodes))
+        self._entries[key] = entry
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+# Shared by solve_frame so repeated load cases on one frame factorize once
+FACTORIZATIONS = FactorizationCache()
+
+def solve_frame(nodes, elements, loads, E, I, G, J, fixed_nodes=(0,), cache=FACTORIZATIONS,
+                per_dof=None):
+    """Static solve of a clamped frame
+
+    loads is an (n_nodes,) array of out-of-plane nodal forces or a full
+    (n_nodes, 3) array of [force, moment about X, moment about Y]; a leading
+    batch axis solves several load cases at once. On a three-node mesh the
+    two readings collide, so pass per_dof (see nodal_loads). Pass cache=None
+    to skip the factorization cache. Returns nodal displacements
+    (..., n_nodes, 3) as [w, θx, θy].
+    """
+    if cache is None:
+        cache = FactorizationCache(maxsize=1)
+    return cache.get(nodes, elements, E, I, G, J, fixed_nodes).solve(loads, per_dof)
+
+def element_axes(nodes, elements):
+    """Lengths (..., n_elements) and local axes (..., n_elements, 3, 3) of 3D elements
+
+    The rows of each rotation are the local x (along the element), y and z
+    axes in global coordinates. Local y is horizontal, Z × x, so local z
+    stays as close to vertical as the element allows; vertical elements
+    take global Y as local y.
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    elements = np.asarray(elements)
+    d = nodes[..., elements[:, 1], :] - nodes[..., elements[:, 0], :]
+    L = np.linalg.norm(d, axis=-1)
+    x = d / L[..., None]
+    y = np.stack([-x[..., 1], x[..., 0], np.zeros_like(L)], axis=-1)
+    norm = np.linalg.norm(y, axis=-1)
+    vertical = norm < 1e-9
+    y = np.where(vertical[..., None], [0.0, 1.0, 0.0], y / np.where(vertical, 1, norm)[..., None])
+    return L, np.stack([x, y, np.cross(x, y)], axis=-2)
+
+def space_element_stiffness(nodes, elements, E, A, I, G, J):
+    """Global-axis space-frame stiffness matrices, shape (..., n_elements, 12, 12)
+
+    nodes is (..., n_nodes, 3) for one frame or a batch sharing elements;
+    E, A, I, G and J broadcast to (..., n_elements). Tubes bend alike about
+    both section axes, so one I serves both bending planes.
+    """
+    L, R = element_axes(nodes, elements)
+    E = np.asarray(E, dtype=float)
+    EA, EI, GJ = (np.broadcast_to(value, L.shape) for value in (E * A, E * I, np.asarray(G, dtype=float) * J))
+
+    # Local DOFs per node: [u, v, w, θx, θy, θz]
+    k = np.zeros(L.shape + (12, 12))
+    for dof, stiffness in ((0, EA / L), (3, GJ / L)):
+        k[..., dof, dof] = k[..., dof + 6, dof + 6] = stiffness
+        k[..., dof, dof + 6] = k[..., dof + 6, dof] = -stiffness
+    bend = (EI / L**3)[..., None, None] * BENDING * L[..., None, None]**BENDING_POWERS
+    # Bending in the local x-y plane over [v, θz]; in x-z over [w, θy], where
+    # a positive θy lowers w, so the slope terms change sign
+    xy = np.array([1, 5, 7, 11])
+    xz = np.array([2, 4, 8, 10])
+    signs = np.array([1, -1, 1, -1])
+    k[..., xy[:, None], xy] = bend
+    k[..., xz[:, None], xz] = bend * np.outer(signs, signs)
+
+    # Rotate each 3-vector block: K = Tᵀ k T with T = diag(R, R, R, R)
+    blocks = k.reshape(L.shape + (4, 3, 4, 3))
+    K = np.einsum('...ji,...ajbk,...kl->...aibl', R, blocks, R, optimize=True)
+    return K.reshape(L.shape + (12, 12))
+
+class AssemblyPattern:
+    """Global sparsity pattern of one frame topology, reused across a batch
+
+    Frames that share connectivity and supports scatter element matrices
+    into the same global positions. The triplets are eliminated, sorted and
+    merged here once; assemble() then turns element matrices of any number
+    of frames into nonzero values with a single reduceat, and those values
+    become stacked dense matrices or one block-diagonal sparse matrix.
+    """
+
+    def __init__(self, elements, n_nodes, fixed_dofs=(), dof_per_node=SPACE_DOF_PER_NODE):
+        dofs = element_dofs(elements, dof_per_node)
+        size = dofs.shape[1]
+        rows = np.repeat(dofs, size, axis=1).ravel()
+        cols = np.tile(dofs, (1, size)).ravel()
+
+        n_dof = n_nodes * dof_per_node
+        free = np.ones(n_dof, dtype=bool)
+        free[np.asarray(fixed_dofs, dtype=np.intp)] = False
+        self.free_dofs = np.flatnonzero(free)
+        renumber = np.full(n_dof, -1)
+        renumber[self.free_dofs] = np.arange(len(self.free_dofs))
+        keep = np.flatnonzero(free[rows] & free[cols])
+        rows, cols = renumber[rows[keep]], renumber[cols[keep]]
+
+        self.n = len(self.free_dofs)
+        key = rows.astype(np.int64) * self.n + cols
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        self._take = keep[order]
+        self._starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        self.rows, self.cols = np.divmod(key[self._starts], self.n)
+        self.indptr = np.searchsorted(self.rows, np.arange(self.n + 1))
+        self.n_nodes = n_nodes
+        self.dof_per_node = dof_per_node
+
+    @property
+    def nnz(self):
+        return len(self.rows)
+
+    def assemble(self, element_matrices):
+        """Nonzero values (..., nnz) in CSR order from (..., n_elements, k, k) element matrices"""
+        element_matrices = np.asarray(element_matrices)
+        flat = element_matrices.reshape(element_matrices.shape[:-3] + (-1,))
+        return np.add.reduceat(flat[..., self._take], self._starts, axis=-1)
+
+    def dense(self, values):
+        """Stacked dense free-DOF stiffness matrices (..., n, n)"""
+        values = np.asarray(values)
+        K = np.zeros(values.shape[:-1] + (self.n, self.n))
+        K[..., self.rows, self.cols] = values
+        return K
+
+    def sparse(self, values):
+        """One block-diagonal CSR matrix over a flat batch of (frames, nnz) values"""
+        values = np.asarray(values).reshape(-1, self.nnz)
+        frames = len(values)
+        offsets = np.arange(frames)[:, None]
+        indptr = np.append((offsets * self.nnz + self.indptr[:-1]).ravel(), frames * self.nnz)
+        indices = (offsets * self.n + self.cols).ravel()
+        size = frames * self.n
+        sp, _ = sparse_modules()
+        if sp is not None:
+            return sp.csr_matrix((values.ravel(), indices, indptr), shape=(size, size))
+        return CSRMatrix(values.ravel(), indices, indptr, size)
+
+# Frames with at most this many free DOFs are solved as stacked dense
+# systems; larger ones as block-diagonal sparse systems
+DENSE_DOF_LIMIT = 240
+# Working-set size (floats) of element and global matrices per batch chunk
+BATCH_CHUNK_FLOATS = 2**23
+
+def solve_space_frames(nodes, elements, loads, E, A, I, G, J, fixed_nodes=(0,), per_dof=None):
+    """Static solve of one clamped 3D frame or a batch sharing its connectivity
+
+    nodes is (n_nodes, 3) or (..., n_nodes, 3). loads is (..., n_nodes) of
+    forces along +Z or (..., n_nodes, 6) of [Fx, Fy, Fz, Mx, My, Mz] and
+    broadcasts against the frame batch; per_dof picks the reading on a
+    six-node mesh, where both fit (see nodal_loads). A single frame is factorized once
+    for all its load cases. A batch is assembled through one shared
+    AssemblyPattern in chunks; small frames are solved as stacked dense
+    LAPACK systems and large ones as a block-diagonal sparse system.
+    Returns displacements (..., n_nodes, 6) as [u, v, w, θx, θy, θz].
+    """
+    nodes = np.asarray(nodes, dtype=float)
+    elements = np.asarray(elements)
+    n_nodes = nodes.shape[-2]
+    pattern = AssemblyPattern(elements, n_nodes, fixed_node_dofs(fixed_nodes, SPACE_DOF_PER_NODE))
+    loads = nodal_loads(loads, n_nodes, SPACE_DOF_PER_NODE, load_dof=2, per_dof=per_dof)
+
+    n_elements = len(elements)
+    if nodes.ndim == 2 and all(np.ndim(value) <= 1 for value in (E, A, I, G, J)):
+        values = pattern.assemble(space_element_stiffness(nodes, elements, E, A, I, G, J))
+        return FactorizedFrame(pattern.sparse(values), pattern.free_dofs, n_nodes,
+                               SPACE_DOF_PER_NODE, load_dof=2).solve(loads, per_dof=True)
+
+    properties = [np.asarray(value, dtype=float) for value in (E, A, I, G, J)]
+    batch_shape = np.broadcast_shapes(nodes.shape[:-2], loads.shape[:-2],
+                                      *(value.shape[:-1] for value in properties))
+    nodes = np.broadcast_to(nodes, batch_shape + nodes.shape[-2:]).reshape((-1,) + nodes.shape[-2:])
+    loads = np.broadcast_to(loads, batch_shape + loads.shape[-2:]).reshape(len(nodes), -1)
+    # Scalars stay scalars; arrays become (frames, n_elements) rows
+    properties = [value if value.ndim == 0 else
+                  np.broadcast_to(value, batch_shape + (n_elements,)).reshape(-1, n_elements)
+                  for value in properties]
+
+    u = np.zeros((len(nodes), n_nodes * SPACE_DOF_PER_NODE))
+    chunk = max(1, BATCH_CHUNK_FLOATS // (n_elements * 144 + pattern.n**2))
+    for start in range(0, len(nodes), chunk):
+        rows = slice(start, start + chunk)
+        ke = space_element_stiffness(nodes[rows], elements,
+                                     *(value if value.ndim == 0 else value[rows] for value in properties))
+        values = pattern.assemble(ke)
+        f = loads[rows][:, pattern.free_dofs]
+        if pattern.n <= DENSE_DOF_LIMIT:
+            u_free = np.linalg.solve(pattern.dense(values), f[..., None])[..., 0]
+        else:
+            u_free = solve(pattern.sparse(values), f.ravel()).reshape(f.shape)
+        u[rows, pattern.free_dofs] = u_free
+    return u.reshape(batch_shape + (n_nodes, SPACE_DOF_PER_NODE))
+
+class CSRMatrix:
+    """Minimal compressed-sparse-row matrix used when SciPy is unavailable"""
+
+    def __init__(self, data, indices, indptr, n):
+        self.data = data
+        self.indices = indices
+        self.indptr = indptr
+        self.shape = (n, n)
+        self._row_of_entry = np.repeat(np.arange(n), np.diff(indptr))
+
+    @classmethod
+    def from_coo(cls, rows, cols, vals, n):
+        """Build from triplets, summing duplicate entries"""
+        order = np.lexsort((cols, rows))
+        rows, cols, vals = rows[order], cols[order], vals[order]
+        key = rows.astype(np.int64) * n + cols
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        data = np.add.reduceat(vals, starts) if len(vals) else vals
+        indptr = np.searchsorted(rows[starts], np.arange(n + 1))
+        return cls(data, cols[starts], indptr, n)
+
+    def diagonal(self):
+        diag = np.zeros(self.shape[0])
+        on_diag = self.indices == self._row_of_entry
+        diag[self._row_of_entry[on_diag]] = self.data[on_diag]
+        return diag
+
+    def dot(self, x):
+        return np.bincount(self._row_of_entry, weights=self.data * x[self.indices],
+                           minlength=self.shape[0])
+
+    def toarray(self):
+        dense = np.zeros(self.shape)
+        np.add.at(dense, (self._row_of_entry, self.indices), self.data)
+        return dense
+
+    def solve(self, b, rtol=1e-12, maxiter=None):
+        """Jacobi-preconditioned conjugate gradient (the stiffness is SPD)"""
+        b = np.asarray(b, dtype=float)
+        maxiter = maxiter or 10 * self.shape[0]
+        inv_diag = 1 / self.diagonal()
+        x = np.zeros_like(b)
+        r = b - self.dot(x)
+        z = inv_diag * r
+        p = z.copy()
+        rz = r @ z
+        tol = rtol * np.linalg.norm(b)
+        for _ in range(maxiter):
+            if np.linalg.norm(r) <= tol:
+                break
+            Ap = self.dot(p)
+            alpha = rz / (p @ Ap)
+            x += alpha * p
+            r -= alpha * Ap
+            z = inv_diag * r
+            rz, rz_old = r @ z, rz
+            p = z + (rz / rz_old) * p
+        else:
+            raise RuntimeError(f'Conjugate gradient did not converge in {maxiter} iterations')
+        return x
@@ -0,0 +1,169 @@
+"""
+Parametric multirotor frame layouts
+Any number of arms at any angles, arm dihedral or droop, and coaxial motor
+pairs stacked on the arm tips. Node and connectivity arrays are generated
+for whole batches of frames at once and analyzed as 3D space frames, so
+arms carry axial load, torsion and bending in and out of the frame plane
+
+    python frame_layouts.py hex octo Y6 --dihedral -5 --motor-torque 0.3
+"""
+
+import argparse
+from collections import namedtuple
+
+import numpy as np
+
+import frame_fem
+from instrument import profiled
+
+# arm_angles in degrees from +X; dihedral in degrees, positive with the arm
+# tips above the hub and negative for droop, one value or one per arm
+FrameLayout = namedtuple('FrameLayout', ['arm_angles', 'dihedral', 'coaxial'], defaults=(0.0, False))
+
+COAXIAL_SPACING = 0.06  # m between the upper and lower motor of a coaxial pair
+
+def regular_angles(n_arms, offset=None):
+    """Evenly spaced arm angles (degrees), by default with +X between two arms"""
+    offset = 180 / n_arms if offset is None else offset
+    return offset + 360 * np.arange(n_arms) / n_arms
+
+LAYOUTS = {
+    'quad-x': FrameLayout(regular_angles(4)),
+    'quad-plus': FrameLayout(regular_angles(4, 0)),
+    'hex': FrameLayout(regular_angles(6)),
+    'octo': FrameLayout(regular_angles(8)),
+    'Y6': FrameLayout(regular_angles(3), coaxial=True),
+    'X8': FrameLayout(regular_angles(4), coaxial=True),
+}
+
+def get_layout(layout):
+    """FrameLayout from a LAYOUTS name, an arm count or a FrameLayout"""
+    if isinstance(layout, FrameLayout):
+        return layout
+    if isinstance(layout, (int, np.integer)):
+        if layout < 1:
+            raise ValueError('A frame needs at least one arm')
+        return FrameLayout(regular_angles(int(layout)))
+    try:
+        return LAYOUTS[layout]
+    except (KeyError, TypeError):
+        raise ValueError(f'Unknown frame layout {layout!r}, expected one of {tuple(LAYOUTS)}') from None
+
+def layout_elements(layout):
+    """Connectivity (elements, 2) and motor node ids of a layout
+
+    Node 0 is the hub and nodes 1..n the arm tips, so elements 0..n-1 are
+    the arms. Coaxial layouts add upper motors n+1..2n and lower motors
+    2n+1..3n, each joined to its arm tip by a motor mast element.
+    """
+    layout = get_layout(layout)
+    n = len(layout.arm_angles)
+    tips = 1 + np.arange(n)
+    arms = np.stack([np.zeros(n, dtype=int), tips], axis=-1)
+    if not layout.coaxial:
+        return arms, tips
+    motors = np.concatenate([tips + n, tips + 2 * n])
+    masts = np.stack([np.tile(tips, 2), motors], axis=-1)
+    return np.concatenate([arms, masts]), motors
+
+def layout_nodes(layout, arm_length, dihedral=None, coaxial_spacing=COAXIAL_SPACING):
+    """Node coordinates (..., n_nodes, 3) of a batch of frames
+
+    arm_length is the hub-to-tip length along each arm and dihedral
+    (degrees) overrides the layout's; both broadcast to (..., n_arms), so
+    give per-frame arrays a trailing axis, e.g. lengths[:, None].
+    """
+    layout = get_layout(layout)
+    angles = np.radians(np.asarray(layout.arm_angles, dtype=float))
+    dihedral = np.radians(np.asarray(layout.dihedral if dihedral is None else dihedral, dtype=float))
+    arm_length, dihedral = np.broadcast_arrays(np.asarray(arm_length, dtype=float), dihedral, angles)[:2]
+
+    direction = np.stack([np.cos(dihedral) * np.cos(angles), np.cos(dihedral) * np.sin(angles),
+                          np.sin(dihedral)], axis=-1)
+    tips = arm_length[..., None] * direction
+    hub = np.zeros(tips.shape[:-2] + (1, 3))
+    if not layout.coaxial:
+        return np.concatenate([hub, tips], axis=-2)
+    mast = np.array([0, 0, coaxial_spacing / 2])
+    return np.concatenate([hub, tips, tips + mast, tips - mast], axis=-2)
+
+def motor_loads(layout, n_nodes, motor_force, motor_torque=0.0):
+    """Nodal loads (..., n_nodes, 6) of thrust and yaw reaction at every motor
+
+    Thrust acts along +Z. Propellers alternate spin direction around the
+    frame, and the two motors of a coaxial pair counter-rotate, so the yaw
+    reaction torque alternates sign; motor_force and motor_torque broadcast
+    against the frame batch.
+    """
+    _, motors = layout_elements(layout)
+    spin = np.where(np.arange(len(motors)) % 2 == 0, 1.0, -1.0)
+    if get_layout(layout).coaxial:
+        n = len(motors) // 2
+        # Upper and lower motors of a pair spin opposite ways
+        spin = np.concatenate([spin[:n], -spin[:n]])
+    motor_force, motor_torque = np.broadcast_arrays(np.asarray(motor_force, dtype=float),
+                                                    np.asarray(motor_torque, dtype=float))
+    loads = np.zeros(motor_force.shape + (n_nodes, frame_fem.SPACE_DOF_PER_NODE))
+    loads[..., motors, 2] = motor_force[..., None]
+    loads[..., motors, 5] = motor_torque[..., None] * spin
+    return loads
+
+@profiled()
+def analyze_layouts(layout, arm_length, motor_force, E, I, A, G, J, dihedral=None, motor_torque=0.0,
+                    coaxial_spacing=COAXIAL_SPACING, elements_per_arm=1):
+    """Space-frame response of one generated frame or a batch of them
+
+    The hub is clamped and every motor carries motor_force and motor_torque
+    (see motor_loads). Geometry arguments broadcast as in layout_nodes;
+    motor_force and motor_torque broadcast against the frame batch, so an
+    array of forces on a single frame is a set of load cases solved against
+    one factorization. Arms and masts can be refined into several elements;
+    the extra nodes are appended after the generated ones. Returns nodes and
+    deformed nodes (..., n_nodes, 3), max displacement (largest nodal
+    translation), arm lengths (..., n_arms), elements and the full
+    [u, v, w, θx, θy, θz] nodal solution.
+    """
+    nodes = layout_nodes(layout, arm_length, dihedral, coaxial_spacing)
+    elements, _ = layout_elements(layout)
+    nodes, elements = frame_fem.refine_mesh(nodes, elements, elements_per_arm)
+    loads = motor_loads(layout, nodes.shape[-2], motor_force, motor_torque)
+    displacements = frame_fem.solve_space_frames(nodes, elements, loads, E, A, I, G, J, fixed_nodes=[0],
+                                                 per_dof=True)
+
+    deformed_nodes = nodes + displacements[..., :3]
+    max_displacement = np.linalg.norm(displacements[..., :3], axis=-1).max(axis=-1)
+    n_arms = len(get_layout(layout).arm_angles)
+    arm_lengths = np.linalg.norm(nodes[..., 1:n_arms + 1, :], axis=-1)
+    return nodes, deformed_nodes, max_displacement, arm_lengths, elements, displacements
+
+def main(argv=None):
+    import frame_design as fd
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('layouts', nargs='+', help=f'layout names {tuple(LAYOUTS)} or arm counts')
+    parser.add_argument('--arm-length', type=float, default=fd.arm_length_base * np.sqrt(2), help='m')
+    parser.add_argument('--dihedral', type=float, default=None, help='degrees, negative for droop')
+    parser.add_argument('--motor-force', type=float, default=fd.motor_force_base, help='N per motor')
+    parser.add_argument('--motor-torque', type=float, default=0.0, help='N*m yaw reaction per motor')
+    parser.add_argument('--elements-per-arm', type=int, default=8)
+    parser.add_argument('--plot', metavar='PATH', help='save a plan and side view of each layout')
+    args = parser.parse_args(argv)
+
+    for name in args.layouts:
+        layout = int(name) if name.isdigit() else name
+        nodes, deformed, max_displacement, arm_lengths, elements, _ = fd.analyze_layout(
+            layout, args.arm_length, args.motor_force, fd.youngs_modulus, fd.moment_of_inertia,
+            dihedral=args.dihedral, motor_torque=args.motor_torque, elements_per_arm=args.elements_per_arm)
+        print(f'{name}: {len(arm_lengths)} arms, {len(elements)} elements, '
+              f'max displacement {max_displacement * 1000:.3f} mm')
+        if args.plot:
+            import os
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure(figsize=(14, 6))
+            FigureCanvasAgg(fig)
+            fd.plot_frame(nodes, deformed, f'{name} frame', fig, elements)
+            root, extension = os.path.splitext(args.plot)
+            fig.savefig(f'{root}_{name}{extension or ".png"}')
+
+if __name__ == '__main__':
+    main()
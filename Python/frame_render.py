@@ -0,0 +1,219 @@
+"""
+Collection-based frame renderer and deformation animation
+Each layer (original elements, deformed elements, original and deformed
+nodes) is a single artist whose data is updated in place, so large meshes
+draw in one call per layer and animations only redraw what moves
+
+    python frame_render.py sweep.gif --elements-per-arm 2500 --forces 0 60 --steps 31 --scale 20
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+
+import numpy as np
+
+def segments(nodes, elements):
+    """(elements, 2, 2) line segments of a frame"""
+    return np.asarray(nodes)[np.asarray(elements)]
+
+def element_chains(elements):
+    """Node index arrays of maximal runs of elements joined end to start
+
+    A refined arm becomes one polyline, which Agg strokes far faster than
+    thousands of separate two-point segments.
+    """
+    elements = np.asarray(elements)
+    breaks = np.flatnonzero(elements[1:, 0] != elements[:-1, 1]) + 1
+    return [np.concatenate([run[:1, 0], run[:, 1]]) for run in np.split(elements, breaks)]
+
+def structural_nodes(elements, n_nodes):
+    """Nodes that are not interior mesh points: joints, supports, free ends"""
+    degree = np.bincount(np.asarray(elements).ravel(), minlength=n_nodes)
+    return np.flatnonzero(degree != 2)
+
+class FrameRenderer:
+    """Original and deformed frame on one axes, styled like plot_frame
+
+    Elements are drawn as polylines along element chains, and node markers
+    go on the structural nodes (hub, joints, motors) rather than on every
+    interior mesh point, so refined meshes cost little more than coarse ones.
+    update() moves the deformed layers without creating artists; with
+    animated=True those layers are left out of normal draws for blitting.
+    """
+
+    def __init__(self, ax, nodes, elements, deformed_nodes=None, animated=False):
+        from matplotlib.collections import LineCollection
+        self.ax = ax
+        nodes = np.asarray(nodes, dtype=float)
+        deformed_nodes = nodes if deformed_nodes is None else np.asarray(deformed_nodes, dtype=float)
+        self.chains = element_chains(elements)
+        self.marked = structural_nodes(elements, len(nodes))
+
+        self.original = LineCollection([nodes[chain] for chain in self.chains], colors='b',
+                                       linewidths=3, label='Original Frame')
+        ax.add_collection(self.original)
+        (self.original_nodes,) = ax.plot(nodes[self.marked, 0], nodes[self.marked, 1], 'ro', markersize=10,
+                                         markerfacecolor='r', label='Original Nodes')
+        self.deformed = LineCollection([deformed_nodes[chain] for chain in self.chains], colors='r',
+                                       linewidths=2, linestyles='--', label='Deformed Frame',
+                                       animated=animated)
+        ax.add_collection(self.deformed)
+        (self.deformed_nodes,) = ax.plot(deformed_nodes[self.marked, 0], deformed_nodes[self.marked, 1], 'bs',
+                                         markersize=8, markerfacecolor='b', label='Deformed Nodes',
+                                         animated=animated)
+        ax.autoscale_view()
+
+    @property
+    def animated_artists(self):
+        return [self.deformed, self.deformed_nodes]
+
+    def update(self, deformed_nodes):
+        """Move the deformed layers to new node positions in place"""
+        deformed_nodes = np.asarray(deformed_nodes, dtype=float)
+        self.deformed.set_segments([deformed_nodes[chain] for chain in self.chains])
+        self.deformed_nodes.set_data(deformed_nodes[self.marked, 0], deformed_nodes[self.marked, 1])
+        return self.animated_artists
+
+def _exaggerate(nodes, deformed_steps, scale):
+    nodes = np.asarray(nodes, dtype=float)
+    return nodes + scale * (np.asarray(deformed_steps, dtype=float) - nodes)
+
+def _animation_axes(fig, nodes, elements, steps, title):
+    """Axes with limits fixed over every step, a renderer and a step label"""
+    ax = fig.add_subplot()
+    renderer = FrameRenderer(ax, nodes, elements, steps[0], animated=True)
+    points = np.concatenate([np.asarray(nodes).reshape(-1, 2), steps.reshape(-1, 2)])
+    low, high = points.min(axis=0), points.max(axis=0)
+    pad = 0.05 * (high - low).max()
+    ax.set_xlim(low[0] - pad, high[0] + pad)
+    ax.set_ylim(low[1] - pad, high[1] + pad)
+    ax.set_aspect('equal', adjustable='box')
+    ax.set_title(title)
+    ax.set_xlabel('X-axis (m)')
+    ax.set_ylabel('Y-axis (m)')
+    ax.grid(True)
+    ax.legend(loc='upper right')
+    label = ax.text(0.02, 0.02, '', transform=ax.transAxes, va='bottom', animated=True)
+    return ax, renderer, label
+
+def animate_deformation(nodes, elements, deformed_steps, labels=None, fig=None, title='',
+                        scale=1.0, interval=100):
+    """Blitted FuncAnimation of a frame deforming over load steps
+
+    deformed_steps is (steps, nodes, 2), e.g. the deformed nodes returned
+    by analyze_frame_fem for an array of motor forces; scale exaggerates
+    the displacements. Keep a reference to the returned animation.
+    """
+    from matplotlib.animation import FuncAnimation
+    if fig is None:
+        import matplotlib.pyplot as plt
+        fig = plt.figure(figsize=(10, 8))
+    steps = _exaggerate(nodes, deformed_steps, scale)
+    _, renderer, label = _animation_axes(fig, nodes, elements, steps, title)
+    labels = labels if labels is not None else [f'step {i}' for i in range(len(steps))]
+
+    def draw(i):
+        label.set_text(labels[i])
+        return renderer.update(steps[i]) + [label]
+
+    return FuncAnimation(fig, draw, frames=len(steps), interval=interval, blit=True)
+
+class _GifWriter:
+    def __init__(self, path, fps):
+        self.path, self.fps, self.frames = path, fps, []
+
+    def write(self, rgba):
+        from PIL import Image
+        self.frames.append(Image.fromarray(rgba[..., :3]).quantize(colors=64, method=Image.Quantize.FASTOCTREE))
+
+    def close(self):
+        self.frames[0].save(self.path, save_all=True, append_images=self.frames[1:],
+                            duration=int(1000 / self.fps), loop=0)
+
+class _Mp4Writer:
+    def __init__(self, path, fps, size):
+        import matplotlib
+        ffmpeg = shutil.which(matplotlib.rcParams['animation.ffmpeg_path']) or shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError('MP4 export needs ffmpeg on the PATH; export a .gif instead')
+        width, height = size
+        self.process = subprocess.Popen(
+            [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgba',
+             '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+             # yuv420p needs even dimensions
+             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', '-vcodec', 'libx264', path],
+            stdin=subprocess.PIPE)
+
+    def write(self, rgba):
+        self.process.stdin.write(np.ascontiguousarray(rgba).tobytes())
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError(f'ffmpeg exited with status {self.process.returncode}')
+
+def export_animation(path, nodes, elements, deformed_steps, labels=None, title='', scale=1.0,
+                     fps=10, figsize=(10, 8), dpi=100):
+    """Render a deformation animation headless to .gif (Pillow) or .mp4 (ffmpeg)
+
+    The static layers are drawn once; each frame restores that background,
+    redraws only the deformed layers and the step label, and streams the
+    pixel buffer to the writer. Returns the number of frames written.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    steps = _exaggerate(nodes, deformed_steps, scale)
+    ax, renderer, label = _animation_axes(fig, nodes, elements, steps, title)
+    fig.tight_layout()
+    labels = labels if labels is not None else [f'step {i}' for i in range(len(steps))]
+
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.gif':
+        writer = _GifWriter(path, fps)
+    elif extension == '.mp4':
+        writer = _Mp4Writer(path, fps, canvas.get_width_height())
+    else:
+        raise ValueError(f'Unsupported animation format {extension!r}, expected .gif or .mp4')
+    try:
+        for step, text in zip(steps, labels):
+            canvas.restore_region(background)
+            renderer.update(step)
+            label.set_text(text)
+            for artist in renderer.animated_artists + [label]:
+                ax.draw_artist(artist)
+            writer.write(np.asarray(canvas.buffer_rgba()))
+    finally:
+        writer.close()
+    return len(steps)
+
+def main(argv=None):
+    import frame_design as fd
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('output', help='.gif or .mp4 path')
+    parser.add_argument('--frame-type', default='X-frame', choices=['X-frame', 'H-frame'])
+    parser.add_argument('--elements-per-arm', type=int, default=1)
+    parser.add_argument('--forces', type=float, nargs=2, default=(0, 60), metavar=('FIRST', 'LAST'),
+                        help='motor force range (N)')
+    parser.add_argument('--steps', type=int, default=31)
+    parser.add_argument('--scale', type=float, default=1.0, help='displacement exaggeration')
+    parser.add_argument('--fps', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    forces = np.linspace(*args.forces, args.steps)
+    nodes, deformed, _, _, elements, _ = fd.analyze_frame_fem(
+        args.frame_type, fd.arm_length_base, fd.width_base, forces, fd.youngs_modulus,
+        fd.moment_of_inertia, elements_per_arm=args.elements_per_arm)
+    frames = export_animation(args.output, nodes, elements, deformed,
+                              labels=[f'Motor force {f:.1f} N' for f in forces],
+                              title=f'{args.frame_type} deformation (x{args.scale:g})',
+                              scale=args.scale, fps=args.fps)
+    print(f'Wrote {frames} frames to {args.output}')
+
+if __name__ == '__main__':
+    main()
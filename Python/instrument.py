@@ -0,0 +1,177 @@
+"""
+Optional timing and memory instrumentation for the analysis scripts
+Switch on with --profile or IPS_PROFILE=1; spans record wall time, call
+counts and peak traced allocations, exported as a summary table and a
+Chrome trace (chrome://tracing, Perfetto). tracemalloc slows down
+allocation-heavy Python loops, so --profile-no-memory (IPS_PROFILE_MEMORY=0)
+keeps the timings clean. Its peak is process-wide, so only spans on the main
+thread record memory; spans in worker threads report timing alone
+"""
+
+import argparse
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+class Profiler:
+    """Collects nested spans; does nothing while disabled"""
+
+    def __init__(self, enabled=False, trace_memory=True):
+        self.enabled = False
+        self.trace_memory = trace_memory
+        self.stats = {}
+        self.events = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        self.enabled = True
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def reset(self):
+        self.stats = {}
+        self.events = []
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def span(self, name):
+        """Context manager timing one block; a no-op when disabled"""
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name):
+        stack = self._stack()
+        # reset_peak() would discard the peak of a span open on another thread
+        memory = (self.trace_memory and tracemalloc.is_tracing()
+                  and threading.current_thread() is threading.main_thread())
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # The parent's peak so far survives the reset below
+                stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+            tracemalloc.reset_peak()
+        else:
+            current = 0
+        frame = {'start_memory': current, 'peak': current}
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            peak_bytes = 0
+            if memory:
+                frame['peak'] = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+                peak_bytes = frame['peak'] - frame['start_memory']
+                if stack:
+                    stack[-1]['peak'] = max(stack[-1]['peak'], frame['peak'])
+            self._record(name, start, end, peak_bytes)
+
+    def _record(self, name, start, end, peak_bytes):
+        with self._lock:
+            entry = self.stats.setdefault(name, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                                 'peak_bytes': 0})
+            entry['calls'] += 1
+            entry['seconds'] += end - start
+            entry['max_seconds'] = max(entry['max_seconds'], end - start)
+            entry['peak_bytes'] = max(entry['peak_bytes'], peak_bytes)
+            self.events.append({
+                'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                'ts': (start - self._origin) * 1e6, 'dur': (end - start) * 1e6,
+                'args': {'peak_bytes': peak_bytes},
+            })
+
+    def profiled(self, name=None):
+        """Decorator recording every call of a function as a span"""
+        def decorate(func):
+            label = name or func.__qualname__
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self._span(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def summary(self):
+        """Plain-text table of spans ordered by total time"""
+        lines = [f'{"span":40s} {"calls":>8s} {"total ms":>12s} {"mean ms":>10s} {"max ms":>10s} {"peak KiB":>10s}']
+        for name, s in sorted(self.stats.items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f'{name:40s} {s["calls"]:8d} {s["seconds"]*1e3:12.3f} '
+                         f'{s["seconds"]/s["calls"]*1e3:10.3f} {s["max_seconds"]*1e3:10.3f} '
+                         f'{s["peak_bytes"]/1024:10.1f}')
+        return '\n'.join(lines)
+
+    def export_trace(self, path):
+        """Write the span timeline in Chrome trace-event format"""
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms',
+                       'otherData': {'summary': self.stats}}, f)
+
+    def export_summary(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.stats, f, indent=2)
+
+PROFILER = Profiler(enabled=os.environ.get('IPS_PROFILE', '') not in ('', '0'),
+                    trace_memory=os.environ.get('IPS_PROFILE_MEMORY', '1') != '0')
+span = PROFILER.span
+profiled = PROFILER.profiled
+
+def arguments():
+    """Parent parser of the profiling flags"""
+    parser = argparse.ArgumentParser(add_help=False)
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help='record timing and memory per question and kernel')
+    group.add_argument('--profile-trace', default=os.environ.get('IPS_PROFILE_TRACE'),
+                       help='write a Chrome trace JSON timeline to this path')
+    group.add_argument('--profile-no-memory', action='store_true',
+                       help='skip tracemalloc peak-allocation tracking, which slows '
+                            'allocation-heavy kernels about 14x')
+    return parser
+
+def configure(args, stream=sys.stderr):
+    """Enable the shared profiler from flags parsed with arguments()
+
+    Returns the trace path (from --profile-trace or IPS_PROFILE_TRACE), or None.
+    """
+    if args.profile_no_memory:
+        PROFILER.trace_memory = False
+    if args.profile or args.profile_trace:
+        PROFILER.enable()
+        if PROFILER.trace_memory:
+            print('Warning: memory tracing slows allocation-heavy kernels such as the design '
+                  'optimizer by an order of magnitude; add --profile-no-memory for clean timings',
+                  file=stream)
+    return args.profile_trace
+
+def report(trace_path=None, stream=sys.stderr):
+    """Print the summary table and write the trace, if profiling is on"""
+    if not PROFILER.enabled:
+        return
+    print('\n=== PROFILE ===', file=stream)
+    print(PROFILER.summary(), file=stream)
+    if trace_path:
+        PROFILER.export_trace(trace_path)
+        print(f'Trace written to {trace_path}', file=stream)
@@ -0,0 +1,157 @@
+"""
+Material database shared by the analysis scripts
+Properties live in one structured NumPy table with a name -> row index
+"""
+
+import csv
+import os
+
+import numpy as np
+
+NAME_LENGTH = 32  # characters held by the name field; widened for longer names
+
+def material_dtype(name_length=NAME_LENGTH):
+    """Structured row dtype whose name field holds at least name_length characters"""
+    return np.dtype([
+        ('name', f'U{max(name_length, NAME_LENGTH)}'),
+        ('density', 'f8'),  # kg/m^3
+        ('youngs_modulus', 'f8'),  # Pa
+        ('tensile_strength', 'f8'),  # Pa
+    ])
+
+# One row per material; the numeric fields are the columns fed to the analyses
+MATERIAL_DTYPE = material_dtype()
+PROPERTY_FIELDS = MATERIAL_DTYPE.names[1:]
+
+def _name_length(dtype):
+    """Characters held by a str dtype"""
+    return dtype.itemsize // np.dtype('U1').itemsize
+
+class MaterialTable:
+    """Indexed, append-only table of material properties
+
+    Rows live in a buffer that grows by doubling, so appending one material
+    at a time stays amortized O(1); the name field widens to fit the
+    longest name instead of truncating it.
+    """
+
+    def __init__(self, records=()):
+        self._buffer = np.zeros(0, dtype=MATERIAL_DTYPE)
+        self._size = 0
+        self._index = {}
+        self._columns = {}
+        self.extend(records)
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def __getitem__(self, name):
+        """Return the record for a material name"""
+        return self.data[self.row(name)]
+
+    @property
+    def data(self):
+        """Read-only structured view of the rows"""
+        view = self._buffer[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def names(self):
+        return list(self._index)
+
+    def row(self, name):
+        """O(1) lookup of the table row for a material name"""
+        try:
+            return self._index[name]
+        except KeyError:
+            raise KeyError(f'Unknown material {name!r}') from None
+
+    def rows(self, names):
+        """Row indices for a sequence of material names"""
+        return np.array([self.row(name) for name in names], dtype=np.intp)
+
+    def column(self, field, names=None):
+        """Contiguous, read-only float array of one property, optionally for selected materials"""
+        if field not in PROPERTY_FIELDS:
+            raise KeyError(f'Unknown material property {field!r}, expected one of {PROPERTY_FIELDS}')
+        if field not in self._columns:
+            # Structured fields are strided; keep a packed copy for vectorized maths
+            values = np.ascontiguousarray(self._buffer[field][:self._size])
+            values.flags.writeable = False
+            self._columns[field] = values
+        values = self._columns[field]
+        return values if names is None else values[self.rows(names)]
+
+    def add(self, name, density, youngs_modulus, tensile_strength):
+        self.extend([(name, density, youngs_modulus, tensile_strength)])
+
+    def extend(self, records):
+        """Append (name, density, youngs_modulus, tensile_strength) records or a structured array"""
+        if isinstance(records, np.ndarray) and records.dtype.names:
+            new = records
+        else:
+            records = [tuple(r) for r in records]
+            if not records:
+                return
+            new = np.array(records, dtype=material_dtype(max(len(str(r[0])) for r in records)))
+        if len(new) == 0:
+            return
+        names = [str(n) for n in new['name'].tolist()]
+        unique, counts = np.unique(np.asarray(names), return_counts=True)
+        duplicates = set(unique[counts > 1].tolist()) | {n for n in names if n in self._index}
+        if duplicates:
+            raise ValueError(f'Duplicate materials: {sorted(duplicates)}')
+
+        start, stop = self._size, self._size + len(new)
+        dtype = material_dtype(max(_name_length(self._buffer.dtype['name']), _name_length(new.dtype['name'])))
+        if stop > len(self._buffer) or dtype != self._buffer.dtype:
+            buffer = np.zeros(max(stop, 2 * len(self._buffer)), dtype=dtype)
+            buffer[:start] = self._buffer[:start]
+            self._buffer = buffer
+        for field in MATERIAL_DTYPE.names:
+            self._buffer[field][start:stop] = new[field]
+        self._size = stop
+        self._index.update(zip(names, range(start, stop)))
+        self._columns.clear()
+
+    @classmethod
+    def from_arrays(cls, names, density, youngs_modulus, tensile_strength):
+        """Table built in one step from a name array and per-property arrays"""
+        names = np.asarray(names, dtype=str)
+        data = np.zeros(len(names), dtype=material_dtype(_name_length(names.dtype)))
+        data['name'] = names
+        data['density'] = density
+        data['youngs_modulus'] = youngs_modulus
+        data['tensile_strength'] = tensile_strength
+        return cls(data)
+
+    @classmethod
+    def load(cls, path):
+        """Read a table written by save(); .npy or .csv by extension"""
+        if os.path.splitext(path)[1] == '.npy':
+            return cls(np.load(path))
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            return cls((row['name'], *(float(row[k]) for k in PROPERTY_FIELDS)) for row in reader)
+
+    def save(self, path):
+        """Write the table as .npy or .csv by extension"""
+        if os.path.splitext(path)[1] == '.npy':
+            np.save(path, self.data)
+            return
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(MATERIAL_DTYPE.names)
+            for record in self.data.tolist():
+                writer.writerow([record[0], *(repr(v) for v in record[1:])])
+
+# Lab materials
+MATERIALS = MaterialTable([
+    ('Carbon Fiber', 1600, 70e9, 500e6),
+    ('Aluminum', 2700, 69e9, 310e6),
+    ('Plastic', 1020, 2.1e9, 40e6),  # ABS
+])
@@ -0,0 +1,433 @@
+"""
+Geometrically nonlinear statics and buckling of planar beam frames
+Co-rotational Euler-Bernoulli beams carry large rotations exactly; nodes
+carry [u, v, θ] in the plane of bending. Equilibrium is found by Newton-
+Raphson with load stepping. Along a load sweep each point starts from an
+extrapolation of the previous converged ones, and the tangent factorization
+is kept across iterations and sweep points while Newton still contracts.
+Linear buckling comes from the geometric stiffness of the linear prestress,
+nonlinear buckling from the tangent stiffness losing positive definiteness
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+import frame_fem
+from instrument import profiled
+
+DOF_PER_NODE = 3
+
+# Effective length factors K in P_cr = π²EI/(K L)²
+EFFECTIVE_LENGTH_FACTORS = {
+    'pinned': 1.0,
+    'fixed': 0.5,
+    'fixed-pinned': 0.699,
+    'cantilever': 2.0,
+}
+
+def euler_buckling_load(E, I, length, ends='pinned'):
+    """Euler critical load of a straight column, vectorized over its arguments"""
+    try:
+        K = EFFECTIVE_LENGTH_FACTORS[ends]
+    except KeyError:
+        raise ValueError(f'Unknown end condition {ends!r}, expected one of '
+                         f'{tuple(EFFECTIVE_LENGTH_FACTORS)}') from None
+    return np.pi**2 * E * I / (K * np.asarray(length, dtype=float))**2
+
+def node_dofs(nodes, components=(0, 1, 2)):
+    """Global DOF numbers of the given [u, v, θ] components of nodes"""
+    nodes = np.atleast_1d(np.asarray(nodes, dtype=np.intp))
+    return (nodes[:, None] * DOF_PER_NODE + np.asarray(components)).ravel()
+
+class TangentFactorization:
+    """Sparse LU of a symmetric tangent stiffness with its inertia
+
+    Diagonal pivoting on a symmetric ordering makes U's diagonal the D of
+    an LDLᵀ factorization, so its negative entries count the negative
+    eigenvalues (Sylvester's law of inertia). Without SciPy the dense
+    inverse is kept instead.
+    """
+
+    def __init__(self, K):
+        sp, spla = frame_fem.sparse_modules()
+        self._sparse = sp is not None
+        if self._sparse:
+            try:
+                self._lu = spla.splu(K.tocsc(), permc_spec='MMD_AT_PLUS_A', diag_pivot_thresh=0,
+                                     options={'SymmetricMode': True})
+            except RuntimeError:  # exactly singular, at a critical point
+                self._lu = None
+                self.negative_pivots = 1
+            else:
+                self.negative_pivots = int(np.count_nonzero(self._lu.U.diagonal() < 0))
+        else:
+            dense = K.toarray()
+            self.negative_pivots = int(np.count_nonzero(np.linalg.eigvalsh(dense) < 0))
+            self._inverse = np.linalg.inv(dense)
+
+    @property
+    def singular(self):
+        return self._sparse and self._lu is None
+
+    def solve(self, rhs):
+        if not self._sparse:
+            return self._inverse @ rhs
+        return self._lu.solve(rhs)
+
+class NonlinearFrame:
+    """Planar frame of co-rotational beams under nodal loads
+
+    nodes is (n_nodes, 2) in the plane of bending; E, A and I are scalars
+    or per-element arrays. The factorized tangent stiffness is held between
+    solves, so a sweep refactorizes only where the response changes. stats
+    counts solves, Newton iterations and factorizations.
+    """
+
+    def __init__(self, nodes, elements, E, A, I, fixed_dofs):
+        self.nodes = np.asarray(nodes, dtype=float)
+        self.elements = np.asarray(elements)
+        self.n_dof = len(self.nodes) * DOF_PER_NODE
+        d0 = self.nodes[self.elements[:, 1]] - self.nodes[self.elements[:, 0]]
+        self._d0 = d0
+        self.length = np.hypot(d0[:, 0], d0[:, 1])
+        self._direction = d0 / self.length[:, None]
+        self.EA = np.broadcast_to(np.asarray(E, dtype=float) * A, self.length.shape)
+        self.EI = np.broadcast_to(np.asarray(E, dtype=float) * I, self.length.shape)
+
+        self.dofs = frame_fem.element_dofs(self.elements, DOF_PER_NODE)
+        self.pattern = frame_fem.AssemblyPattern(self.elements, len(self.nodes), fixed_dofs, DOF_PER_NODE)
+        self.free_dofs = self.pattern.free_dofs
+        self._factorization = None
+        self.stats = {'solves': 0, 'iterations': 0, 'factorizations': 0}
+
+    def loads(self, node_loads):
+        """Free-DOF load vector from (n_nodes, 3) [Fx, Fy, M] nodal loads"""
+        return np.asarray(node_loads, dtype=float).reshape(self.n_dof)[self.free_dofs]
+
+    def displacements(self, u_free):
+        """(n_nodes, 3) nodal [u, v, θ] from free-DOF displacements"""
+        u = np.zeros(self.n_dof)
+        u[self.free_dofs] = u_free
+        return u.reshape(-1, DOF_PER_NODE)
+
+    def _state(self, u_free):
+        """Current element chord geometry and local deformations"""
+        ue = self.displacements(u_free)[self.elements]
+        delta = ue[:, 1, :2] - ue[:, 0, :2]
+        d = self._d0 + delta
+        current = np.hypot(d[:, 0], d[:, 1])
+        # Stretch without cancellation: Ln² - L0² = 2 d0·Δ + Δ·Δ
+        stretch = (2 * np.einsum('ei,ei->e', self._d0, delta)
+                   + np.einsum('ei,ei->e', delta, delta)) / (current + self.length)
+        c, s = d[:, 0] / current, d[:, 1] / current
+        c0, s0 = self._direction[:, 0], self._direction[:, 1]
+        chord_rotation = np.arctan2(c0 * s - s0 * c, c0 * c + s0 * s)
+        local = ue[:, :, 2] - chord_rotation[:, None]
+        local = np.arctan2(np.sin(local), np.cos(local))
+        return current, c, s, stretch, local
+
+    def member_forces(self, u_free):
+        """Element axial force and end moments (n_elements, 3) as [N, M1, M2]"""
+        _, _, _, stretch, local = self._state(u_free)
+        k = self.EI / self.length
+        return np.stack([self.EA / self.length * stretch,
+                         k * (4 * local[:, 0] + 2 * local[:, 1]),
+                         k * (2 * local[:, 0] + 4 * local[:, 1])], axis=-1)
+
+    def _internal(self, u_free, tangent=False):
+        """Internal force on the free DOFs and optionally the tangent stiffness"""
+        current, c, s, stretch, local = self._state(u_free)
+        k = self.EI / self.length
+        N = self.EA / self.length * stretch
+        M1 = k * (4 * local[:, 0] + 2 * local[:, 1])
+        M2 = k * (2 * local[:, 0] + 4 * local[:, 1])
+
+        zero = np.zeros_like(c)
+        r = np.stack([-c, -s, zero, c, s, zero], axis=-1)
+        z = np.stack([s, -c, zero, -s, c, zero], axis=-1)
+        B = np.stack([r, -z / current[:, None], -z / current[:, None]], axis=1)
+        B[:, 1, 2] += 1
+        B[:, 2, 5] += 1
+        force = np.einsum('eki,ek->ei', B, np.stack([N, M1, M2], axis=-1))
+        f = np.bincount(self.dofs.ravel(), weights=force.ravel(), minlength=self.n_dof)[self.free_dofs]
+        if not tangent:
+            return f, None
+
+        D = np.zeros((len(c), 3, 3))
+        D[:, 0, 0] = self.EA / self.length
+        D[:, 1:, 1:] = k[:, None, None] * np.array([[4, 2], [2, 4]])
+        K = np.einsum('eki,ekl,elj->eij', B, D, B)
+        K += (N / current)[:, None, None] * z[:, :, None] * z[:, None, :]
+        rz = r[:, :, None] * z[:, None, :]
+        K += ((M1 + M2) / current**2)[:, None, None] * (rz + np.swapaxes(rz, 1, 2))
+        return f, self.pattern.sparse(self.pattern.assemble(K))
+
+    def tangent(self, u_free):
+        """Factorize the tangent stiffness at a state and keep it for reuse"""
+        _, K = self._internal(u_free, tangent=True)
+        self._factorization = TangentFactorization(K)
+        self.stats['factorizations'] += 1
+        return self._factorization
+
+    def _newton(self, f_ext, u, tol, max_iterations, reuse_ratio):
+        """Newton-Raphson from u, reusing the held factorization while it contracts
+
+        Converged when the residual is within tol of the load or a step
+        changes the displacements by less than tol relative. Contraction is
+        judged on successive step sizes rather than residuals, which the
+        stiff axial terms inflate after every rotation. A held tangent is
+        refreshed at the current state when a step shrinks by less than
+        reuse_ratio, and the step is redone with a fresh one if it grew.
+        Returns (u, converged, iterations).
+        """
+        scale = np.linalg.norm(f_ext) or 1.0
+        residual = f_ext - self._internal(u)[0]
+        fresh = False
+        previous = None
+        for iteration in range(max_iterations):
+            if np.linalg.norm(residual) <= tol * scale:
+                return u, True, iteration
+            if self._factorization is None:
+                self.tangent(u)
+                fresh = True
+            if self._factorization.singular:
+                return u, False, iteration
+            step = self._factorization.solve(residual)
+            size = np.linalg.norm(step)
+            self.stats['iterations'] += 1
+            if not np.isfinite(size):
+                return u, False, iteration + 1
+            if previous is not None and size >= previous and not fresh:
+                # The held tangent no longer contracts: refactorize here and redo the step
+                self.tangent(u)
+                fresh = True
+                continue
+            u = u + step
+            if size <= tol * np.linalg.norm(u):
+                return u, True, iteration + 1
+            residual = f_ext - self._internal(u)[0]
+            if previous is not None and size > reuse_ratio * previous:
+                self.tangent(u)
+                fresh = True
+            else:
+                fresh = False
+            previous = size
+        return u, np.linalg.norm(residual) <= tol * scale, max_iterations
+
+    def _advance(self, f_start, f_end, u, guess, tol, max_iterations, reuse_ratio, max_cutbacks,
+                 keep_stable=False):
+        """Equilibrium at f_end starting from equilibrium u at f_start
+
+        The whole increment is tried first from guess; on failure it is
+        bisected from the last converged state, up to max_cutbacks times.
+        With keep_stable, u is taken to be stable and a substep landing on
+        an unstable state counts as a failure too, since large increments
+        can jump across to another equilibrium branch; once the cutbacks
+        are spent the unstable state is accepted as a real loss of
+        stability. Returns (u, converged, iterations, stable), where stable
+        is None without keep_stable.
+        """
+        done, step, cutbacks, iterations = 0.0, 1.0, 0, 0
+        trial_start = guess
+        stable = True if keep_stable else None
+        while done < 1:
+            target = min(1.0, done + step)
+            u_new, converged, used = self._newton(f_start + target * (f_end - f_start), trial_start.copy(),
+                                                  tol, max_iterations, reuse_ratio)
+            iterations += used
+            if converged and stable:
+                # The held factorization may be stale; inertia needs the exact tangent
+                stable = self.tangent(u_new).negative_pivots == 0
+                converged = stable or cutbacks >= max_cutbacks
+                if not converged:
+                    stable = True
+            if converged:
+                u, done = u_new, target
+                trial_start = u
+            else:
+                cutbacks += 1
+                if cutbacks > max_cutbacks:
+                    return u, False, iterations, stable
+                step /= 2
+                trial_start = u
+                self._factorization = None
+        return u, True, iterations, stable
+
+    @profiled('nonlinear.solve')
+    def solve(self, node_loads, u0=None, steps=1, tol=1e-9, max_iterations=25, reuse_ratio=0.25,
+              max_cutbacks=10):
+        """Equilibrium under (n_nodes, 3) nodal loads by load-stepped Newton-Raphson
+
+        Starts from the unloaded frame, or from free-DOF displacements u0
+        taken to be in equilibrium with no load, in `steps` equal load
+        increments. Returns (displacements (n_nodes, 3), converged).
+        """
+        f = self.loads(node_loads)
+        u = np.zeros(len(self.free_dofs)) if u0 is None else np.asarray(u0, dtype=float)
+        self.stats['solves'] += 1
+        converged = True
+        for step in range(steps):
+            u, converged, _, _ = self._advance(f * step / steps, f * (step + 1) / steps, u, u,
+                                               tol, max_iterations, reuse_ratio, max_cutbacks)
+            if not converged:
+                break
+        return self.displacements(u), converged
+
+    @profiled('nonlinear.sweep')
+    def sweep(self, node_loads, factors, tol=1e-9, max_iterations=25, reuse_ratio=0.25, max_cutbacks=10,
+              check_stability=True, stop_on_failure=True):
+        """Nonlinear response along increasing multiples of a load pattern
+
+        Each factor starts from a secant extrapolation of the last two
+        converged states and from the tangent factorization still held, so
+        smooth sweeps mostly converge in a couple of iterations without
+        refactorizing. With check_stability the tangent is factorized at
+        every converged point, which also hands the next point an exact
+        Jacobian, and its inertia gives the stability: a negative pivot
+        means the frame has passed a bifurcation or limit point. Increments
+        from a stable state that land on an unstable one are bisected
+        first, so the sweep follows the stable branch of imperfect members
+        past their buckling load. Returns a dict of per-factor arrays
+        'displacements' (steps, n_nodes, 3), 'member_forces' (steps,
+        n_elements, 3), 'converged', 'stable' and 'iterations', plus
+        'critical_factor', the first factor found unstable or unreachable
+        (inf if none).
+        """
+        factors = np.asarray(factors, dtype=float)
+        f = self.loads(node_loads)
+        n = len(factors)
+        displacements = np.full((n, len(self.nodes), DOF_PER_NODE), np.nan)
+        forces = np.full((n, len(self.elements), 3), np.nan)
+        converged = np.zeros(n, dtype=bool)
+        stable = np.zeros(n, dtype=bool)
+        iterations = np.zeros(n, dtype=np.int64)
+        critical = np.inf
+
+        u = np.zeros(len(self.free_dofs))
+        history = [(0.0, u)]
+        for i, factor in enumerate(factors):
+            previous_factor, u = history[-1]
+            if len(history) > 1 and history[-1][0] != history[-2][0]:
+                (f0, u_0), (f1, u_1) = history[-2:]
+                guess = u_1 + (factor - f1) / (f1 - f0) * (u_1 - u_0)
+            else:
+                guess = u
+            self.stats['solves'] += 1
+            u_new, ok, used, is_stable = self._advance(previous_factor * f, factor * f, u, guess, tol,
+                                                       max_iterations, reuse_ratio, max_cutbacks,
+                                                       keep_stable=check_stability and bool(stable[:i].all()))
+            iterations[i] = used
+            if not ok:
+                critical = min(critical, factor)
+                if stop_on_failure:
+                    break
+                continue
+            converged[i] = True
+            displacements[i] = self.displacements(u_new)
+            forces[i] = self.member_forces(u_new)
+            if check_stability:
+                if is_stable is None:
+                    is_stable = self.tangent(u_new).negative_pivots == 0
+                stable[i] = is_stable
+                if not stable[i]:
+                    critical = min(critical, factor)
+            history = history[-1:] + [(factor, u_new)]
+
+        return {'factors': factors, 'displacements': displacements, 'member_forces': forces,
+                'converged': converged, 'stable': stable, 'iterations': iterations,
+                'critical_factor': critical}
+
+    def linear_buckling(self, node_loads, modes=1):
+        """Critical multiples of a load pattern from linearized buckling
+
+        Solves (K₀ + λ K_G) φ = 0, where K_G is the consistent geometric
+        stiffness of the axial forces from a linear solve under the pattern.
+        Returns (factors, mode shapes (modes, n_nodes, 3)); factors are inf
+        where the pattern puts nothing in compression.
+        """
+        zero = np.zeros(len(self.free_dofs))
+        _, K0 = self._internal(zero, tangent=True)
+        K0 = K0.toarray()
+        ue = self.displacements(np.linalg.solve(K0, self.loads(node_loads)))[self.elements]
+        # Linearized axial force; the co-rotational stretch would add the
+        # second-order shortening of the bending displacements
+        N = self.EA / self.length * np.einsum('ei,ei->e', self._direction, ue[:, 1, :2] - ue[:, 0, :2])
+
+        # Transverse geometric stiffness over [v1, θ1, v2, θ2] in element axes
+        L = self.length
+        g = np.zeros((len(L), 6, 6))
+        transverse = np.array([1, 2, 4, 5])
+        g[:, transverse[:, None], transverse] = (N / (30 * L))[:, None, None] * np.array(
+            [[36, 3, -36, 3], [3, 4, -3, -1], [-36, -3, 36, -3], [3, -1, -3, 4]]
+        ) * L[:, None, None]**frame_fem.BENDING_POWERS
+        c, s = self._direction[:, 0], self._direction[:, 1]
+        T = np.zeros((len(L), 6, 6))
+        for offset in (0, 3):
+            T[:, offset, offset] = T[:, offset + 1, offset + 1] = c
+            T[:, offset, offset + 1] = s
+            T[:, offset + 1, offset] = -s
+            T[:, offset + 2, offset + 2] = 1
+        KG = self.pattern.dense(self.pattern.assemble(np.einsum('eji,ejk,ekl->eil', T, g, T)))
+
+        # K_G φ = μ K₀ φ through the Cholesky factor of K₀; buckling at λ = -1/μ for μ < 0
+        chol = np.linalg.cholesky(K0)
+        chol_inv = np.linalg.inv(chol)
+        mu, vectors = np.linalg.eigh(chol_inv @ KG @ chol_inv.T)
+        order = np.argsort(mu)[:modes]
+        # Round-off leaves tiny negative μ when nothing is in compression
+        buckles = mu[order] < -len(mu) * np.finfo(float).eps * np.abs(mu).max()
+        factors = np.where(buckles, -1 / np.where(buckles, mu[order], -1), np.inf)
+        shapes = (chol_inv.T @ vectors[:, order]).T
+        return factors, np.stack([self.displacements(shape) for shape in shapes])
+
+def cantilever(length, E, A, I, elements=16, angle=0.0):
+    """Arm clamped at node 0 with its tip at node `elements`
+
+    angle (degrees) tilts the arm from +X, negative for droop below the hub
+    when +Y is the thrust direction.
+    """
+    t = np.linspace(0, length, elements + 1)
+    direction = np.array([np.cos(np.radians(angle)), np.sin(np.radians(angle))])
+    nodes = t[:, None] * direction
+    connectivity = np.stack([np.arange(elements), np.arange(1, elements + 1)], axis=-1)
+    return NonlinearFrame(nodes, connectivity, E, A, I, node_dofs(0))
+
+def column(length, E, A, I, elements=16, imperfection=0.0, ends='pinned'):
+    """Column along +X from node 0 to node `elements` with a half-sine bow
+
+    imperfection is the mid-span bow amplitude (m) that lets the nonlinear
+    solve leave the straight path. ends is 'pinned' (node 0 pinned, far
+    end on a roller along X) or 'fixed' (both ends clamped, the far end
+    free to slide along X).
+    """
+    x = np.linspace(0, length, elements + 1)
+    nodes = np.stack([x, imperfection * np.sin(np.pi * x / length)], axis=-1)
+    connectivity = np.stack([np.arange(elements), np.arange(1, elements + 1)], axis=-1)
+    if ends == 'pinned':
+        fixed = np.concatenate([node_dofs(0, (0, 1)), node_dofs(elements, (1,))])
+    elif ends == 'fixed':
+        fixed = np.concatenate([node_dofs(0), node_dofs(elements, (1, 2))])
+    else:
+        raise ValueError(f"Unknown column ends {ends!r}, expected 'pinned' or 'fixed'")
+    return NonlinearFrame(nodes, connectivity, E, A, I, fixed)
+
+def tip_load(frame, force, node=-1):
+    """(n_nodes, 3) load pattern with one [Fx, Fy] force at a node"""
+    loads = np.zeros((len(frame.nodes), DOF_PER_NODE))
+    loads[node, :2] = force
+    return loads
+
+def arguments():
+    """Parent parser of the --nonlinear flag, also set by IPS_NONLINEAR"""
+    parser = argparse.ArgumentParser(add_help=False)
+    group = parser.add_argument_group('nonlinear')
+    group.add_argument('--nonlinear', action='store_true',
+                       default=os.environ.get('IPS_NONLINEAR', '') not in ('', '0'),
+                       help='add geometrically nonlinear and buckling checks of Question 2')
+    return parser
+
+def configure(args):
+    """Whether the nonlinear check runs, from flags parsed with arguments()"""
+    return args.nonlinear
@@ -0,0 +1,234 @@
+"""
+Frame design optimizer
+Searches frame type, arm length, width, tube size and material for the
+Pareto front of stability against deformation against mass
+"""
+
+import numpy as np
+
+import frame_design
+from instrument import profiled
+from materials import MATERIALS
+from sections import section_properties
+
+# Search ranges (m); the Question 3 sweeps span the same arm lengths and widths
+DESIGN_BOUNDS = {
+    'arm_length': (0.2, 0.6),
+    'width': (0.05, 0.25),
+    'tube_diameter': (0.010, 0.030),
+    'tube_thickness': (0.0005, 0.005),
+}
+FRAME_TYPES = ('X-frame', 'H-frame')
+MAX_WALL_FRACTION = 0.45  # wall thickness as a fraction of the outer diameter
+
+@profiled()
+def evaluate_designs(designs, motor_force, materials=MATERIALS, catalogue=None):
+    """Deflection, stress, safety factor, mass and stability of candidate frames
+
+    designs holds equal-length arrays 'frame_type', 'arm_length', 'width',
+    'material' (row in materials) and either 'tube_diameter' and
+    'tube_thickness' or 'section' (index into a sections.SectionCatalogue).
+    """
+    E = materials.column('youngs_modulus')[designs['material']]
+    strength = materials.column('tensile_strength')[designs['material']]
+    density = materials.column('density')[designs['material']]
+    if 'section' in designs:
+        section = catalogue.properties(designs['section'])
+    else:
+        section = section_properties('circular_tube', diameter=designs['tube_diameter'],
+                                     thickness=designs['tube_thickness'])
+    area, I = section.area, section.I
+
+    _, _, displacement, arm_lengths = frame_design.analyze_frame_batch(
+        designs['frame_type'], designs['arm_length'], designs['width'], motor_force, E, I
+    )
+    stress = frame_design.bending_stress(motor_force, arm_lengths[..., 0], 2 * section.c, I)
+    is_x = designs['frame_type'] == 'X-frame'
+    return {
+        'max_displacement': displacement,
+        'bending_stress': stress,
+        'safety_factor': frame_design.safety_factor(stress, strength),
+        'mass': density * area * arm_lengths.sum(axis=-1),
+        # Moment arm for roll/pitch control, as scored in Question 4
+        'stability_arm': np.where(is_x, np.sqrt(2) * designs['arm_length'], designs['width']),
+    }
+
+def pareto_front(objectives, block=512):
+    """Indices of non-dominated rows when every column is minimized
+
+    Rows are sorted lexicographically, so a row can only be dominated by
+    rows before it. Two or three objectives use an O(n log n) sweep;
+    more objectives compare blocks of rows against the survivors so far.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    if len(objectives) == 0:
+        return np.zeros(0, dtype=np.intp)
+    # Exact duplicates never dominate each other; solve on unique rows
+    unique, inverse = np.unique(objectives, axis=0, return_inverse=True)
+    if unique.shape[1] <= 3:
+        keep = _front_sweep(np.pad(unique, ((0, 0), (0, 3 - unique.shape[1]))))
+    else:
+        keep = _front_blocked(unique, block)
+    return np.flatnonzero(keep[inverse.ravel()])
+
+def _front_sweep(unique):
+    """Non-dominated mask for lexicographically sorted, unique 3-column rows
+
+    Walking in order, a row is dominated iff an earlier row is no worse in
+    columns 1 and 2; a Fenwick tree over column-1 ranks holds the running
+    minimum of column 2.
+    """
+    # Plain lists: the per-row loop is cheaper without NumPy scalar boxing
+    rank = (np.unique(unique[:, 1], return_inverse=True)[1].ravel() + 1).tolist()
+    col2 = unique[:, 2].tolist()
+    size = max(rank) + 1
+    tree = [np.inf] * size
+    keep = [False] * len(col2)
+    for i, (r0, value) in enumerate(zip(rank, col2)):
+        r, best = r0, np.inf
+        while r > 0:
+            if tree[r] < best:
+                best = tree[r]
+            r -= r & -r
+        keep[i] = best > value
+        r = r0
+        while r < size:
+            if value < tree[r]:
+                tree[r] = value
+            r += r & -r
+    keep = np.array(keep, dtype=bool)
+    return keep
+
+def _front_blocked(unique, block):
+    dominated = np.zeros(len(unique), dtype=bool)
+    for start in range(0, len(unique), block):
+        stop = min(start + block, len(unique))
+        rows = unique[start:stop]
+        rivals = unique[:stop][~dominated[:stop]]
+        no_worse = np.all(rivals[:, None, :] <= rows[None], axis=2)
+        better = np.any(rivals[:, None, :] < rows[None], axis=2)
+        dominated[start:stop] = np.any(no_worse & better, axis=0)
+    return ~dominated
+
+def crowding_distance(objectives):
+    """NSGA-II crowding distance of each row; per-objective extremes are infinite
+
+    A row's distance is the sum over objectives of the gap between its
+    neighbours in that objective, normalized by the objective's range.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    distance = np.zeros(len(objectives))
+    if len(objectives) < 3:
+        distance[:] = np.inf
+        return distance
+    for column in objectives.T:
+        order = np.argsort(column, kind='stable')
+        values = column[order]
+        span = values[-1] - values[0]
+        if span > 0:
+            distance[order[1:-1]] += (values[2:] - values[:-2]) / span
+        distance[order[[0, -1]]] = np.inf
+    return distance
+
+def thin_front(objectives, size):
+    """Indices of the `size` most spread-out rows, always keeping the extremes
+
+    Rows are ranked by crowding distance with ties broken by index, so the
+    selection is deterministic.
+    """
+    distance = crowding_distance(objectives)
+    if len(distance) <= size:
+        return np.arange(len(distance))
+    return np.sort(np.argsort(-distance, kind='stable')[:size])
+
+def _sample(rng, n, bounds, choices):
+    designs = {name: rng.uniform(low, high, n) for name, (low, high) in bounds.items()}
+    for name, options in choices.items():
+        designs[name] = rng.choice(options, n)
+    return designs
+
+def _mutate(rng, parents, n, bounds, choices, scale=0.05, flip=0.1):
+    pick = rng.integers(0, len(parents['arm_length']), n)
+    designs = {name: values[pick] for name, values in parents.items()}
+    for name, (low, high) in bounds.items():
+        designs[name] = np.clip(designs[name] + rng.normal(0, scale * (high - low), n), low, high)
+    for name, options in choices.items():
+        flipped = rng.random(n) < flip
+        designs[name] = np.where(flipped, rng.choice(options, n), designs[name])
+    return designs
+
+@profiled()
+def optimize_frame(motor_force=20, min_safety_factor=3.0, max_displacement=0.005,
+                   materials=MATERIALS, material_names=None, frame_types=FRAME_TYPES,
+                   bounds=DESIGN_BOUNDS, catalogue=None, population=4096, iterations=25,
+                   max_front=1000, seed=0):
+    """Pareto-optimal frames under safety-factor and displacement limits
+
+    Each iteration scores `population` candidates in one vectorized pass:
+    half are drawn uniformly from the bounds, half are mutations of the
+    current front. Designs that fail either constraint are discarded, and
+    the front over (stability arm, deformation, mass) is thinned to its
+    max_front members of largest crowding distance (see thin_front), which
+    bounds both the archive and the cost of each iteration. With a
+    sections.SectionCatalogue the tube diameter and thickness are replaced
+    by a choice of catalogue section. Returns a dict of arrays for the
+    front, sorted by mass, with design variables, material (and section)
+    names and responses.
+    """
+    rng = np.random.default_rng(seed)
+    names = materials.names if material_names is None else list(material_names)
+    choices = {'frame_type': np.asarray(frame_types), 'material': materials.rows(names)}
+    if catalogue is not None:
+        bounds = {name: limits for name, limits in bounds.items() if not name.startswith('tube_')}
+        choices['section'] = np.arange(len(catalogue))
+
+    front = None
+    for iteration in range(iterations):
+        if front is None:
+            designs = _sample(rng, population, bounds, choices)
+        else:
+            n_new = population // 2
+            fresh = _sample(rng, n_new, bounds, choices)
+            mutated = _mutate(rng, front, population - n_new, bounds, choices)
+            designs = {name: np.concatenate([fresh[name], mutated[name]]) for name in fresh}
+
+        if 'tube_thickness' in designs:
+            # Walls thicker than the tube can hold are clipped back to a valid section
+            designs['tube_thickness'] = np.minimum(designs['tube_thickness'],
+                                                   MAX_WALL_FRACTION * designs['tube_diameter'])
+        responses = evaluate_designs(designs, motor_force, materials, catalogue)
+        feasible = ((responses['safety_factor'] >= min_safety_factor)
+                    & (responses['max_displacement'] <= max_displacement))
+        candidates = {name: values[feasible] for name, values in {**designs, **responses}.items()}
+
+        if front is not None:
+            candidates = {name: np.concatenate([front[name], candidates[name]]) for name in front}
+        if len(candidates['mass']) == 0:
+            continue
+        objectives = np.column_stack([-candidates['stability_arm'],
+                                      candidates['max_displacement'],
+                                      candidates['mass']])
+        keep = pareto_front(objectives)
+        keep = keep[thin_front(objectives[keep], max_front)]
+        front = {name: values[keep] for name, values in candidates.items()}
+
+    if front is None:
+        raise ValueError('No design satisfies the safety-factor and displacement limits')
+    order = np.argsort(front['mass'], kind='stable')
+    front = {name: values[order] for name, values in front.items()}
+    front['material_name'] = np.asarray(materials.data['name'])[front['material']]
+    if catalogue is not None:
+        front['section_name'] = np.asarray(catalogue.names)[front['section']]
+    return front
+
+def recommend_design(front, mass_budget):
+    """Front member with the best Question 4 performance ratio within a mass budget
+
+    The ratio is stability arm per mm of deformation. Returns the row index
+    into front, or None if no design is light enough.
+    """
+    ratio = front['stability_arm'] / (front['max_displacement'] * 1000)
+    light = np.flatnonzero(front['mass'] <= mass_budget)
+    if len(light) == 0:
+        return None
+    return light[np.argmax(ratio[light])]
@@ -0,0 +1,125 @@
+"""
+Figure output helpers shared by the analysis scripts
+Figures are shown interactively, exported headless to disk, or skipped entirely
+"""
+
+import argparse
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from instrument import span
+
+# Plot modes: 'show' keeps the original blocking plt.show() behaviour,
+# 'save' writes every figure to disk without a display, 'off' skips plotting
+PLOT_MODES = ('show', 'save', 'off')
+
+class FigureExporter:
+    """Create figures and route them to the screen, to disk, or nowhere
+
+    Figures are written inline by default. Agg rendering holds the GIL, so
+    writer threads (workers > 0) do not speed up a run and slow down the
+    numerical work beside them; they only return control sooner.
+    """
+
+    def __init__(self, mode='show', output_dir='.', workers=0, dpi=150):
+        if mode not in PLOT_MODES:
+            raise ValueError(f'Unknown plot mode {mode!r}, expected one of {PLOT_MODES}')
+        self.mode = mode
+        self.output_dir = output_dir
+        self.dpi = dpi
+        self.saved = []
+        self._futures = []
+        self._pool = None
+        if mode == 'save':
+            os.makedirs(output_dir, exist_ok=True)
+            if workers > 0:
+                self._pool = ThreadPoolExecutor(max_workers=workers)
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    @staticmethod
+    def arguments(default_dir):
+        """Parent parser of the figure flags, defaulting from IPS_PLOT* variables"""
+        parser = argparse.ArgumentParser(add_help=False)
+        group = parser.add_argument_group('figures')
+        group.add_argument('--headless', action='store_true',
+                           help='save figures to disk instead of showing them')
+        group.add_argument('--no-plots', action='store_true',
+                           help='skip all plotting')
+        group.add_argument('--plot-dir', default=os.environ.get('IPS_PLOT_DIR', default_dir),
+                           help='directory for saved figures')
+        group.add_argument('--plot-workers', type=int,
+                           default=int(os.environ.get('IPS_PLOT_WORKERS', 0)),
+                           help='threads used to write figures (default 0, inline)')
+        return parser
+
+    @classmethod
+    def from_args(cls, args):
+        """Build an exporter from flags parsed with arguments() and IPS_PLOTS"""
+        mode = os.environ.get('IPS_PLOTS', 'show')
+        if args.headless:
+            mode = 'save'
+        if args.no_plots:
+            mode = 'off'
+        return cls(mode, args.plot_dir, args.plot_workers)
+
+    def figure(self, figsize):
+        """Return a new figure, or None when plotting is off"""
+        if self.mode == 'off':
+            return None
+        if self.mode == 'save':
+            # Figures outside pyplot are not kept alive by its registry,
+            # so they are freed as soon as they have been written out
+            from matplotlib.figure import Figure
+            return Figure(figsize=figsize)
+        import matplotlib.pyplot as plt
+        return plt.figure(figsize=figsize)
+
+    def subplots(self, nrows, ncols, figsize):
+        """Return (figure, axes) like plt.subplots"""
+        fig = self.figure(figsize)
+        return fig, fig.subplots(nrows, ncols)
+
+    def save(self, fig, filename):
+        """Hand a finished figure over for export; only acts in 'save' mode"""
+        if self.mode != 'save':
+            return
+        path = os.path.join(self.output_dir, filename)
+        if self._pool is None:
+            _write_figure(fig, path, self.dpi)
+        else:
+            self._futures.append(self._pool.submit(_write_figure, fig, path, self.dpi))
+        self.saved.append(path)
+
+    def restore(self, source, filename):
+        """Copy an already rendered figure into place instead of drawing it"""
+        if self.mode != 'save':
+            return
+        path = os.path.join(self.output_dir, filename)
+        shutil.copyfile(source, path)
+        self.saved.append(path)
+
+    def flush(self):
+        """Wait until every figure handed to save() is on disk"""
+        for future in self._futures:
+            future.result()
+        self._futures = []
+
+    def finish(self):
+        """Wait for pending exports, or block on plt.show() in 'show' mode"""
+        if self.mode == 'show':
+            import matplotlib.pyplot as plt
+            plt.show()
+            return
+        self.flush()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+def _write_figure(fig, path, dpi):
+    with span('write_figure'):
+        fig.savefig(path, dpi=dpi)
+        fig.clear()
@@ -0,0 +1,324 @@
+"""
+Content-addressed cache for the analysis steps of the scripts
+A step (one question) is keyed by a hash of its code and of every input it
+reads: the source of the step and of the functions it calls, the local
+modules it uses, the module-level constants it references (materials,
+geometry, force arrays) and its arguments. A hit replays the printed report
+and copies the saved figures instead of recomputing
+"""
+
+import argparse
+import hashlib
+import importlib
+import inspect
+import io
+import json
+import os
+import shutil
+import sys
+import time
+import types
+import uuid
+from contextlib import redirect_stdout
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Per-user cache directory, never the source tree
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                         'ips-analytic-lab', 'results')
+ENTRY_FILE = 'entry.json'
+FIGURE_DIR = 'figures'
+STDOUT_FILE = 'stdout.txt'
+
+def _is_local(path):
+    return path is not None and os.path.dirname(os.path.abspath(path)) == HERE
+
+def _local_module(name):
+    """Module of this directory by import name, imported on demand, or None"""
+    module = sys.modules.get(name)
+    if module is None:
+        if not os.path.exists(os.path.join(HERE, f'{name}.py')):
+            return None
+        module = importlib.import_module(name)
+    return module if _is_local(getattr(module, '__file__', None)) else None
+
+def _encode(value):
+    """Canonical bytes for a constant input, or None for values that are not data"""
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value).encode()
+    if isinstance(value, (np.ndarray, np.generic)):
+        value = np.ascontiguousarray(value)
+        return f'{value.dtype.str}{value.shape}'.encode() + value.tobytes()
+    if isinstance(value, (list, tuple)):
+        parts = [_encode(item) for item in value]
+        if any(part is None for part in parts):
+            return None
+        return type(value).__name__.encode() + b''.join(repr(len(p)).encode() + b':' + p for p in parts)
+    if isinstance(value, dict):
+        items = [(repr(k).encode(), _encode(v)) for k, v in sorted(value.items(), key=lambda kv: repr(kv[0]))]
+        if any(part is None for _, part in items):
+            return None
+        return b'dict' + b''.join(k + b'=' + v + b';' for k, v in items)
+    if _is_local(getattr(sys.modules.get(type(value).__module__), '__file__', None)):
+        # Objects of this package (e.g. the material table): their public state
+        try:
+            public = {k: v for k, v in vars(value).items() if not k.startswith('_')}
+        except TypeError:
+            return None
+        encoded = _encode(public)
+        return None if encoded is None else type(value).__qualname__.encode() + encoded
+    return None
+
+class _Dependencies:
+    """Walks a step function and collects the code and data it depends on"""
+
+    def __init__(self):
+        self.sources = {}
+        self.files = set()
+        self.values = {}
+        self._seen = set()
+
+    def add_function(self, func):
+        if id(func) in self._seen:
+            return
+        self._seen.add(id(func))
+        try:
+            self.sources[func.__qualname__] = inspect.getsource(func)
+        except (OSError, TypeError):
+            self.sources[func.__qualname__] = func.__code__.co_code.hex()
+        for name in _global_names(func.__code__):
+            self._add_name(name, func.__globals__)
+
+    def _add_name(self, name, namespace):
+        if name in namespace:
+            value = namespace[name]
+        else:
+            value = _local_module(name)
+            if value is None:
+                return
+        if isinstance(value, types.ModuleType):
+            self.add_module(value)
+        elif isinstance(value, (types.FunctionType, type)):
+            if isinstance(value, types.FunctionType):
+                # Look through decorators such as instrument.profiled
+                value = inspect.unwrap(value)
+            module = sys.modules.get(value.__module__)
+            if module is None or not _is_local(getattr(module, '__file__', None)):
+                return
+            if isinstance(value, types.FunctionType) and value.__globals__ is namespace:
+                # Same script: depend on just that function, not the whole file
+                self.add_function(value)
+            else:
+                self.add_module(module)
+        else:
+            encoded = _encode(value)
+            if encoded is not None:
+                self.values[name] = encoded
+            self._add_type(value)
+
+    def _add_type(self, value):
+        """Module defining the class of a local object, such as the material table"""
+        owner = sys.modules.get(type(value).__module__)
+        if owner is not None:
+            self.add_module(owner)
+
+    def add_module(self, module):
+        """The module's file and, transitively, the local modules it uses"""
+        path = getattr(module, '__file__', None)
+        if not _is_local(path) or path in self.files:
+            return
+        self.files.add(path)
+        for value in list(vars(module).values()):
+            if isinstance(value, types.ModuleType):
+                self.add_module(value)
+            elif isinstance(value, (types.FunctionType, type)):
+                owner = sys.modules.get(value.__module__)
+                if owner is not None:
+                    self.add_module(owner)
+            else:
+                self._add_type(value)
+
+    def digest(self, name, args):
+        h = hashlib.sha256()
+        h.update(f'{name}\0python {sys.version_info[:2]}\0numpy {np.__version__}\0'.encode())
+        for qualname in sorted(self.sources):
+            h.update(f'def {qualname}\0{self.sources[qualname]}\0'.encode())
+        for path in sorted(self.files):
+            with open(path, 'rb') as f:
+                h.update(os.path.basename(path).encode() + b'\0' + hashlib.sha256(f.read()).digest())
+        for key in sorted(self.values):
+            h.update(f'{key}='.encode() + hashlib.sha256(self.values[key]).digest())
+        for arg in args:
+            encoded = _encode(arg)
+            if encoded is None:
+                raise TypeError(f'Cannot hash step argument of type {type(arg).__name__}')
+            h.update(b'arg' + hashlib.sha256(encoded).digest())
+        return h.hexdigest()
+
+def _global_names(code):
+    """Global and attribute names used by a code object and its nested functions"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+class _Tee(io.TextIOBase):
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = io.StringIO()
+
+    def write(self, text):
+        self.buffer.write(text)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+class ResultCache:
+    """On-disk cache of step reports and figures with least-recently-used eviction"""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=512 * 2**20, enabled=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.log = []
+
+    @staticmethod
+    def arguments():
+        """Parent parser of the --cache / --cache-dir / --cache-max-mb flags and IPS_CACHE* variables
+
+        The cache is off unless --cache or IPS_CACHE=1 turns it on.
+        """
+        parser = argparse.ArgumentParser(add_help=False)
+        group = parser.add_argument_group('result cache')
+        group.add_argument('--cache', dest='cache', action='store_true',
+                           default=os.environ.get('IPS_CACHE', '0') not in ('', '0'),
+                           help='replay unchanged steps from the result cache')
+        group.add_argument('--no-cache', dest='cache', action='store_false',
+                           help='recompute every step (default)')
+        group.add_argument('--cache-dir', default=os.environ.get('IPS_CACHE_DIR', CACHE_DIR),
+                           help='directory of the step result cache')
+        group.add_argument('--cache-max-mb', type=float,
+                           default=float(os.environ.get('IPS_CACHE_MAX_MB', 512)),
+                           help='evict least recently used entries above this size')
+        return parser
+
+    @classmethod
+    def from_args(cls, args):
+        """Build a cache from flags parsed with arguments()"""
+        return cls(args.cache_dir, int(args.cache_max_mb * 2**20), args.cache)
+
+    def key(self, name, func, plots, args=()):
+        deps = _Dependencies()
+        deps.add_function(inspect.unwrap(func))
+        return deps.digest(name, (plots.mode, plots.dpi, *args))
+
+    def run(self, name, func, plots, *args):
+        """Call func(plots, *args), or replay its cached report and figures
+
+        Steps showing figures interactively always run, since a cached PNG
+        cannot stand in for a window.
+        """
+        if not self.enabled or plots.mode == 'show':
+            return func(plots, *args)
+        start = time.perf_counter()
+        key = self.key(name, func, plots, args)
+        entry = os.path.join(self.directory, key)
+        if os.path.exists(os.path.join(entry, ENTRY_FILE)):
+            try:
+                self._replay(entry, plots)
+            except OSError:
+                pass
+            else:
+                self.log.append((name, 'hit', time.perf_counter() - start))
+                return None
+
+        tee = _Tee(sys.stdout)
+        first_figure = len(plots.saved)
+        with redirect_stdout(tee):
+            func(plots, *args)
+        plots.flush()
+        self._store(entry, name, tee.buffer.getvalue(), plots.saved[first_figure:])
+        self.log.append((name, 'miss', time.perf_counter() - start))
+        return None
+
+    def _replay(self, entry, plots):
+        with open(os.path.join(entry, STDOUT_FILE), encoding='utf-8') as f:
+            text = f.read()
+        with open(os.path.join(entry, ENTRY_FILE)) as f:
+            meta = json.load(f)
+        for filename in meta['figures']:
+            plots.restore(os.path.join(entry, FIGURE_DIR, filename), filename)
+        sys.stdout.write(text)
+        meta['last_used'] = time.time()
+        with open(os.path.join(entry, ENTRY_FILE), 'w') as f:
+            json.dump(meta, f)
+
+    def _store(self, entry, name, text, figures):
+        # Built under a temporary name and renamed, so concurrent runs never
+        # see a half-written entry
+        staging = f'{entry}.{uuid.uuid4().hex}.tmp'
+        os.makedirs(os.path.join(staging, FIGURE_DIR))
+        with open(os.path.join(staging, STDOUT_FILE), 'w', encoding='utf-8') as f:
+            f.write(text)
+        filenames = []
+        for path in figures:
+            filenames.append(os.path.basename(path))
+            shutil.copyfile(path, os.path.join(staging, FIGURE_DIR, filenames[-1]))
+        size = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(staging) for f in files)
+        now = time.time()
+        with open(os.path.join(staging, ENTRY_FILE), 'w') as f:
+            json.dump({'step': name, 'created': now, 'last_used': now, 'bytes': size,
+                       'figures': filenames}, f)
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            # Another run stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def entries(self):
+        """(key, metadata) of every complete entry"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for key in os.listdir(self.directory):
+            try:
+                with open(os.path.join(self.directory, key, ENTRY_FILE)) as f:
+                    found.append((key, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return found
+
+    def size(self):
+        return sum(meta['bytes'] for _, meta in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits; returns the keys removed"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries(), key=lambda item: item[1]['last_used'])
+        total = sum(meta['bytes'] for _, meta in entries)
+        removed = []
+        for key, meta in entries:
+            if total <= max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+            total -= meta['bytes']
+            removed.append(key)
+        return removed
+
+    def clear(self):
+        return self.evict(0)
+
+    def report(self, stream=sys.stderr):
+        """Print which steps were replayed and which ran"""
+        if not self.log:
+            return
+        hits = sum(status == 'hit' for _, status, _ in self.log)
+        print('\n=== RESULT CACHE ===', file=stream)
+        for name, status, seconds in self.log:
+            print(f'{name:24s} {status:5s} {seconds*1e3:10.1f} ms', file=stream)
+        print(f'{hits} hit(s), {len(self.log) - hits} miss(es); '
+              f'{self.size() / 2**20:.1f} MiB in {self.directory}', file=stream)
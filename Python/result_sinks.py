@@ -0,0 +1,168 @@
+"""
+Streaming writers for sweep results
+Chunks of columns are appended to disk as they arrive, so memory use does
+not grow with the number of design points
+"""
+
+import csv
+import os
+
+import numpy as np
+
+class NpySink:
+    """Directory of one .npy file per column, readable with np.load(mmap_mode='r')
+
+    Each file gets a fixed-size header that is rewritten with the final row
+    count on close, so rows are streamed straight to disk.
+    """
+
+    HEADER_BYTES = 256
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._files = {}
+        self._dtypes = {}
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, chunk):
+        for name, values in chunk.items():
+            values = np.ascontiguousarray(values)
+            if name not in self._files:
+                self._dtypes[name] = (values.dtype, values.shape[1:])
+                f = open(os.path.join(self.path, f'{name}.npy'), 'wb')
+                f.write(_npy_header(values.dtype, (0,) + values.shape[1:], self.HEADER_BYTES))
+                self._files[name] = f
+            dtype, row_shape = self._dtypes[name]
+            if values.dtype != dtype or values.shape[1:] != row_shape:
+                raise ValueError(f'Column {name!r} changed from {dtype}{row_shape} '
+                                 f'to {values.dtype}{values.shape[1:]}')
+            self._files[name].write(values.tobytes())
+        self.rows += len(next(iter(chunk.values()))) if chunk else 0
+
+    def close(self):
+        for name, f in self._files.items():
+            dtype, row_shape = self._dtypes[name]
+            f.seek(0)
+            f.write(_npy_header(dtype, (self.rows,) + row_shape, self.HEADER_BYTES))
+            f.close()
+        self._files = {}
+
+class CsvSink:
+    """Plain CSV with a header row; multi-valued columns are flattened"""
+
+    def __init__(self, path, float_format='%.9g'):
+        self.path = path
+        self.float_format = float_format
+        self.rows = 0
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._header = None
+
+    def write(self, chunk):
+        columns = []
+        names = []
+        for name, values in chunk.items():
+            values = np.asarray(values)
+            flat = values.reshape(len(values), -1)
+            if values.dtype.kind == 'f':
+                flat = np.char.mod(self.float_format, flat)
+            for j in range(flat.shape[1]):
+                names.append(name if flat.shape[1] == 1 else f'{name}_{j}')
+                columns.append(flat[:, j].tolist())
+        if self._header is None:
+            self._header = names
+            self._writer.writerow(names)
+        self._writer.writerows(zip(*columns))
+        self.rows += len(columns[0]) if columns else 0
+
+    def close(self):
+        self._file.close()
+
+class ParquetSink:
+    """Parquet file written one row group per chunk (needs pyarrow)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('Parquet output needs pyarrow; use a .csv path or a directory instead') from None
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.rows = 0
+        self._writer = None
+
+    def write(self, chunk):
+        table = self._pa.table({name: list(np.asarray(values)) if np.ndim(values) > 1 else np.asarray(values)
+                                for name, values in chunk.items()})
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+class ReportSink:
+    """Human-readable lines formatted from each row, e.g. the old f-string prints
+
+    template uses str.format fields named after the columns, such as
+    'Force = {motor_force:.0f} N: Stress = {bending_stress:.2e} Pa'.
+    """
+
+    def __init__(self, stream, template):
+        self.stream = stream
+        self.template = template
+        self.rows = 0
+
+    def write(self, chunk):
+        names = list(chunk)
+        lines = (self.template.format(**dict(zip(names, row)))
+                 for row in zip(*(np.asarray(chunk[name]).tolist() for name in names)))
+        self.stream.write('\n'.join(lines) + '\n')
+        self.rows += len(chunk[names[0]]) if names else 0
+
+    def close(self):
+        self.stream.flush()
+
+class TeeSink:
+    """Send every chunk to several sinks"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def write(self, chunk):
+        for sink in self.sinks:
+            sink.write(chunk)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+def open_sink(path):
+    """Pick a sink from the path: .csv, .parquet, otherwise a .npy directory"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return CsvSink(path)
+    if ext in ('.parquet', '.pq'):
+        return ParquetSink(path)
+    return NpySink(path)
+
+def load_npy_results(path, mmap_mode='r'):
+    """Open every column written by NpySink"""
+    return {os.path.splitext(name)[0]: np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+            for name in sorted(os.listdir(path)) if name.endswith('.npy')}
+
+def _npy_header(dtype, shape, total_bytes):
+    """NPY v1.0 header padded to a fixed size so it can be rewritten in place"""
+    header = repr({'descr': np.lib.format.dtype_to_descr(dtype),
+                   'fortran_order': False, 'shape': tuple(shape)})
+    magic = b'\x93NUMPY\x01\x00'
+    body_len = total_bytes - len(magic) - 2
+    header = header.ljust(body_len - 1) + '\n'
+    if len(header) != body_len:
+        raise ValueError(f'NPY header for {dtype} {shape} does not fit in {total_bytes} bytes')
+    return magic + body_len.to_bytes(2, 'little') + header.encode('latin1')
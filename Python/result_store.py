@@ -0,0 +1,194 @@
+"""
+Memory-mapped store for sweep results
+A result directory holds one .npy per column plus meta.json describing the
+parameter axes, units and material IDs, so reopening is zero-copy
+"""
+
+import json
+import os
+
+import numpy as np
+
+from result_sinks import NpySink
+from sweep import ParameterGrid, as_points, run_sweep
+
+META_FILE = 'meta.json'
+
+# Units of the columns produced by the analysis kernels
+DEFAULT_UNITS = {
+    'arm_length': 'm',
+    'arm_length_actual': 'm',
+    'width': 'm',
+    'thickness': 'm',
+    'length': 'm',
+    'motor_force': 'N',
+    'force': 'N',
+    'youngs_modulus': 'Pa',
+    'moment_of_inertia': 'm^4',
+    'max_displacement': 'm',
+    'deformation': 'm',
+    'strain': '',
+    'stress': 'Pa',
+    'bending_stress': 'Pa',
+    'safety_factor': '',
+}
+
+class ResultStoreSink(NpySink):
+    """NpySink that dictionary-encodes text columns and writes meta.json on close
+
+    Text columns such as frame_type or material are stored as int32 codes;
+    their labels go into the metadata.
+    """
+
+    def __init__(self, path, axes=None, units=None, materials=None):
+        super().__init__(path)
+        self.axes = axes
+        self.units = {**DEFAULT_UNITS, **(units or {})}
+        self.materials = list(materials) if materials is not None else None
+        self._labels = {}
+
+    def write(self, chunk):
+        encoded = {}
+        for name, values in chunk.items():
+            values = np.asarray(values)
+            if values.dtype.kind in 'USO':
+                labels = self._labels.setdefault(name, {})
+                uniques, inverse = np.unique(values, return_inverse=True)
+                codes = np.array([labels.setdefault(str(u), len(labels)) for u in uniques], dtype=np.int32)
+                values = codes[inverse.reshape(values.shape)]
+            encoded[name] = values
+        super().write(encoded)
+
+    def close(self):
+        super().close()
+        columns = {}
+        for name, (dtype, row_shape) in self._dtypes.items():
+            columns[name] = {'dtype': np.lib.format.dtype_to_descr(dtype),
+                             'shape': list(row_shape),
+                             'unit': self.units.get(name)}
+            if name in self._labels:
+                columns[name]['labels'] = list(self._labels[name])
+        meta = {
+            'rows': self.rows,
+            'columns': columns,
+            'axes': None if self.axes is None else
+                {name: np.asarray(values).tolist() for name, values in self.axes.items()},
+            'materials': self.materials,
+        }
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=1)
+
+def write_sweep(path, func, params, units=None, materials=None, **run_kwargs):
+    """Run a sweep straight into a result store; grid axes are recorded in the metadata"""
+    points = as_points(params)
+    axes = points.axes if isinstance(points, ParameterGrid) else None
+    sink = ResultStoreSink(path, axes=axes, units=units, materials=materials)
+    run_sweep(func, points, sink=sink, **run_kwargs)
+    return ResultStore(path)
+
+class ResultStore:
+    """Read-only, memory-mapped view of a result directory"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        self._columns = {}
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def __contains__(self, name):
+        return name in self.meta['columns']
+
+    def __getitem__(self, name):
+        """Column as a read-only memmap (text columns are their int codes)"""
+        if name not in self._columns:
+            if name not in self.meta['columns']:
+                raise KeyError(f'No column {name!r} in {self.path}')
+            self._columns[name] = np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+        return self._columns[name]
+
+    @property
+    def columns(self):
+        return list(self.meta['columns'])
+
+    @property
+    def axes(self):
+        return self.meta['axes']
+
+    @property
+    def materials(self):
+        return self.meta['materials']
+
+    def unit(self, name):
+        return self.meta['columns'][name]['unit']
+
+    def labels(self, name):
+        return self.meta['columns'][name].get('labels')
+
+    def decode(self, name, codes):
+        """Map int codes of a text column back to labels"""
+        return np.asarray(self.labels(name))[codes]
+
+    def _match(self, name, values, condition):
+        """Boolean mask of values satisfying one condition"""
+        labels = self.labels(name)
+        if callable(condition):
+            return np.asarray(condition(values if labels is None else self.decode(name, values)))
+        if isinstance(condition, tuple):
+            low, high = condition
+            mask = np.ones(len(values), dtype=bool)
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+            return mask
+        if labels is not None:
+            return values == (labels.index(condition) if condition in labels else -1)
+        if np.asarray(values).dtype.kind == 'f':
+            return np.isclose(values, condition)
+        return values == condition
+
+    def rows_where(self, **conditions):
+        """Sorted row indices matching every condition
+
+        A condition is a value (equality, labels allowed for text columns), a
+        (low, high) inclusive range with None for an open end, or a callable
+        on the column. When every condition names a grid axis the rows are
+        computed from the axes alone and no column data is read.
+        """
+        axes = self.axes
+        if axes is not None and conditions and all(name in axes for name in conditions):
+            per_axis = []
+            for name, values in axes.items():
+                values = np.asarray(values)
+                if name in conditions:
+                    if self.labels(name) is not None:
+                        values = np.array([self.labels(name).index(str(v)) for v in values])
+                    per_axis.append(np.flatnonzero(self._match(name, values, conditions[name])))
+                else:
+                    per_axis.append(np.arange(len(values)))
+            shape = tuple(len(v) for v in axes.values())
+            index = np.ix_(*per_axis)
+            return np.ravel_multi_index(np.broadcast_arrays(*index), shape).ravel()
+
+        mask = np.ones(len(self), dtype=bool)
+        for name, condition in conditions.items():
+            mask &= self._match(name, self[name], condition)
+        return np.flatnonzero(mask)
+
+    def select(self, columns=None, decode=True, **conditions):
+        """Rows matching conditions as a dict of in-memory arrays
+
+        Only the pages holding the selected rows of the requested columns are
+        read. Text columns are decoded to labels unless decode is False.
+        """
+        rows = self.rows_where(**conditions) if conditions else slice(None)
+        out = {}
+        for name in columns or self.columns:
+            values = np.asarray(self[name][rows])
+            if decode and self.labels(name) is not None:
+                values = self.decode(name, values)
+            out[name] = values
+        return out
@@ -0,0 +1,213 @@
+"""
+Mass-aware screening of material x section x frame geometry x load combinations
+Deflection grows with L^3 and root stress with F*L, so for every material and
+section each load case admits arms up to a longest feasible length. With the
+geometries sorted by actual arm length the feasible ones are a prefix found
+by binary search; whole material/section pairs are pruned from bounds alone
+and only survivors are evaluated in full
+"""
+
+import numpy as np
+
+import frame_design
+from instrument import profiled
+from materials import MATERIALS
+from optimizer import FRAME_TYPES
+
+# Ranking keys whose best value is always at the shortest feasible arm, with
+# True when larger is better
+SHORT_ARM_KEYS = {
+    'mass': False,
+    'max_displacement': False,
+    'bending_stress': False,
+    'safety_factor': True,
+}
+RANK_KEYS = {**SHORT_ARM_KEYS, 'stability_arm': True, 'specific_stiffness': True, 'specific_strength': True}
+
+# Bounds are loosened by this relative margin so rounding never prunes a feasible
+# design; the full evaluation applies the exact limits
+BOUND_SLACK = 1e-9
+
+def frame_geometries(frame_types=FRAME_TYPES, arm_lengths=(), widths=()):
+    """Every frame type x arm length x width, sorted by actual arm length
+
+    Returns a dict of arrays with 'frame_type', 'arm_length', 'width',
+    'actual_arm_length' and 'stability_arm'.
+    """
+    frame_type, arm_length, width = (a.ravel() for a in np.meshgrid(
+        np.asarray(frame_types), np.asarray(arm_lengths, dtype=float), np.asarray(widths, dtype=float),
+        indexing='ij'))
+    is_x = frame_type == 'X-frame'
+    actual = np.where(is_x, np.sqrt(2) * arm_length, arm_length)
+    order = np.argsort(actual, kind='stable')
+    return {
+        'frame_type': frame_type[order],
+        'arm_length': arm_length[order],
+        'width': width[order],
+        'actual_arm_length': actual[order],
+        # Moment arm for roll/pitch control, as scored in Question 4
+        'stability_arm': np.where(is_x, np.sqrt(2) * arm_length, width)[order],
+    }
+
+def _prefix_rows(counts, limit=None):
+    """Row index within its group for groups of the given sizes, optionally capped"""
+    counts = np.minimum(counts, limit) if limit is not None else counts
+    total = int(counts.sum())
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(total) - starts, counts
+
+class _TopK:
+    """The k best rows seen so far under one key"""
+
+    def __init__(self, k, key, descending):
+        self.k, self.key, self.descending = k, key, descending
+        self.rows = None
+
+    def add(self, rows):
+        if self.rows is not None:
+            rows = {name: np.concatenate([self.rows[name], rows[name]]) for name in rows}
+        score = -rows[self.key] if self.descending else rows[self.key]
+        keep = np.argsort(score, kind='stable')[:self.k]
+        self.rows = {name: values[keep] for name, values in rows.items()}
+
+    def bound(self):
+        """Worst score still in the top k, or None until k rows are held"""
+        if self.rows is None or len(self.rows[self.key]) < self.k:
+            return None
+        return self.rows[self.key][-1]
+
+@profiled()
+def screen(catalogue, materials=MATERIALS, material_names=None, frame_types=FRAME_TYPES,
+           arm_lengths=np.linspace(0.2, 0.6, 41), widths=np.linspace(0.05, 0.25, 21),
+           motor_forces=(frame_design.motor_force_base,), min_safety_factor=3.0,
+           max_displacement=0.005, max_mass=np.inf, top=100, rank_by='mass',
+           sink=None, pair_chunk=65_536, row_chunk=1_000_000):
+    """Feasible frames over materials x sections x geometries x motor forces
+
+    For every material/section pair and force the longest feasible actual
+    arm length is the tightest of the deflection limit (F*L^3/(3EI) <=
+    max_displacement), the stress limit (F*L*c/I <= strength /
+    min_safety_factor) and the mass limit, which leaves a prefix of the
+    sorted geometries. Pairs with an empty prefix for every force are
+    pruned without evaluating any geometry. When ranking by a key whose
+    best is the shortest arm (mass, deflection, stress, safety factor) only
+    the first `top` rows of each prefix are evaluated, and mass ranking
+    stops as soon as the lightest remaining pair cannot enter the top.
+    Otherwise, or with a sink (see result_sinks) receiving every feasible
+    row, all survivors are evaluated in chunks of about row_chunk rows.
+
+    Returns a dict with 'combinations', 'survivors' (after bound pruning),
+    'pruned_pairs', 'evaluated', 'feasible' (evaluated rows within the
+    exact limits) and 'top', the best rows sorted by rank_by.
+    """
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f'Cannot rank by {rank_by!r}, expected one of {tuple(RANK_KEYS)}')
+    names = materials.names if material_names is None else list(material_names)
+    material_rows = materials.rows(names)
+    density = materials.column('density')[material_rows]
+    E = materials.column('youngs_modulus')[material_rows]
+    strength = materials.column('tensile_strength')[material_rows]
+    sections = catalogue.properties()
+    geometry = frame_geometries(frame_types, arm_lengths, widths)
+    lengths = geometry['actual_arm_length']
+    forces = np.sort(np.asarray(motor_forces, dtype=float))
+
+    n_pairs = len(material_rows) * len(catalogue)
+    # Lightest pairs first, so mass ranking can stop early
+    linear_mass = (density[:, None] * sections.area[None, :]).ravel()
+    pair_order = np.argsort(linear_mass, kind='stable')
+
+    shortcut = sink is None and rank_by in SHORT_ARM_KEYS
+    best = _TopK(top, rank_by, RANK_KEYS[rank_by])
+    stats = {'combinations': n_pairs * len(lengths) * len(forces), 'survivors': 0,
+             'pruned_pairs': 0, 'evaluated': 0, 'feasible': 0}
+
+    # Mass ranking starts with small chunks so the top-k bound tightens early
+    size = min(1024, pair_chunk) if rank_by == 'mass' else pair_chunk
+    start = 0
+    while start < n_pairs:
+        pairs = pair_order[start:start + size]
+        start += len(pairs)
+        size = min(2 * size, pair_chunk)
+        material, section = np.divmod(pairs, len(catalogue))
+        mass_per_length = 4 * linear_mass[pairs]
+        # A sink receives every feasible row, so only a plain top-k search may stop early
+        cutoff = best.bound() if shortcut and rank_by == 'mass' else None
+        if cutoff is not None and mass_per_length[0] * lengths[0] > cutoff:
+            # Every remaining pair is heavier than the current top
+            stats['pruned_pairs'] += n_pairs - start + len(pairs)
+            break
+
+        EI = E[material] * sections.I[section]
+        capacity = strength[material] * sections.I[section] / (min_safety_factor * sections.c[section])
+        longest = np.minimum(np.cbrt(3 * EI[:, None] * max_displacement / forces[None, :]),
+                             capacity[:, None] / forces[None, :])
+        longest = np.minimum(longest, (max_mass / mass_per_length)[:, None])
+        if cutoff is not None:
+            longest = np.minimum(longest, (cutoff / mass_per_length)[:, None])
+        counts = np.searchsorted(lengths, longest * (1 + BOUND_SLACK), side='right')
+        stats['survivors'] += int(counts.sum())
+        alive = counts[:, 0] > 0  # forces are sorted, so the smallest force admits the most
+        stats['pruned_pairs'] += int(np.count_nonzero(~alive))
+
+        counts = counts[alive].ravel()
+        pair_index = np.repeat(np.flatnonzero(alive), len(forces))
+        force_index = np.tile(np.arange(len(forces)), int(np.count_nonzero(alive)))
+        for rows in _row_groups(counts, top if shortcut else None, row_chunk):
+            geometry_index, group_counts = _prefix_rows(counts[rows], top if shortcut else None)
+            group = np.repeat(np.arange(len(group_counts)), group_counts)
+            chunk = _evaluate(pairs[pair_index[rows][group]], material_rows, names, catalogue, sections,
+                              materials, geometry, geometry_index, forces[force_index[rows][group]])
+            stats['evaluated'] += len(geometry_index)
+            feasible = ((chunk['safety_factor'] >= min_safety_factor)
+                        & (chunk['max_displacement'] <= max_displacement)
+                        & (chunk['mass'] <= max_mass))
+            chunk = {name: values[feasible] for name, values in chunk.items()}
+            stats['feasible'] += int(np.count_nonzero(feasible))
+            if sink is not None and len(chunk['mass']):
+                sink.write(chunk)
+            if len(chunk['mass']):
+                best.add(chunk)
+
+    if sink is not None:
+        sink.close()
+    stats['top'] = best.rows
+    return stats
+
+def _row_groups(counts, limit, row_chunk):
+    """Slices of (pair, force) groups holding about row_chunk rows each"""
+    rows = np.minimum(counts, limit) if limit is not None else counts
+    ends = np.cumsum(rows)
+    start = 0
+    while start < len(counts):
+        stop = max(start + 1, int(np.searchsorted(ends, ends[start] - rows[start] + row_chunk, side='right')))
+        yield slice(start, stop)
+        start = stop
+
+def _evaluate(pairs, material_rows, names, catalogue, sections, materials, geometry, geometry_index, force):
+    """Full response of explicit (pair, geometry, force) rows"""
+    material, section = np.divmod(pairs, len(catalogue))
+    rows = material_rows[material]
+    density = materials.column('density')[rows]
+    E = materials.column('youngs_modulus')[rows]
+    strength = materials.column('tensile_strength')[rows]
+    I, area, c = sections.I[section], sections.area[section], sections.c[section]
+    frame_type = geometry['frame_type'][geometry_index]
+    _, _, displacement, arm_lengths = frame_design.analyze_frame_batch(
+        frame_type, geometry['arm_length'][geometry_index], geometry['width'][geometry_index], force, E, I)
+    stress = frame_design.bending_stress(force, arm_lengths[..., 0], 2 * c, I)
+    return {
+        'material_name': np.asarray(names)[material],
+        'section_name': np.asarray(catalogue.names)[section],
+        'frame_type': frame_type,
+        'arm_length': geometry['arm_length'][geometry_index],
+        'width': geometry['width'][geometry_index],
+        'motor_force': force,
+        'mass': density * area * arm_lengths.sum(axis=-1),
+        'max_displacement': displacement,
+        'bending_stress': stress,
+        'safety_factor': frame_design.safety_factor(stress, strength),
+        'stability_arm': geometry['stability_arm'][geometry_index],
+        'specific_stiffness': E / density,
+        'specific_strength': strength / density,
+    }
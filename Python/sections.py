@@ -0,0 +1,157 @@
+"""
+Cross-section properties for frame arms and beams
+Area, second moment of area about the bending axis, extreme-fiber distance
+and elastic section modulus, vectorized over arrays of dimensions
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+SectionProperties = namedtuple('SectionProperties', ['area', 'I', 'c', 'section_modulus'])
+
+def _circular_tube(diameter, thickness):
+    inner = diameter - 2 * thickness
+    area = np.pi * (diameter**2 - inner**2) / 4
+    I = np.pi * (diameter**4 - inner**4) / 64
+    return area, I, diameter / 2
+
+def _solid_rod(diameter):
+    return np.pi * diameter**2 / 4, np.pi * diameter**4 / 64, diameter / 2
+
+def _rectangular_tube(width, height, thickness):
+    inner_w, inner_h = width - 2 * thickness, height - 2 * thickness
+    area = width * height - inner_w * inner_h
+    I = (width * height**3 - inner_w * inner_h**3) / 12
+    return area, I, height / 2
+
+def _flanged(width, height, flange_thickness, web_thickness):
+    # I-beams and C-channels share the strong-axis formulas: the web is a
+    # strip of the outer rectangle minus the two side voids
+    web_height = height - 2 * flange_thickness
+    area = 2 * width * flange_thickness + web_height * web_thickness
+    I = (width * height**3 - (width - web_thickness) * web_height**3) / 12
+    return area, I, height / 2
+
+def _flat_plate(width, thickness):
+    # Bends about its weak axis, like the material_properties beams
+    return width * thickness, width * thickness**3 / 12, thickness / 2
+
+# shape -> (formula, dimension names in call order)
+SHAPES = {
+    'circular_tube': (_circular_tube, ('diameter', 'thickness')),
+    'solid_rod': (_solid_rod, ('diameter',)),
+    'rectangular_tube': (_rectangular_tube, ('width', 'height', 'thickness')),
+    'i_beam': (_flanged, ('width', 'height', 'flange_thickness', 'web_thickness')),
+    'c_channel': (_flanged, ('width', 'height', 'flange_thickness', 'web_thickness')),
+    'flat_plate': (_flat_plate, ('width', 'thickness')),
+}
+
+# shape -> (wall, factor, outer): factor * wall may not exceed outer
+WALL_LIMITS = {
+    'circular_tube': [('thickness', 2, 'diameter')],
+    'rectangular_tube': [('thickness', 2, 'width'), ('thickness', 2, 'height')],
+    'i_beam': [('flange_thickness', 2, 'height'), ('web_thickness', 1, 'width')],
+    'c_channel': [('flange_thickness', 2, 'height'), ('web_thickness', 1, 'width')],
+}
+
+def _dimensions(shape, dims):
+    try:
+        _, names = SHAPES[shape]
+    except KeyError:
+        raise ValueError(f'Unknown section shape {shape!r}, expected one of {tuple(SHAPES)}') from None
+    missing = set(names) - set(dims)
+    extra = set(dims) - set(names)
+    if missing or extra:
+        raise TypeError(f'{shape} takes dimensions {names}, got {tuple(dims)}')
+    return tuple(dims[name] for name in names)
+
+def _validate(shape, values):
+    _, names = SHAPES[shape]
+    dims = dict(zip(names, values))
+    for name, value in dims.items():
+        if not np.all(np.asarray(value) > 0):
+            raise ValueError(f'{shape} {name} must be positive, got {value}')
+    for wall, factor, outer in WALL_LIMITS.get(shape, ()):
+        if np.any(factor * np.asarray(dims[wall]) > np.asarray(dims[outer])):
+            raise ValueError(f'{shape} {wall} {dims[wall]} does not fit in {outer} {dims[outer]}')
+
+def _compute(shape, values):
+    formula, _ = SHAPES[shape]
+    area, I, c = formula(*values)
+    return SectionProperties(area, I, c, I / c)
+
+@lru_cache(maxsize=4096)
+def _cached(shape, values):
+    return _compute(shape, values)
+
+def section_properties(shape, **dims):
+    """Area, I, c and section modulus of a cross-section
+
+    Scalar dimensions go through a bounded LRU cache keyed by shape and
+    dimensions; array dimensions broadcast and are computed directly (use a
+    SectionCatalogue to reuse them across many evaluations). Raises
+    ValueError for non-positive dimensions and for walls or flanges that do
+    not fit inside the outer size.
+    """
+    values = _dimensions(shape, dims)
+    _validate(shape, values)
+    if all(np.ndim(v) == 0 for v in values):
+        return _cached(shape, tuple(float(v) for v in values))
+    return _compute(shape, np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in values)))
+
+def cache_info():
+    return _cached.cache_info()
+
+class SectionCatalogue:
+    """Fixed set of sections with properties computed once and stored as columns
+
+    Designs refer to sections by catalogue index, so evaluating millions of
+    designs is a gather from contiguous arrays rather than a recomputation.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.shapes = []
+        self.dimensions = []
+        self._index = {}
+        self._columns = None
+        self._rows = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, shape, **dims):
+        """Register a section and return its index"""
+        if name in self._index:
+            raise ValueError(f'Duplicate section {name!r}')
+        props = section_properties(shape, **dims)
+        self._index[name] = len(self.names)
+        self.names.append(name)
+        self.shapes.append(shape)
+        self.dimensions.append(dims)
+        self._rows.append(props)
+        self._columns = None
+        return self._index[name]
+
+    def index(self, name):
+        return self._index[name]
+
+    def properties(self, ids=None):
+        """SectionProperties of contiguous arrays, optionally gathered for ids"""
+        if self._columns is None:
+            self._columns = SectionProperties(*(np.array(column, dtype=float) for column in zip(*self._rows)))
+        if ids is None:
+            return self._columns
+        ids = np.asarray(ids)
+        return SectionProperties(*(column[ids] for column in self._columns))
+
+def tube_catalogue(diameters, thicknesses, max_wall_fraction=0.45):
+    """Catalogue of every circular tube diameter x wall combination that fits"""
+    catalogue = SectionCatalogue()
+    for d in diameters:
+        for t in thicknesses:
+            if t <= max_wall_fraction * d:
+                catalogue.add(f'tube {d*1000:g}x{t*1000:g}', 'circular_tube', diameter=d, thickness=t)
+    return catalogue
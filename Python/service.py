@@ -0,0 +1,391 @@
+"""
+Local analysis service: frame, axial and safety-factor calculations over HTTP/JSON
+Requests arriving within a short window are coalesced into one vectorized
+batch per endpoint; a bounded queue turns overload into 503 responses
+
+    python service.py --port 8750
+    curl -d '{"frame_type": "X-frame", "arm_length": 0.4, "width": 0.1, "motor_force": 20}' \\
+         http://127.0.0.1:8750/frame
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+import frame_design
+import material_properties
+from materials import MATERIALS
+
+class Endpoint:
+    """A batch kernel with its required inputs and defaults
+
+    material names the MATERIALS property each material-derived input
+    comes from when a request sends {"material": ...}.
+    """
+
+    def __init__(self, kernel, required, defaults, material=None, text=()):
+        self.kernel = kernel
+        self.required = required
+        self.defaults = defaults
+        self.material = material or {}
+        self.text = set(text)
+
+    def parse(self, payload):
+        """Validated, broadcast parameter arrays of one request, and whether it was scalar"""
+        if not isinstance(payload, dict):
+            raise ValueError('Request body must be a JSON object')
+        payload = dict(payload)
+        if 'material' in payload:
+            name = payload.pop('material')
+            if name not in MATERIALS:
+                raise ValueError(f'Unknown material {name!r}, expected one of {MATERIALS.names}')
+            for key, field in self.material.items():
+                payload.setdefault(key, float(MATERIALS[name][field]))
+        missing = [key for key in self.required if key not in payload]
+        if missing:
+            raise ValueError(f'Missing inputs {missing}')
+        unknown = set(payload) - set(self.required) - set(self.defaults)
+        if unknown:
+            raise ValueError(f'Unknown inputs {sorted(unknown)}')
+        params = {**self.defaults, **payload}
+        scalar = all(np.ndim(params[key]) == 0 for key in payload)
+        arrays = {}
+        for key, value in params.items():
+            arrays[key] = np.asarray(value, dtype=str if key in self.text else float)
+            if key not in self.text and not np.all(np.isfinite(arrays[key])):
+                raise ValueError(f'{key} must be finite numbers')
+        arrays = dict(zip(arrays, np.broadcast_arrays(*(np.atleast_1d(a) for a in arrays.values()))))
+        return {key: value.ravel() for key, value in arrays.items()}, scalar
+
+def _axial(params):
+    out = material_properties.evaluate_axial(params)
+    out['safety_factor'] = frame_design.safety_factor(out['stress'], params['tensile_strength'])
+    return out
+
+def _safety_factor(params):
+    return {'safety_factor': frame_design.safety_factor(params['stress'], params['yield_strength'])}
+
+ENDPOINTS = {
+    '/frame': Endpoint(
+        frame_design.evaluate_frame_designs, ('frame_type', 'arm_length', 'width', 'motor_force'),
+        {'youngs_modulus': frame_design.youngs_modulus, 'moment_of_inertia': frame_design.moment_of_inertia,
+         'beam_diameter': frame_design.beam_diameter, 'yield_strength': frame_design.yield_strength_carbon},
+        material={'youngs_modulus': 'youngs_modulus', 'yield_strength': 'tensile_strength'},
+        text=('frame_type',)),
+    '/axial': Endpoint(
+        _axial, ('force', 'width', 'thickness'),
+        {'youngs_modulus': frame_design.youngs_modulus, 'tensile_strength': frame_design.yield_strength_carbon,
+         'length': material_properties.length_base},
+        material={'youngs_modulus': 'youngs_modulus', 'tensile_strength': 'tensile_strength'}),
+    '/safety_factor': Endpoint(
+        _safety_factor, ('stress',), {'yield_strength': frame_design.yield_strength_carbon},
+        material={'yield_strength': 'tensile_strength'}),
+}
+
+class Overloaded(Exception):
+    """The request queue is full"""
+
+class BadRequest(ValueError):
+    """A malformed HTTP request, answered with `status` before the connection closes"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class MicroBatcher:
+    """Coalesces concurrent requests to one endpoint into vectorized batches
+
+    The first queued request opens a window of `window` seconds (or until
+    max_batch design points are waiting); everything queued by then is
+    evaluated in one kernel call on a worker thread. submit() raises
+    Overloaded when max_queue requests are already waiting.
+    """
+
+    def __init__(self, endpoint, window=0.002, max_batch=4096, max_queue=10_000):
+        self.endpoint = endpoint
+        self.window = window
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.batches = 0
+        self.batched_points = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, params):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((params, future))
+        except asyncio.QueueFull:
+            raise Overloaded() from None
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            try:
+                points = _points(batch[0][0])
+                if self.queue.qsize() * points < self.max_batch:
+                    # Give concurrent callers the window to join this batch
+                    await asyncio.sleep(self.window)
+                while points < self.max_batch and not self.queue.empty():
+                    item = self.queue.get_nowait()
+                    batch.append(item)
+                    points += _points(item[0])
+                await loop.run_in_executor(None, self._evaluate, batch)
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as error:
+                # Fail this batch but keep serving the queue
+                for _, future in batch:
+                    _set_exception(future, error)
+                continue
+            self.batches += 1
+            self.batched_points += points
+
+    def _evaluate(self, batch):
+        """Run one kernel call for the batch and resolve each request's future"""
+        lengths = [_points(params) for params, _ in batch]
+        try:
+            stacked = {key: np.concatenate([params[key] for params, _ in batch]) for key in batch[0][0]}
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # Zero stress gives an infinite safety factor, answered as null
+                outputs = self.endpoint.kernel(stacked)
+        except Exception:
+            # One bad request must not fail its neighbours: retry them one by one
+            for params, future in batch:
+                self._resolve(future, self.endpoint.kernel, params)
+            return
+        bounds = np.cumsum([0] + lengths)
+        for (_, future), start, stop in zip(batch, bounds[:-1], bounds[1:]):
+            result = {key: np.asarray(values)[start:stop] for key, values in outputs.items()}
+            future.get_loop().call_soon_threadsafe(_set_result, future, result)
+
+    @staticmethod
+    def _resolve(future, func, params):
+        try:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = func(params)
+        except Exception as error:
+            future.get_loop().call_soon_threadsafe(_set_exception, future, error)
+        else:
+            future.get_loop().call_soon_threadsafe(_set_result, future, result)
+
+def _points(params):
+    return len(next(iter(params.values())))
+
+def _json_values(values, scalar):
+    """Plain Python value(s) of one output; non-finite floats become None (JSON null)"""
+    values = np.asarray(values)
+    items = values.tolist()
+    if values.dtype.kind == 'f':
+        for i in np.flatnonzero(~np.isfinite(values)):
+            items[i] = None
+    return items[0] if scalar else items
+
+def _set_result(future, result):
+    if not future.done():
+        future.set_result(result)
+
+def _set_exception(future, error):
+    if not future.done():
+        future.set_exception(error)
+
+class Metrics:
+    """Request counts and latency percentiles per endpoint over a bounded window"""
+
+    def __init__(self, window=10_000):
+        self.window = window
+        self.started = time.monotonic()
+        self.latencies = {}
+        self.finished = {}
+        self.counts = {}
+
+    def record(self, path, status, seconds):
+        counts = self.counts.setdefault(path, {})
+        counts[status] = counts.get(status, 0) + 1
+        self.latencies.setdefault(path, deque(maxlen=self.window)).append(seconds)
+        self.finished.setdefault(path, deque(maxlen=self.window)).append(time.monotonic())
+
+    def snapshot(self, batchers):
+        now = time.monotonic()
+        report = {'uptime_s': now - self.started, 'endpoints': {}}
+        for path, latencies in self.latencies.items():
+            finished = self.finished[path]
+            seconds = np.asarray(latencies)
+            entry = {
+                'requests': self.counts[path],
+                'p50_ms': float(np.percentile(seconds, 50) * 1e3),
+                'p99_ms': float(np.percentile(seconds, 99) * 1e3),
+                'requests_per_s': sum(self.counts[path].values()) / max(now - self.started, 1e-9),
+                # Over the last `window` completions
+                'recent_requests_per_s': (len(finished) - 1) / max(finished[-1] - finished[0], 1e-9),
+            }
+            if path in batchers:
+                batcher = batchers[path]
+                entry['batches'] = batcher.batches
+                entry['mean_batch_points'] = batcher.batched_points / max(batcher.batches, 1)
+                entry['queued'] = batcher.queue.qsize()
+            report['endpoints'][path] = entry
+        return report
+
+class AnalysisService:
+    """Minimal HTTP/1.1 server routing JSON requests to the micro-batchers"""
+
+    def __init__(self, window=0.002, max_batch=4096, max_queue=10_000):
+        self.batchers = {path: MicroBatcher(endpoint, window, max_batch, max_queue)
+                         for path, endpoint in ENDPOINTS.items()}
+        self.metrics = Metrics()
+        self.server = None
+
+    async def start(self, host='127.0.0.1', port=8750, unix_path=None):
+        for batcher in self.batchers.values():
+            batcher.start()
+        if unix_path:
+            self.server = await asyncio.start_unix_server(self._connection, unix_path)
+        else:
+            self.server = await asyncio.start_server(self._connection, host, port)
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for batcher in self.batchers.values():
+            await batcher.stop()
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except BadRequest as error:
+                    # The rest of the stream cannot be framed, so answer and hang up
+                    _write_response(writer, error.status, {'error': str(error)}, {}, keep_alive=False)
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                start = time.perf_counter()
+                status, payload, extra = await self._handle(method, path, body)
+                self.metrics.record(path, status, time.perf_counter() - start)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                _write_response(writer, status, payload, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, method, path, body):
+        if path == '/metrics' and method == 'GET':
+            return 200, self.metrics.snapshot(self.batchers), {}
+        if path == '/health' and method == 'GET':
+            return 200, {'status': 'ok', 'endpoints': list(ENDPOINTS)}, {}
+        if path not in self.batchers:
+            return 404, {'error': f'No endpoint {path}'}, {}
+        if method != 'POST':
+            return 405, {'error': 'Use POST with a JSON body'}, {'Allow': 'POST'}
+        batcher = self.batchers[path]
+        try:
+            params, scalar = batcher.endpoint.parse(json.loads(body or b'null'))
+            outputs = await batcher.submit(params)
+        except Overloaded:
+            return 503, {'error': 'Too many queued requests'}, {'Retry-After': '1'}
+        except (ValueError, TypeError) as error:
+            return 400, {'error': str(error)}, {}
+        except Exception as error:
+            return 500, {'error': f'{type(error).__name__}: {error}'}, {}
+        return 200, {key: _json_values(values, scalar) for key, values in outputs.items()}, {}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Content Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+MAX_BODY = 64 * 2**20
+
+async def _read_request(reader):
+    """(method, path, headers, body) of the next request, or None at end of stream
+
+    Raises BadRequest for a request line, header or Content-Length that
+    cannot be parsed, and for bodies over MAX_BODY.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3 or not parts[2].startswith('HTTP/'):
+        raise BadRequest(f'Malformed request line {line[:100]!r}')
+    method, target, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, colon, value = line.decode('latin-1').partition(':')
+        if not colon or not name.strip():
+            raise BadRequest(f'Malformed header {line[:100]!r}')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise BadRequest(f'Invalid Content-Length {headers["content-length"]!r}') from None
+    if length < 0:
+        raise BadRequest(f'Invalid Content-Length {length}')
+    if length > MAX_BODY:
+        raise BadRequest('Request body too large', 413)
+    body = await reader.readexactly(length) if length else b''
+    return method, target.split('?', 1)[0], headers, body
+
+def _write_response(writer, status, payload, extra, keep_alive):
+    body = json.dumps(payload, allow_nan=False).encode()
+    head = [f'HTTP/1.1 {status} {REASONS.get(status, "")}',
+            'Content-Type: application/json',
+            f'Content-Length: {len(body)}',
+            f'Connection: {"keep-alive" if keep_alive else "close"}']
+    head += [f'{name}: {value}' for name, value in extra.items()]
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+
+async def serve(host, port, unix_path=None, **options):
+    service = AnalysisService(**options)
+    server = await service.start(host, port, unix_path)
+    where = unix_path or ', '.join(str(sock.getsockname()) for sock in server.sockets)
+    print(f'Serving {", ".join(ENDPOINTS)}, /metrics on {where}', flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8750)
+    parser.add_argument('--unix', help='listen on this Unix socket path instead of TCP')
+    parser.add_argument('--window-ms', type=float, default=2.0,
+                        help='how long the first request of a batch waits for company')
+    parser.add_argument('--max-batch', type=int, default=4096, help='design points per kernel call')
+    parser.add_argument('--max-queue', type=int, default=10_000,
+                        help='queued requests per endpoint before answering 503')
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, window=args.window_ms / 1e3,
+                          max_batch=args.max_batch, max_queue=args.max_queue))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
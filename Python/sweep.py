@@ -0,0 +1,155 @@
+"""
+Parameter sweep runner shared by the analysis scripts
+Design points are split into chunks and evaluated in a process pool
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from instrument import profiled
+
+class ParameterGrid:
+    """Lazy Cartesian product of parameter axes
+
+    Points are only materialized a chunk at a time, so worker processes get
+    the axes and an index range rather than pickled copies of the grid.
+    The last axis varies fastest, like nested for loops in argument order.
+    """
+
+    def __init__(self, **axes):
+        self.axes = {name: np.atleast_1d(np.asarray(values)) for name, values in axes.items()}
+        self.shape = tuple(len(values) for values in self.axes.values())
+
+    def __len__(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def chunk(self, start, stop):
+        """Parameter arrays for points start..stop-1"""
+        index = np.unravel_index(np.arange(start, stop), self.shape)
+        return {name: values[i] for (name, values), i in zip(self.axes.items(), index)}
+
+    def arrays(self):
+        return self.chunk(0, len(self))
+
+class ParameterList:
+    """Explicit design points held as equal-length parameter arrays"""
+
+    def __init__(self, columns):
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        lengths = {len(values) for values in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f'Parameter arrays must all have the same length, got {sorted(lengths)}')
+        self._length = lengths.pop() if lengths else 0
+
+    def __len__(self):
+        return self._length
+
+    def chunk(self, start, stop):
+        return {name: values[start:stop] for name, values in self.columns.items()}
+
+    def arrays(self):
+        return self.columns
+
+def parameter_grid(**axes):
+    """Cartesian product of parameter axes, e.g. parameter_grid(arm_length=[...], width=[...])"""
+    return ParameterGrid(**axes)
+
+def parameter_list(points, names):
+    """Explicit design points, e.g. [(type, length, width), ...]"""
+    columns = list(zip(*points)) if len(points) else [[] for _ in names]
+    return ParameterList(dict(zip(names, columns)))
+
+def as_points(params):
+    """Accept a ParameterGrid/ParameterList or a plain dict of equal-length arrays"""
+    if isinstance(params, (ParameterGrid, ParameterList)):
+        return params
+    return ParameterList(params)
+
+def chunk_bounds(n_points, chunk_size):
+    """(start, stop) pairs covering n_points in chunks of chunk_size"""
+    return [(start, min(start + chunk_size, n_points)) for start in range(0, n_points, chunk_size)]
+
+def _evaluate_chunk(func, points, start, stop):
+    result = func(points.chunk(start, stop))
+    if not isinstance(result, dict):
+        result = {'result': result}
+    return {name: np.asarray(values) for name, values in result.items()}
+
+def _submit(pool, func, points, start, stop):
+    # Grids travel as their axes; explicit lists are sliced per chunk
+    if isinstance(points, ParameterGrid):
+        return pool.submit(_evaluate_chunk, func, points, start, stop)
+    return pool.submit(_evaluate_chunk, func, ParameterList(points.chunk(start, stop)), 0, stop - start)
+
+def iter_sweep(func, params, chunk_size=100_000, workers=None):
+    """Yield (start, stop, chunk_result) for every chunk, in point order
+
+    At most two chunks per worker are in flight, so finished chunks that
+    are waiting for an earlier one never pile up in memory.
+    """
+    points = as_points(params)
+    bounds = chunk_bounds(len(points), max(1, int(chunk_size)))
+    workers = min(workers or os.cpu_count() or 1, max(1, len(bounds)))
+
+    if workers == 1:
+        for start, stop in bounds:
+            yield start, stop, _evaluate_chunk(func, points, start, stop)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        done = {}
+        next_submit = next_yield = 0
+        while next_yield < len(bounds):
+            while next_submit < len(bounds) and len(pending) + len(done) < 2 * workers:
+                pending[_submit(pool, func, points, *bounds[next_submit])] = next_submit
+                next_submit += 1
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done[pending.pop(future)] = future.result()
+            while next_yield in done:
+                yield (*bounds[next_yield], done.pop(next_yield))
+                next_yield += 1
+
+@profiled()
+def run_sweep(func, params, chunk_size=100_000, workers=None, sink=None, include_params=True):
+    """Evaluate func over every design point in params
+
+    func takes a dict of equal-length parameter arrays (one chunk) and
+    returns an array, or a dict of arrays, with one row per point. It must
+    be a module-level function so worker processes can import it. Chunks
+    run in a process pool of `workers` processes (default: all cores,
+    1 = run inline) and are written into preallocated output arrays at
+    their own offsets, so the result order never depends on scheduling.
+    Returns a dict of arrays, or a single array if func returned one.
+
+    With a sink (see result_sinks) nothing is kept in memory: each chunk is
+    passed to sink.write in point order, preceded by the parameter columns
+    unless include_params is False. The sink is closed at the end and the
+    number of points written is returned.
+    """
+    points = as_points(params)
+    n_points = len(points)
+
+    if sink is not None:
+        try:
+            for start, stop, chunk_result in iter_sweep(func, points, chunk_size, workers):
+                if include_params:
+                    chunk_result = {**points.chunk(start, stop), **chunk_result}
+                sink.write(chunk_result)
+        finally:
+            sink.close()
+        return n_points
+
+    results = {}
+    for start, stop, chunk_result in iter_sweep(func, points, chunk_size, workers):
+        for name, values in chunk_result.items():
+            if name not in results:
+                results[name] = np.empty((n_points,) + values.shape[1:], dtype=values.dtype)
+            results[name][start:stop] = values
+
+    if list(results) == ['result']:
+        return results['result']
+    return results
@@ -0,0 +1,67 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import fatigue
+
+def stack_rainflow(series):
+    """Reference four-point rainflow, one reversal at a time on a stack"""
+    stack, cycles = [], []
+    for point in fatigue.reversals(series):
+        stack.append(point)
+        while len(stack) >= 4:
+            inner = abs(stack[-2] - stack[-3])
+            if inner <= abs(stack[-3] - stack[-4]) and inner <= abs(stack[-1] - stack[-2]):
+                cycles.append((inner, (stack[-2] + stack[-3]) / 2))
+                del stack[-3:-1]
+            else:
+                break
+    return sorted(cycles), np.array(stack)
+
+def counts(ranges, half_ranges):
+    counted = Counter()
+    for value in ranges:
+        counted[float(value)] += 1
+    for value in half_ranges:
+        counted[float(value)] += 0.5
+    return dict(counted)
+
+def test_astm_e1049_example():
+    # ASTM E1049-85 rainflow example: ranges 3, 4, 6, 8, 9 with 0.5, 1.5, 0.5, 1, 0.5 cycles
+    ranges, _, residue = fatigue.extract_cycles(fatigue.reversals([-2, 1, -3, 5, -1, 3, -4, 4, -2]))
+    half_ranges, _ = fatigue.residue_cycles(residue)
+    assert counts(ranges, half_ranges) == {3.0: 0.5, 4.0: 1.5, 6.0: 0.5, 8.0: 1.0, 9.0: 0.5}
+
+@pytest.mark.parametrize('seed', range(5))
+def test_vectorized_rainflow_matches_stack_reference(seed):
+    series = np.round(np.random.default_rng(seed).normal(size=3000), 2)
+    ranges, means, residue = fatigue.extract_cycles(fatigue.reversals(series))
+    expected, expected_residue = stack_rainflow(series)
+    got = sorted(zip(ranges.tolist(), means.tolist()))
+    np.testing.assert_allclose(got, expected, atol=1e-12)
+    np.testing.assert_array_equal(residue, expected_residue)
+
+def test_streaming_chunks_match_one_pass():
+    thrust = 20 + 5 * np.random.default_rng(7).standard_normal((20_000, 4))
+    whole = fatigue.FatigueAccumulator()
+    whole.update(thrust)
+    streamed = fatigue.FatigueAccumulator()
+    for chunk in np.array_split(thrust, 13):
+        streamed.update(chunk)
+    a, b = whole.result(), streamed.result()
+    np.testing.assert_allclose(b['damage'], a['damage'], rtol=1e-10)
+    np.testing.assert_array_equal(b['cycles'] + b['half_cycles'] / 2, a['cycles'] + a['half_cycles'] / 2)
+    np.testing.assert_array_equal(b['max_stress'], a['max_stress'])
+
+def test_constant_amplitude_damage_follows_miners_rule():
+    thrust = np.tile([10.0, 30.0], 500)
+    accumulator = fatigue.FatigueAccumulator()
+    accumulator.update(thrust)
+    stress = accumulator.stress(np.array([10.0, 30.0]))
+    life = fatigue.cycles_to_failure((stress[1] - stress[0]) / 2, stress.mean(), accumulator.strength,
+                                     accumulator.exponent)
+    result = accumulator.result()
+    cycles = result['cycles'][0] + result['half_cycles'][0] / 2
+    assert cycles == pytest.approx(499.5, abs=1)
+    assert result['damage'][0] == pytest.approx(cycles / life, rel=1e-9)
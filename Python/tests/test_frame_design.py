@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from frame_design import analyze_frame, analyze_frame_batch
+
+ARM_LENGTHS = np.linspace(0.1, 0.8, 15)
+WIDTHS = np.array([0.05, 0.1, 0.173, 0.25])
+FORCES = np.array([5.0, 20.0, 37.3])
+
+@pytest.mark.parametrize('frame_type', ['X-frame', 'H-frame'])
+@pytest.mark.parametrize('E, I', [(70e9, 2e-9), (2.3e11, 7.1e-10)])
+def test_batch_matches_scalar_exactly(frame_type, E, I):
+    L, W, F = (a.ravel() for a in np.meshgrid(ARM_LENGTHS, WIDTHS, FORCES, indexing='ij'))
+    batch = analyze_frame_batch(frame_type, L, W, F, E, I)
+    scalar = [analyze_frame(frame_type, *point, E, I) for point in zip(L, W, F)]
+    for output, column in zip(batch, zip(*scalar)):
+        np.testing.assert_array_equal(output, np.array(column))
+
+def test_mixed_frame_types_broadcast():
+    types = np.array(['X-frame', 'H-frame', 'H-frame', 'X-frame'])
+    L = np.array([0.2, 0.3, 0.4, 0.5])
+    batch = analyze_frame_batch(types, L, 0.15, 20.0, 70e9, 2e-9)
+    for i, frame_type in enumerate(types):
+        for output, expected in zip(batch, analyze_frame(frame_type, L[i], 0.15, 20.0, 70e9, 2e-9)):
+            np.testing.assert_array_equal(output[i], expected)
+
+def test_unknown_frame_type_raises():
+    with pytest.raises(ValueError):
+        analyze_frame_batch(np.array(['X-frame', 'T-frame']), 0.3, 0.1, 20.0, 70e9, 2e-9)
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+import frame_design as fd
+import frame_fem
+
+E, I, G, J, A = 70e9, 2e-9, 26e9, 4e-9, 1e-4
+L, P = 0.5, 20.0
+
+def cantilever(elements_per_member=1):
+    return frame_fem.refine_mesh(np.array([[0.0, 0.0], [L, 0.0]]), np.array([[0, 1]]), elements_per_member)
+
+@pytest.mark.parametrize('elements_per_member', [1, 4])
+def test_cantilever_tip_load_matches_closed_form(elements_per_member):
+    nodes, elements = cantilever(elements_per_member)
+    loads = np.zeros(len(nodes))
+    loads[1] = P
+    u = frame_fem.solve_frame(nodes, elements, loads, E, I, G, J, cache=None)
+    assert u[1, 0] == pytest.approx(P * L**3 / (3 * E * I), rel=1e-9)
+    assert abs(u[1, 1]) == pytest.approx(P * L**2 / (2 * E * I), rel=1e-9)
+
+def test_cantilever_tip_torque_matches_closed_form():
+    nodes, elements = cantilever()
+    loads = np.zeros((len(nodes), 3))
+    loads[1, 2] = 1.5
+    u = frame_fem.solve_frame(nodes, elements, loads, E, I, G, J, cache=None)
+    assert abs(u[1, 2]) == pytest.approx(1.5 * L / (G * J), rel=1e-9)
+    assert u[1, 0] == pytest.approx(0, abs=1e-15)
+
+@pytest.mark.parametrize('frame_type, arm', [('X-frame', np.hypot(0.4, 0.4)), ('H-frame', np.hypot(0.4, 0.1))])
+def test_frame_fem_matches_closed_form(frame_type, arm):
+    # Arms meet only at the clamped hub, so each tip deflects as a cantilever
+    # of the true hub-to-motor length
+    forces = np.array([5.0, 20.0, 60.0])
+    _, _, fem, _, _, _ = fd.analyze_frame_fem(frame_type, 0.4, 0.1, forces, fd.youngs_modulus,
+                                              fd.moment_of_inertia, elements_per_arm=4)
+    np.testing.assert_allclose(fem, forces * arm**3 / (3 * fd.youngs_modulus * fd.moment_of_inertia), rtol=1e-9)
+
+def test_x_frame_fem_matches_analyze_frame():
+    fem = fd.analyze_frame_fem('X-frame', 0.4, 0.1, 20.0, fd.youngs_modulus, fd.moment_of_inertia)[2]
+    assert fem == pytest.approx(fd.analyze_frame('X-frame', 0.4, 0.1, 20.0, fd.youngs_modulus,
+                                                 fd.moment_of_inertia)[2], rel=1e-9)
+
+def test_batched_load_cases_match_single_solves():
+    nodes, elements = cantilever(3)
+    loads = np.random.default_rng(0).normal(size=(5, len(nodes), 3))
+    batch = frame_fem.solve_frame(nodes, elements, loads, E, I, G, J, cache=None)
+    single = [frame_fem.solve_frame(nodes, elements, case, E, I, G, J, cache=None) for case in loads]
+    np.testing.assert_allclose(batch, single, rtol=1e-10, atol=1e-15)
+
+def test_factorization_cache_reuses_frames():
+    cache = frame_fem.FactorizationCache()
+    nodes, elements = cantilever()
+    for force in (1.0, 2.0, 3.0):
+        frame_fem.solve_frame(nodes, elements, [0, force], E, I, G, J, cache=cache)
+    assert cache.stats()['misses'] == 1 and cache.stats()['hits'] == 2
+
+def test_numpy_fallback_matches_scipy(monkeypatch):
+    nodes, elements = fd.frame_nodes('X-frame', 0.4, 0.1), fd.ELEMENT_CONNECTIVITY
+    nodes, elements = frame_fem.refine_mesh(nodes, elements, 3)
+    loads = np.zeros(len(nodes))
+    loads[1:5] = P
+    expected = frame_fem.solve_frame(nodes, elements, loads, E, I, G, J, cache=None)
+    monkeypatch.setattr(frame_fem, 'sparse_modules', lambda: (None, None))
+    fallback = frame_fem.solve_frame(nodes, elements, loads, E, I, G, J, cache=None)
+    np.testing.assert_allclose(fallback, expected, rtol=1e-8, atol=1e-14)
+
+def test_space_frame_cantilever_matches_closed_form():
+    nodes = np.array([[0.0, 0.0, 0.0], [L, 0.0, 0.0]])
+    elements = np.array([[0, 1]])
+    loads = np.zeros((2, 6))
+    loads[1, :4] = [100.0, 2.0, P, 1.5]
+    u = frame_fem.solve_space_frames(nodes, elements, loads, E, A, I, G, J)
+    np.testing.assert_allclose(u[1, :4], [100.0 * L / (E * A), 2.0 * L**3 / (3 * E * I),
+                                          P * L**3 / (3 * E * I), 1.5 * L / (G * J)], rtol=1e-9)
+
+def test_space_frame_batch_matches_single_frames():
+    nodes = np.array([[0.0, 0.0, 0.0], [L, 0.0, 0.0], [L, L, 0.1]])
+    elements = np.array([[0, 1], [1, 2]])
+    scale = np.array([0.5, 1.0, 2.0])[:, None, None]
+    batch = frame_fem.solve_space_frames(nodes * scale, elements, 10.0 * np.ones(3), E, A, I, G, J)
+    for frame, expected in zip(nodes * scale, batch):
+        single = frame_fem.solve_space_frames(frame, elements, 10.0 * np.ones(3), E, A, I, G, J)
+        np.testing.assert_allclose(single, expected, rtol=1e-9, atol=1e-12)
+
+def test_three_node_mesh_needs_an_explicit_load_reading():
+    # Three nodes (hub, tip, appended midpoint) with three DOFs each: a (3, 3)
+    # array fits both load layouts
+    nodes, elements = cantilever(2)
+    cases = np.array([[0.0, P, 0.0], [P, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    with pytest.raises(ValueError, match='per_dof'):
+        frame_fem.solve_frame(nodes, elements, cases, E, I, G, J, cache=None)
+    tip = P * L**3 / (3 * E * I)
+    # Three cases of point forces: at the tip, on the clamped hub, none
+    batch = frame_fem.solve_frame(nodes, elements, cases, E, I, G, J, cache=None, per_dof=False)
+    assert batch.shape == (3, 3, 3)
+    assert batch[0, 1, 0] == pytest.approx(tip, rel=1e-9)
+    np.testing.assert_array_equal(batch[1:], 0.0)
+    # One case read per DOF: row 1 is the force on the tip
+    full = frame_fem.solve_frame(nodes, elements, cases, E, I, G, J, cache=None, per_dof=True)
+    assert full.shape == (3, 3)
+    assert full[1, 0] == pytest.approx(tip, rel=1e-9)
+
+def test_nodal_loads_checks_the_requested_layout():
+    with pytest.raises(ValueError):
+        frame_fem.nodal_loads(np.zeros((4, 2)), 4, per_dof=True)
+    np.testing.assert_array_equal(frame_fem.nodal_loads([1.0, 2.0], 2)[:, 0], [1.0, 2.0])
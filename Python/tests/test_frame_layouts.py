@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import frame_design as fd
+import frame_layouts
+from frame_layouts import LAYOUTS, analyze_layouts, layout_elements, layout_nodes
+
+E, I = 70e9, 2e-9
+
+@pytest.mark.parametrize('arm_length', [0.2, 0.3, 0.45])
+@pytest.mark.parametrize('force', [5.0, 20.0])
+def test_quad_x_matches_x_frame_closed_form(arm_length, force):
+    # The X-frame arm_length is the half-diagonal, the layout's is along the arm
+    _, _, x_disp, x_arms = fd.analyze_frame('X-frame', arm_length, 0.1, force, E, I)
+    nodes, deformed, disp, arms = fd.analyze_frame('quad-x', np.sqrt(2) * arm_length, 0.1, force, E, I)
+    assert disp == pytest.approx(x_disp, rel=1e-9)
+    np.testing.assert_allclose(arms, x_arms, rtol=1e-12)
+    # Motors sit on the X-frame diagonals and only move along the thrust
+    np.testing.assert_allclose(np.abs(nodes[1:, :2]), arm_length, rtol=1e-12)
+    np.testing.assert_allclose(deformed[1:, 2] - nodes[1:, 2], force * arms**3 / (3 * E * I), rtol=1e-9)
+
+@pytest.mark.parametrize('name', LAYOUTS)
+def test_layout_connectivity(name):
+    layout = LAYOUTS[name]
+    n = len(layout.arm_angles)
+    elements, motors = layout_elements(name)
+    nodes = layout_nodes(name, 0.3)
+    assert len(elements) == (3 * n if layout.coaxial else n)
+    assert len(nodes) == (1 + 3 * n if layout.coaxial else 1 + n)
+    assert elements.max() == len(nodes) - 1
+    # Every motor node is unique and loaded with thrust
+    assert len(np.unique(motors)) == len(motors) == (2 * n if layout.coaxial else n)
+    np.testing.assert_allclose(np.linalg.norm(nodes[1:n + 1], axis=-1), 0.3)
+
+def test_batch_matches_single_frames():
+    lengths = np.array([0.2, 0.35])
+    single = [analyze_layouts('hex', length, 20.0, E, I, 1e-4, 26e9, 2 * I)[2] for length in lengths]
+    batch = analyze_layouts('hex', lengths[:, None], 20.0, E, I, 1e-4, 26e9, 2 * I)[2]
+    np.testing.assert_allclose(batch, single, rtol=1e-12)
+
+def test_unknown_layout_raises():
+    with pytest.raises(ValueError):
+        frame_layouts.get_layout('tricopter')
+    with pytest.raises(ValueError):
+        frame_layouts.get_layout(0)
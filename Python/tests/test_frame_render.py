@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('matplotlib')
+from matplotlib.figure import Figure
+
+import frame_design as fd
+import frame_fem
+from frame_layouts import LAYOUTS, layout_elements
+from frame_render import FrameRenderer, element_chains, structural_nodes
+
+def render(nodes, elements, deformed=None):
+    ax = Figure().subplots()
+    return FrameRenderer(ax, nodes, elements, deformed)
+
+@pytest.mark.parametrize('name', LAYOUTS)
+@pytest.mark.parametrize('elements_per_arm', [1, 5])
+def test_one_polyline_per_member_for_every_layout(name, elements_per_arm):
+    nodes, deformed, _, _, elements, _ = fd.analyze_layout(name, 0.3, 20.0, fd.youngs_modulus,
+                                                           fd.moment_of_inertia,
+                                                           elements_per_arm=elements_per_arm)
+    members, _ = layout_elements(name)
+    renderer = render(nodes[:, :2], elements, deformed[:, :2])
+    drawn = renderer.original.get_segments()
+    assert len(drawn) == len(renderer.deformed.get_segments()) == len(members)
+    # Every element is one stroke of a polyline
+    assert sum(len(line) - 1 for line in drawn) == len(elements)
+    # Markers only on hub, arm tips and motors, not on interior mesh points
+    n_generated = len(np.unique(members))
+    assert len(renderer.original_nodes.get_xdata()) == n_generated
+
+def test_x_frame_matches_plot_frame_layout():
+    nodes, deformed, _, _ = fd.analyze_frame('X-frame', 0.4, 0.1, 20.0, fd.youngs_modulus,
+                                             fd.moment_of_inertia)
+    renderer = render(nodes, fd.ELEMENT_CONNECTIVITY, deformed)
+    assert len(renderer.original.get_segments()) == 4
+    np.testing.assert_array_equal(renderer.original_nodes.get_xdata(), nodes[:, 0])
+
+def test_update_moves_only_the_deformed_layers():
+    nodes, elements = frame_fem.refine_mesh(np.array([[0.0, 0.0], [1.0, 0.0]]), np.array([[0, 1]]), 10)
+    renderer = render(nodes, elements)
+    moved = nodes + [0.0, 0.1]
+    renderer.update(moved)
+    np.testing.assert_allclose(renderer.deformed.get_segments()[0][:, 1], 0.1)
+    np.testing.assert_allclose(renderer.original.get_segments()[0][:, 1], 0.0)
+    np.testing.assert_array_equal(renderer.deformed_nodes.get_ydata(), [0.1, 0.1])
+
+def test_chains_and_structural_nodes():
+    elements = np.array([[0, 1], [1, 2], [2, 3], [0, 4], [4, 5], [0, 6]])
+    chains = element_chains(elements)
+    assert [chain.tolist() for chain in chains] == [[0, 1, 2, 3], [0, 4, 5], [0, 6]]
+    assert structural_nodes(elements, 7).tolist() == [0, 3, 5, 6]
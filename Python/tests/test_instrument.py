@@ -0,0 +1,39 @@
+import threading
+
+import numpy as np
+
+from instrument import Profiler
+
+def test_spans_record_calls_and_nesting():
+    profiler = Profiler(enabled=True, trace_memory=False)
+    for _ in range(3):
+        with profiler.span('outer'):
+            with profiler.span('inner'):
+                pass
+    assert profiler.stats['outer']['calls'] == profiler.stats['inner']['calls'] == 3
+    assert profiler.stats['outer']['seconds'] >= profiler.stats['inner']['seconds']
+    assert len(profiler.events) == 6
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.span('idle'):
+        pass
+    assert profiler.stats == {} and profiler.events == []
+
+def test_worker_spans_keep_the_main_thread_peak():
+    profiler = Profiler(enabled=True)
+    try:
+        def work():
+            with profiler.span('worker'):
+                pass
+        with profiler.span('main'):
+            block = np.ones(4 << 20, dtype=np.uint8)
+            del block
+            # A worker span must not reset the peak of the span still open here
+            thread = threading.Thread(target=work)
+            thread.start()
+            thread.join()
+    finally:
+        profiler.disable()
+    assert profiler.stats['main']['peak_bytes'] >= 4 << 20
+    assert profiler.stats['worker']['peak_bytes'] == 0
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import nonlinear
+
+L, E, A, I = 1.0, 1e9, 1e-2, 1e-6
+
+@pytest.mark.parametrize('ends', ['pinned', 'fixed'])
+def test_column_linear_buckling_matches_euler(ends):
+    column = nonlinear.column(L, E, A, I, elements=16, ends=ends)
+    (factor,), _ = column.linear_buckling(nonlinear.tip_load(column, [-1, 0]))
+    assert factor == pytest.approx(nonlinear.euler_buckling_load(E, I, L, ends), rel=1e-3)
+
+def test_cantilever_linear_buckling_matches_euler():
+    arm = nonlinear.cantilever(L, E, A, I, elements=16)
+    (factor,), _ = arm.linear_buckling(nonlinear.tip_load(arm, [-1, 0]))
+    assert factor == pytest.approx(nonlinear.euler_buckling_load(E, I, L, 'cantilever'), rel=1e-4)
+
+def test_tension_never_buckles():
+    column = nonlinear.column(L, E, A, I)
+    (factor,), _ = column.linear_buckling(nonlinear.tip_load(column, [1, 0]))
+    assert factor == np.inf
+
+def test_small_load_matches_linear_cantilever():
+    arm = nonlinear.cantilever(L, E, A, I)
+    P = 1e-3 * E * I / L**2
+    displacements, converged = arm.solve(nonlinear.tip_load(arm, [0, P]))
+    assert converged
+    assert displacements[-1, 1] == pytest.approx(P * L**3 / (3 * E * I), rel=1e-3)
+
+@pytest.mark.parametrize('alpha, vertical, horizontal', [(1.0, 0.3017, 0.0564), (2.0, 0.4935, 0.1606)])
+def test_tip_loaded_elastica_matches_bisshopp_drucker(alpha, vertical, horizontal):
+    arm = nonlinear.cantilever(L, E, A, I, elements=32)
+    displacements, converged = arm.solve(nonlinear.tip_load(arm, [0, alpha * E * I / L**2]), steps=4)
+    assert converged
+    assert displacements[-1, 1] / L == pytest.approx(vertical, abs=5e-4)
+    assert -displacements[-1, 0] / L == pytest.approx(horizontal, abs=5e-4)
+
+def test_tangent_matches_finite_differences():
+    arm = nonlinear.cantilever(L, E, A, I, elements=4, angle=20)
+    u = np.random.default_rng(0).normal(scale=1e-2, size=len(arm.free_dofs))
+    _, K = arm._internal(u, tangent=True)
+    K = K.toarray()
+    h = 1e-7
+    numeric = np.empty_like(K)
+    for j in range(len(u)):
+        step = np.zeros_like(u)
+        step[j] = h
+        numeric[:, j] = (arm._internal(u + step)[0] - arm._internal(u - step)[0]) / (2 * h)
+    np.testing.assert_allclose(K, numeric, rtol=1e-5, atol=1e-6 * np.abs(K).max())
+
+def test_warm_sweep_matches_cold_solves_with_fewer_factorizations():
+    arm = nonlinear.cantilever(L, E, A, I)
+    pattern = nonlinear.tip_load(arm, [0, E * I / L**2])
+    factors = np.linspace(0.05, 1.0, 20)
+    sweep = arm.sweep(pattern, factors)
+    warm = arm.stats['factorizations']
+    assert sweep['converged'].all() and sweep['stable'].all() and sweep['critical_factor'] == np.inf
+
+    cold = nonlinear.cantilever(L, E, A, I)
+    for factor, expected in zip(factors, sweep['displacements']):
+        displacements, converged = cold.solve(pattern * factor)
+        assert converged
+        np.testing.assert_allclose(displacements, expected, rtol=1e-6, atol=1e-10)
+    assert warm < cold.stats['factorizations']
+
+def test_sweep_flags_the_buckling_load_of_a_perfect_column():
+    column = nonlinear.column(L, E, A, I, elements=16)
+    critical = nonlinear.euler_buckling_load(E, I, L)
+    factors = np.linspace(0.2, 1.4, 7) * critical
+    sweep = column.sweep(nonlinear.tip_load(column, [-1, 0]), factors, stop_on_failure=False)
+    assert sweep['stable'][factors < critical].all()
+    assert critical <= sweep['critical_factor'] <= factors[factors > critical][0]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from optimizer import crowding_distance, optimize_frame, pareto_front, recommend_design, thin_front
+
+def brute_force_front(objectives):
+    no_worse = np.all(objectives[:, None, :] <= objectives[None, :, :], axis=2)
+    better = np.any(objectives[:, None, :] < objectives[None, :, :], axis=2)
+    dominated = np.any(no_worse & better, axis=0)
+    return np.flatnonzero(~dominated)
+
+@pytest.mark.parametrize('columns', [1, 2, 3, 4])
+@pytest.mark.parametrize('integer', [False, True])
+def test_pareto_front_matches_brute_force(columns, integer):
+    rng = np.random.default_rng(columns)
+    objectives = rng.random((600, columns))
+    if integer:
+        # Coarse values give ties and exact duplicates
+        objectives = np.floor(objectives * 6)
+    np.testing.assert_array_equal(pareto_front(objectives, block=64), brute_force_front(objectives))
+
+def test_thin_front_keeps_extremes_and_is_deterministic():
+    objectives = np.random.default_rng(0).random((500, 3))
+    keep = thin_front(objectives, 50)
+    assert len(keep) == 50
+    np.testing.assert_array_equal(keep, thin_front(objectives, 50))
+    for column in objectives.T:
+        assert np.argmin(column) in keep and np.argmax(column) in keep
+    assert np.all(np.isinf(crowding_distance(objectives)[[np.argmin(objectives[:, 0])]]))
+
+def test_optimized_front_is_feasible_and_non_dominated():
+    front = optimize_frame(population=512, iterations=4, max_front=100, seed=1)
+    assert len(front['mass']) == 100
+    assert np.all(front['safety_factor'] >= 3.0) and np.all(front['max_displacement'] <= 0.005)
+    objectives = np.column_stack([-front['stability_arm'], front['max_displacement'], front['mass']])
+    # Nothing was dropped: the whole returned set is its own front
+    assert len(pareto_front(objectives)) == len(objectives)
+    assert np.all(np.diff(front['mass']) >= 0)
+
+def test_recommendation_is_best_ratio_within_budget():
+    front = optimize_frame(population=512, iterations=4, seed=2)
+    budget = np.median(front['mass'])
+    best = recommend_design(front, budget)
+    ratio = front['stability_arm'] / front['max_displacement']
+    light = front['mass'] <= budget
+    assert light[best] and ratio[best] == ratio[light].max()
+    assert recommend_design(front, 0.0) is None
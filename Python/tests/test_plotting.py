@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from plotting import FigureExporter
+
+def test_inline_by_default_writes_on_save(tmp_path):
+    exporter = FigureExporter('save', tmp_path)
+    fig, ax = exporter.subplots(1, 1, (2, 2))
+    ax.plot([0, 1], [0, 1])
+    exporter.save(fig, 'line.png')
+    assert os.path.getsize(tmp_path / 'line.png') > 0
+    exporter.finish()
+    assert exporter.saved == [os.path.join(tmp_path, 'line.png')]
+
+def test_writer_threads_finish_before_returning(tmp_path):
+    exporter = FigureExporter('save', tmp_path, workers=2)
+    for i in range(3):
+        fig, ax = exporter.subplots(1, 1, (2, 2))
+        ax.bar([0, 1], [i, 1])
+        exporter.save(fig, f'bar{i}.png')
+    exporter.finish()
+    assert sorted(os.listdir(tmp_path)) == ['bar0.png', 'bar1.png', 'bar2.png']
+
+def test_off_mode_draws_nothing(tmp_path):
+    exporter = FigureExporter('off', tmp_path / 'unused')
+    assert exporter.figure((2, 2)) is None and not exporter.enabled
+    assert not (tmp_path / 'unused').exists()
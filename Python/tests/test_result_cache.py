@@ -0,0 +1,40 @@
+import frame_design as fd
+from plotting import FigureExporter
+from result_cache import ResultCache
+
+def run_twice(cache, step, capsys):
+    plots = FigureExporter('off')
+    cache.run('step', step, plots)
+    first = capsys.readouterr().out
+    cache.run('step', step, plots)
+    return first, capsys.readouterr().out
+
+def test_second_run_replays_the_report(tmp_path, capsys):
+    cache = ResultCache(tmp_path, enabled=True)
+    first, second = run_twice(cache, fd.question_1, capsys)
+    assert [status for _, status, _ in cache.log] == ['miss', 'hit']
+    assert second == first and 'Motor Force' in first
+
+def test_changed_constant_misses(tmp_path, capsys, monkeypatch):
+    cache = ResultCache(tmp_path, enabled=True)
+    cache.run('step', fd.question_1, FigureExporter('off'))
+    monkeypatch.setattr(fd, 'motor_force_base', fd.motor_force_base * 2)
+    cache.run('step', fd.question_1, FigureExporter('off'))
+    assert f'{fd.motor_force_base:.1f} N' in capsys.readouterr().out.split('=== QUESTION 1')[-1]
+    assert [status for _, status, _ in cache.log] == ['miss', 'miss']
+    assert len(cache.entries()) == 2
+
+def test_disabled_cache_always_runs_and_writes_nothing(tmp_path, capsys):
+    cache = ResultCache(tmp_path / 'cache')
+    run_twice(cache, fd.question_1, capsys)
+    assert cache.log == [] and not (tmp_path / 'cache').exists()
+
+def test_eviction_keeps_the_newest_entries(tmp_path, capsys, monkeypatch):
+    cache = ResultCache(tmp_path, enabled=True)
+    for force in (10.0, 20.0, 30.0):
+        monkeypatch.setattr(fd, 'motor_force_base', force)
+        cache.run('step', fd.question_1, FigureExporter('off'))
+    entries = sorted(cache.entries(), key=lambda item: item[1]['last_used'])
+    newest = entries[-1][0]
+    cache.evict(entries[-1][1]['bytes'])
+    assert [key for key, _ in cache.entries()] == [newest]
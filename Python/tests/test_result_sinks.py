@@ -0,0 +1,66 @@
+import csv
+
+import numpy as np
+import pytest
+
+import frame_design as fd
+from result_sinks import CsvSink, NpySink, load_npy_results, open_sink
+from sweep import parameter_grid, run_sweep
+
+def grid():
+    return parameter_grid(arm_length=np.linspace(0.2, 0.6, 9), width=[0.05, 0.1],
+                          motor_force=[5.0, 20.0], frame_type=['H-frame'])
+
+def chunks():
+    rng = np.random.default_rng(0)
+    for n in (5, 1, 7):
+        yield {'value': rng.normal(size=n), 'count': rng.integers(0, 100, n),
+               'vector': rng.normal(size=(n, 3))}
+
+def test_npy_sink_round_trip(tmp_path):
+    written = list(chunks())
+    sink = NpySink(str(tmp_path / 'out'))
+    for chunk in written:
+        sink.write(chunk)
+    sink.close()
+    loaded = load_npy_results(str(tmp_path / 'out'))
+    assert sink.rows == 13
+    for name in written[0]:
+        np.testing.assert_array_equal(loaded[name], np.concatenate([chunk[name] for chunk in written]))
+
+def test_npy_sink_rejects_changed_columns(tmp_path):
+    sink = NpySink(str(tmp_path / 'out'))
+    sink.write({'value': np.zeros(3)})
+    with pytest.raises(ValueError):
+        sink.write({'value': np.zeros(3, dtype=np.int32)})
+    sink.close()
+
+def test_csv_sink_round_trip(tmp_path):
+    written = list(chunks())
+    path = str(tmp_path / 'out.csv')
+    sink = CsvSink(path)
+    for chunk in written:
+        sink.write(chunk)
+    sink.close()
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == ['value', 'count', 'vector_0', 'vector_1', 'vector_2']
+    expected = {name: np.concatenate([chunk[name] for chunk in written]) for name in written[0]}
+    np.testing.assert_allclose([float(row['value']) for row in rows], expected['value'], rtol=1e-8)
+    np.testing.assert_array_equal([int(row['count']) for row in rows], expected['count'])
+    vector = [[float(row[f'vector_{j}']) for j in range(3)] for row in rows]
+    np.testing.assert_allclose(vector, expected['vector'], rtol=1e-8)
+
+def test_streamed_sweep_matches_in_memory_sweep(tmp_path):
+    expected = run_sweep(fd.evaluate_frame_designs, grid(), chunk_size=10, workers=1)
+    path = str(tmp_path / 'sweep')
+    n = run_sweep(fd.evaluate_frame_designs, grid(), chunk_size=10, workers=1, sink=open_sink(path))
+    loaded = load_npy_results(path)
+    assert n == len(grid())
+    np.testing.assert_array_equal(loaded['arm_length'], grid().arrays()['arm_length'])
+    for name in expected:
+        np.testing.assert_array_equal(loaded[name], expected[name])
+
+def test_open_sink_picks_format_by_extension(tmp_path):
+    assert isinstance(open_sink(str(tmp_path / 'a.csv')), CsvSink)
+    assert isinstance(open_sink(str(tmp_path / 'a')), NpySink)
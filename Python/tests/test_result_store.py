@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+import frame_design as fd
+from result_store import write_sweep
+from sweep import parameter_grid, run_sweep
+
+@pytest.fixture
+def store(tmp_path):
+    grid = parameter_grid(frame_type=['X-frame', 'H-frame'], arm_length=np.linspace(0.2, 0.6, 5),
+                          width=[0.05, 0.1], motor_force=[10.0, 20.0])
+    return write_sweep(str(tmp_path / 'store'), fd.evaluate_frame_designs, grid, chunk_size=7, workers=1)
+
+def test_columns_reload_as_read_only_memmaps(store):
+    expected = run_sweep(fd.evaluate_frame_designs, parameter_grid(**store.axes), workers=1)
+    assert len(store) == 40
+    column = store['max_displacement']
+    assert isinstance(column, np.memmap) and not column.flags.writeable
+    np.testing.assert_array_equal(column, expected['max_displacement'])
+    assert store.unit('max_displacement') == 'm'
+
+def test_text_columns_are_dictionary_encoded(store):
+    assert store['frame_type'].dtype == np.int32
+    assert sorted(store.labels('frame_type')) == ['H-frame', 'X-frame']
+    np.testing.assert_array_equal(store.select(['frame_type'])['frame_type'],
+                                  np.repeat(['X-frame', 'H-frame'], 20))
+
+def test_axis_queries_match_column_scans(store):
+    rows = store.rows_where(frame_type='H-frame', arm_length=(0.3, 0.5))
+    frame_type = store.decode('frame_type', store['frame_type'])
+    arm_length = np.asarray(store['arm_length'])
+    np.testing.assert_array_equal(rows, np.flatnonzero((frame_type == 'H-frame')
+                                                       & (arm_length >= 0.3) & (arm_length <= 0.5)))
+    selected = store.select(['motor_force', 'safety_factor'], safety_factor=lambda sf: sf > 20)
+    assert np.all(selected['safety_factor'] > 20)
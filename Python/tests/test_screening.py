@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from materials import MATERIALS
+from optimizer import evaluate_designs
+from screening import RANK_KEYS, screen
+from sections import tube_catalogue
+
+ARM_LENGTHS = np.linspace(0.2, 0.6, 9)
+WIDTHS = np.linspace(0.05, 0.25, 5)
+FORCES = (10.0, 40.0)
+
+@pytest.fixture(scope='module')
+def catalogue():
+    return tube_catalogue(np.linspace(0.006, 0.03, 9), np.linspace(0.0004, 0.004, 6))
+
+def brute_force(catalogue, min_safety_factor=3.0, max_displacement=0.005, max_mass=np.inf):
+    """Every material x section x frame x force, evaluated and filtered"""
+    frame_type, material, section, arm_length, width, force = (a.ravel() for a in np.meshgrid(
+        np.array(['X-frame', 'H-frame']), np.arange(len(MATERIALS)), np.arange(len(catalogue)),
+        ARM_LENGTHS, WIDTHS, np.asarray(FORCES), indexing='ij'))
+    designs = {'frame_type': frame_type, 'material': material, 'section': section,
+               'arm_length': arm_length, 'width': width}
+    rows = {name: [] for name in ('mass', 'max_displacement', 'safety_factor', 'stability_arm')}
+    for f in FORCES:
+        at = force == f
+        responses = evaluate_designs({k: v[at] for k, v in designs.items()}, f, catalogue=catalogue)
+        for name in rows:
+            rows[name].append(responses[name])
+    rows = {name: np.concatenate(values) for name, values in rows.items()}
+    feasible = ((rows['safety_factor'] >= min_safety_factor) & (rows['max_displacement'] <= max_displacement)
+                & (rows['mass'] <= max_mass))
+    return {name: values[feasible] for name, values in rows.items()}
+
+class CollectSink:
+    def __init__(self):
+        self.rows = 0
+        self.closed = False
+
+    def write(self, chunk):
+        self.rows += len(chunk['mass'])
+
+    def close(self):
+        self.closed = True
+
+@pytest.mark.parametrize('rank_by', ['mass', 'max_displacement', 'safety_factor', 'stability_arm'])
+def test_top_k_matches_brute_force(catalogue, rank_by):
+    expected = brute_force(catalogue)
+    stats = screen(catalogue, arm_lengths=ARM_LENGTHS, widths=WIDTHS, motor_forces=FORCES, top=25,
+                   rank_by=rank_by)
+    descending = RANK_KEYS[rank_by]
+    best = np.sort(expected[rank_by])[::-1 if descending else 1][:25]
+    np.testing.assert_allclose(stats['top'][rank_by], best, rtol=1e-12)
+    assert stats['combinations'] == 2 * len(MATERIALS) * len(catalogue) * len(ARM_LENGTHS) * len(WIDTHS) * 2
+
+def test_sink_receives_every_feasible_row(catalogue):
+    expected = brute_force(catalogue, max_mass=0.2)
+    sink = CollectSink()
+    stats = screen(catalogue, arm_lengths=ARM_LENGTHS, widths=WIDTHS, motor_forces=FORCES, max_mass=0.2,
+                   sink=sink, pair_chunk=7, row_chunk=100)
+    assert sink.closed and sink.rows == stats['feasible'] == len(expected['mass'])
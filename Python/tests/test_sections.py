@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from sections import SHAPES, SectionCatalogue, section_properties, tube_catalogue
+
+# Textbook values in mm: (shape, dimensions, area, I, c)
+REFERENCE = [
+    ('circular_tube', {'diameter': 20.0, 'thickness': 2.0}, 36 * np.pi, 1476 * np.pi, 10.0),
+    ('circular_tube', {'diameter': 20.0, 'thickness': 10.0}, 100 * np.pi, 2500 * np.pi, 10.0),
+    ('solid_rod', {'diameter': 20.0}, 100 * np.pi, 2500 * np.pi, 10.0),
+    ('rectangular_tube', {'width': 40.0, 'height': 60.0, 'thickness': 5.0}, 900.0, 407_500.0, 30.0),
+    # Parallel axis: 2 (100*10^3/12 + 1000*95^2) + 6*180^3/12
+    ('i_beam', {'width': 100.0, 'height': 200.0, 'flange_thickness': 10.0, 'web_thickness': 6.0},
+     3080.0, 2 * (100 * 10**3 / 12 + 1000 * 95**2) + 6 * 180**3 / 12, 100.0),
+    ('c_channel', {'width': 50.0, 'height': 100.0, 'flange_thickness': 8.0, 'web_thickness': 5.0},
+     2 * 50 * 8 + 84 * 5, 2 * (50 * 8**3 / 12 + 400 * 46**2) + 5 * 84**3 / 12, 50.0),
+    ('flat_plate', {'width': 30.0, 'thickness': 3.0}, 90.0, 67.5, 1.5),
+]
+
+@pytest.mark.parametrize('shape, dims, area, I, c', REFERENCE)
+def test_properties_match_textbook_values(shape, dims, area, I, c):
+    props = section_properties(shape, **dims)
+    assert props.area == pytest.approx(area, rel=1e-12)
+    assert props.I == pytest.approx(I, rel=1e-12)
+    assert props.c == c
+    assert props.section_modulus == pytest.approx(I / c, rel=1e-12)
+
+@pytest.mark.parametrize('shape', SHAPES)
+def test_array_inputs_match_cached_scalars(shape):
+    _, names = SHAPES[shape]
+    rng = np.random.default_rng(len(names))
+    # Outer sizes in [20, 40) and walls in [1, 5) always fit
+    dims = {name: rng.uniform(1, 5, 50) if 'thickness' in name else rng.uniform(20, 40, 50) for name in names}
+    batch = section_properties(shape, **dims)
+    for i in range(50):
+        scalar = section_properties(shape, **{name: values[i] for name, values in dims.items()})
+        np.testing.assert_allclose([column[i] for column in batch], scalar, rtol=1e-14)
+
+@pytest.mark.parametrize('shape, dims', [
+    ('circular_tube', {'diameter': 20.0, 'thickness': 10.5}),
+    ('circular_tube', {'diameter': 20.0, 'thickness': 0.0}),
+    ('circular_tube', {'diameter': np.array([20.0, 10.0]), 'thickness': np.array([2.0, 6.0])}),
+    ('solid_rod', {'diameter': -1.0}),
+    ('rectangular_tube', {'width': 40.0, 'height': 8.0, 'thickness': 5.0}),
+    ('i_beam', {'width': 100.0, 'height': 200.0, 'flange_thickness': 101.0, 'web_thickness': 6.0}),
+    ('c_channel', {'width': 5.0, 'height': 100.0, 'flange_thickness': 8.0, 'web_thickness': 6.0}),
+    ('flat_plate', {'width': 30.0, 'thickness': np.nan}),
+])
+def test_impossible_dimensions_raise(shape, dims):
+    with pytest.raises(ValueError):
+        section_properties(shape, **dims)
+
+def test_unknown_shape_and_wrong_dimensions():
+    with pytest.raises(ValueError):
+        section_properties('z_section', width=1.0)
+    with pytest.raises(TypeError):
+        section_properties('circular_tube', diameter=1.0)
+
+def test_catalogue_gathers_stored_properties():
+    catalogue = tube_catalogue([0.01, 0.02], [0.001, 0.005, 0.01])
+    assert catalogue.names == ['tube 10x1', 'tube 20x1', 'tube 20x5']
+    props = catalogue.properties([2, 0])
+    assert props.I[0] == section_properties('circular_tube', diameter=0.02, thickness=0.005).I
+    with pytest.raises(ValueError):
+        SectionCatalogue().add('bad', 'circular_tube', diameter=0.01, thickness=0.006)
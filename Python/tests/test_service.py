@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from service import AnalysisService, Endpoint, MicroBatcher, Overloaded
+
+class Kernel:
+    """Stub batch function: doubles x and records every call's batch size"""
+
+    def __init__(self, fail_below=None):
+        self.calls = []
+        self.fail_below = fail_below
+
+    def __call__(self, params):
+        self.calls.append(len(params['x']))
+        if self.fail_below is not None and np.any(params['x'] < self.fail_below):
+            raise ValueError('x out of range')
+        return {'y': 2 * params['x']}
+
+def request(*values):
+    return {'x': np.array(values, dtype=float)}
+
+async def gather(batcher, requests):
+    batcher.start()
+    try:
+        return await asyncio.gather(*(batcher.submit(r) for r in requests), return_exceptions=True)
+    finally:
+        await batcher.stop()
+
+def test_concurrent_requests_share_one_kernel_call():
+    kernel = Kernel()
+    batcher = MicroBatcher(Endpoint(kernel, ('x',), {}), window=0.05)
+    requests = [request(i, i + 0.5) for i in range(10)]
+    results = asyncio.run(gather(batcher, requests))
+    assert kernel.calls == [20] and batcher.batches == 1 and batcher.batched_points == 20
+    for params, result in zip(requests, results):
+        np.testing.assert_array_equal(result['y'], 2 * params['x'])
+
+def test_batches_close_at_max_batch_points():
+    kernel = Kernel()
+    batcher = MicroBatcher(Endpoint(kernel, ('x',), {}), window=0.05, max_batch=4)
+    results = asyncio.run(gather(batcher, [request(i) for i in range(10)]))
+    assert kernel.calls == [4, 4, 2]
+    assert [float(r['y'][0]) for r in results] == [2.0 * i for i in range(10)]
+
+def test_full_queue_raises_overloaded():
+    async def scenario():
+        batcher = MicroBatcher(Endpoint(Kernel(), ('x',), {}), max_queue=2)
+        # Not started, so nothing drains the queue
+        waiting = [asyncio.create_task(batcher.submit(request(i))) for i in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded):
+            await batcher.submit(request(3))
+        batcher.start()
+        try:
+            return await asyncio.gather(*waiting)
+        finally:
+            await batcher.stop()
+    results = asyncio.run(scenario())
+    assert [float(r['y'][0]) for r in results] == [0.0, 2.0]
+
+def test_failed_batch_is_retried_per_request():
+    kernel = Kernel(fail_below=0)
+    batcher = MicroBatcher(Endpoint(kernel, ('x',), {}), window=0.05)
+    results = asyncio.run(gather(batcher, [request(1, 2), request(-1), request(3)]))
+    # One batched attempt, then one call per request
+    assert kernel.calls == [4, 2, 1, 1]
+    np.testing.assert_array_equal(results[0]['y'], [2, 4])
+    assert isinstance(results[1], ValueError)
+    np.testing.assert_array_equal(results[2]['y'], [6])
+
+def test_unsliceable_output_fails_the_batch_and_keeps_serving():
+    calls = []
+
+    def kernel(params):
+        calls.append(len(params['x']))
+        return {'y': 1.0} if len(calls) == 1 else {'y': params['x']}
+
+    async def scenario():
+        batcher = MicroBatcher(Endpoint(kernel, ('x',), {}), window=0.01)
+        batcher.start()
+        try:
+            first = await asyncio.gather(batcher.submit(request(1)), return_exceptions=True)
+            second = await batcher.submit(request(5))
+        finally:
+            await batcher.stop()
+        return first[0], second
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, Exception)
+    np.testing.assert_array_equal(second['y'], [5])
+
+async def exchange(raw):
+    """Send raw bytes to a fresh service and return (status, JSON body)"""
+    service = AnalysisService(window=0.001)
+    server = await service.start('127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    finally:
+        await service.stop()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+def test_frame_request_round_trip():
+    body = json.dumps({'frame_type': 'X-frame', 'arm_length': 0.4, 'width': 0.1, 'motor_force': 20}).encode()
+    status, payload = asyncio.run(exchange(
+        b'POST /frame HTTP/1.1\r\nConnection: close\r\nContent-Length: %d\r\n\r\n' % len(body) + body))
+    assert status == 200 and payload['max_displacement'] > 0
+
+@pytest.mark.parametrize('raw, status', [
+    (b'GARBAGE\r\n\r\n', 400),
+    (b'POST /frame HTTP/1.1\r\nContent-Length: ten\r\n\r\n', 400),
+    (b'POST /frame HTTP/1.1\r\nContent-Length: -4\r\n\r\n', 400),
+    (b'POST /frame HTTP/1.1\r\nno colon here\r\n\r\n', 400),
+    (b'POST /frame HTTP/1.1\r\nContent-Length: 999999999999\r\n\r\n', 413),
+    (b'POST /frame HTTP/1.1\r\nConnection: close\r\nContent-Length: 5\r\n\r\n{bad}', 400),
+])
+def test_malformed_requests_get_an_error_response(raw, status):
+    got, payload = asyncio.run(exchange(raw))
+    assert got == status and 'error' in payload
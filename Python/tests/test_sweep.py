@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import frame_design as fd
+from sweep import chunk_bounds, iter_sweep, parameter_grid, parameter_list, run_sweep
+
+def grid():
+    return parameter_grid(frame_type=['X-frame', 'H-frame'], arm_length=np.linspace(0.2, 0.6, 7),
+                          width=[0.05, 0.1, 0.25], motor_force=[5.0, 20.0, 60.0])
+
+def test_grid_points_follow_nested_loops():
+    points = parameter_grid(a=[1, 2], b=[10, 20, 30])
+    chunk = points.arrays()
+    assert list(zip(chunk['a'], chunk['b'])) == [(a, b) for a in [1, 2] for b in [10, 20, 30]]
+    np.testing.assert_array_equal(points.chunk(2, 5)['b'], [30, 10, 20])
+
+def test_chunk_bounds_cover_every_point_once():
+    bounds = chunk_bounds(10, 4)
+    assert bounds == [(0, 4), (4, 8), (8, 10)]
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1000])
+def test_single_worker_matches_direct_evaluation(chunk_size):
+    points = grid()
+    expected = fd.evaluate_frame_designs(points.arrays())
+    result = run_sweep(fd.evaluate_frame_designs, points, chunk_size=chunk_size, workers=1)
+    assert set(result) == set(expected)
+    for name in expected:
+        np.testing.assert_array_equal(result[name], expected[name])
+
+def test_worker_pool_matches_single_worker():
+    points = grid()
+    serial = run_sweep(fd.evaluate_frame_designs, points, chunk_size=5, workers=1)
+    parallel = run_sweep(fd.evaluate_frame_designs, points, chunk_size=5, workers=3)
+    for name in serial:
+        np.testing.assert_array_equal(parallel[name], serial[name])
+
+def test_parameter_list_matches_grid():
+    points = grid()
+    arrays = points.arrays()
+    listed = parameter_list(list(zip(*arrays.values())), list(arrays))
+    by_grid = run_sweep(fd.evaluate_frame_designs, points, chunk_size=11, workers=1)
+    by_list = run_sweep(fd.evaluate_frame_designs, listed, chunk_size=11, workers=2)
+    for name in by_grid:
+        np.testing.assert_array_equal(by_list[name], by_grid[name])
+
+def test_iter_sweep_yields_chunks_in_order():
+    chunks = list(iter_sweep(fd.evaluate_frame_designs, grid(), chunk_size=13, workers=2))
+    starts = [start for start, _, _ in chunks]
+    assert starts == sorted(starts) and chunks[-1][1] == len(grid())
+    assert all(len(result['max_displacement']) == stop - start for start, stop, result in chunks)
@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import pytest
+
+import uncertainty
+
+def test_running_stats_match_numpy_over_batches():
+    values = np.random.default_rng(0).lognormal(size=10_001)
+    stats = uncertainty.RunningStats()
+    for batch in np.array_split(values, 7):
+        stats.update(batch)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert stats.variance == pytest.approx(values.var(ddof=1), rel=1e-10)
+    assert (stats.min, stats.max) == (values.min(), values.max())
+
+def test_digest_quantiles_match_exact_quantiles():
+    values = np.random.default_rng(1).normal(size=200_000)
+    digest = uncertainty.QuantileDigest(compression=1000)
+    for batch in np.array_split(values, 20):
+        digest.update(batch)
+    q = np.array([0.001, 0.01, 0.05, 0.5, 0.95, 0.99, 0.999])
+    # Rank error, which the arcsine scale keeps small at the tails
+    ranks = np.searchsorted(np.sort(values), digest.quantile(q)) / len(values)
+    np.testing.assert_allclose(ranks, q, atol=2e-3, rtol=0.05)
+    assert digest.count == len(values)
+
+@pytest.mark.parametrize('mean, std, lower', [(0.0, 1.0, 0.0), (0.0, 1.0, -1.0), (0.0, 1.0, 2.5)])
+def test_truncated_normal_follows_the_truncated_distribution(mean, std, lower):
+    values = uncertainty.Normal(mean, std, lower).sample(np.random.default_rng(2), 400_000)
+    alpha = (lower - mean) / std
+    tail = 0.5 * math.erfc(alpha / math.sqrt(2))
+    expected_mean = mean + std * math.exp(-alpha**2 / 2) / math.sqrt(2 * math.pi) / tail
+    assert values.min() >= lower
+    # No probability mass piled up on the bound
+    assert np.count_nonzero(values == lower) == 0
+    assert values.mean() == pytest.approx(expected_mean, abs=5e-3)
+
+def test_monte_carlo_is_reproducible():
+    def model(params):
+        return {'y': params['x'] ** 2}
+    inputs = {'x': uncertainty.Uniform(0.0, 1.0)}
+    first = uncertainty.monte_carlo(model, inputs, 50_000, batch_size=10_000, seed=3,
+                                    failure=lambda p, o: o['y'] > 0.81)
+    second = uncertainty.monte_carlo(model, inputs, 50_000, batch_size=10_000, seed=3,
+                                     failure=lambda p, o: o['y'] > 0.81)
+    assert first == second
+    assert first['outputs']['y']['mean'] == pytest.approx(1 / 3, abs=5e-3)
+    assert first['failure_probability'] == pytest.approx(0.1, abs=5e-3)
+
+@pytest.mark.parametrize('samples, batch_size', [(0, 100), (-5, 100), (100, 0)])
+def test_monte_carlo_rejects_empty_runs(samples, batch_size):
+    with pytest.raises(ValueError):
+        uncertainty.monte_carlo(lambda p: {'y': p['x']}, {'x': uncertainty.Uniform(0.0, 1.0)}, samples,
+                                batch_size=batch_size)
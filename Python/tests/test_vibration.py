@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import vibration
+
+L, E, I, density, area = 0.5, 70e9, 2e-9, 1600.0, 1e-4
+STATIC = 20.0 * L**3 / (3 * E * I)
+
+def test_first_frequency_matches_euler_bernoulli_cantilever():
+    frequencies, _ = vibration.arm_modes(L, E, I, density, area)
+    expected = 1.8751**2 / (2 * np.pi) * np.sqrt(E * I / (density * area * L**4))
+    assert frequencies[0, 0] == pytest.approx(expected, rel=1e-4)
+
+def test_tip_mass_lowers_the_frequency():
+    bare, _ = vibration.arm_modes(L, E, I, density, area)
+    loaded, _ = vibration.arm_modes(L, E, I, density, area, tip_mass=0.1)
+    assert loaded[0, 0] < bare[0, 0]
+
+def test_static_start_holds_the_static_deflection_throughout():
+    thrust = np.full(200, 20.0)
+    result = vibration.simulate_arms(L, E, I, density, area, thrust, dt=1e-4, return_history=True)
+    np.testing.assert_allclose(result['tip_deflection'][0], STATIC, rtol=1e-3)
+
+def test_undamped_step_load_doubles_the_static_deflection():
+    # Newmark average acceleration keeps an undamped step response at 2x static
+    frequencies, _ = vibration.arm_modes(L, E, I, density, area)
+    dt = 1 / (frequencies[0, 0] * 200)
+    thrust = np.full(400, 20.0)
+    thrust[0] = 0.0
+    result = vibration.simulate_arms(L, E, I, density, area, thrust, dt, damping_ratio=0.0, n_modes=1)
+    # One mode carries most but not all of the static deflection
+    static = vibration.simulate_arms(L, E, I, density, area, thrust[1:], dt, n_modes=1, return_history=True)
+    assert static['tip_deflection'][0, 0] == pytest.approx(STATIC, rel=0.05)
+    assert result['peak_deflection'][0] == pytest.approx(2 * static['tip_deflection'][0, 0], rel=2e-3)
+
+def test_batch_matches_single_arms():
+    thrust = 20 + 5 * np.sin(np.linspace(0, 40, 500))
+    lengths = np.array([0.3, 0.5])
+    batch = vibration.simulate_arms(lengths, E, I, density, area, thrust, dt=1e-4)
+    for i, length in enumerate(lengths):
+        single = vibration.simulate_arms(length, E, I, density, area, thrust, dt=1e-4)
+        assert batch['peak_deflection'][i] == pytest.approx(single['peak_deflection'][0], rel=1e-12)
@@ -0,0 +1,248 @@
+"""
+Monte Carlo uncertainty propagation with streaming statistics
+Inputs are drawn from distributions in fixed-size vectorized batches; each
+output is folded into running moments and a quantile digest, so memory
+stays constant however many samples are drawn
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from instrument import profiled
+
+class Normal:
+    """Normal distribution, optionally truncated below at `lower`
+
+    Draws below the bound are rejected and redrawn, so the tail keeps the
+    truncated normal's shape instead of piling up at `lower`.
+    """
+
+    def __init__(self, mean, std, lower=None):
+        self.mean, self.std, self.lower = mean, std, lower
+
+    def sample(self, rng, n):
+        if self.lower is None or self.std == 0:
+            return rng.normal(self.mean, self.std, n)
+        alpha = (self.lower - self.mean) / self.std
+        values = np.empty(n)
+        filled = 0
+        while filled < n:
+            need = n - filled
+            if alpha <= 0:
+                # At least half of the draws are accepted
+                z = rng.standard_normal(need)
+                z = z[z >= alpha]
+            else:
+                # Bound in the upper tail: exponential proposal (Robert, 1995)
+                rate = (alpha + np.sqrt(alpha**2 + 4)) / 2
+                z = alpha + rng.exponential(1 / rate, need)
+                z = z[rng.random(need) <= np.exp(-(z - rate)**2 / 2)]
+            values[filled:filled + len(z)] = z
+            filled += len(z)
+        return self.mean + self.std * values
+
+class LogNormal:
+    """Log-normal distribution given its median and coefficient of variation
+
+    A positive, right-skewed spread suited to stiffness and strength scatter.
+    """
+
+    def __init__(self, median, cov):
+        self.median, self.cov = median, cov
+        self.sigma = np.sqrt(np.log1p(cov**2))
+
+    def sample(self, rng, n):
+        return self.median * np.exp(rng.normal(0.0, self.sigma, n))
+
+class Uniform:
+    def __init__(self, low, high):
+        self.low, self.high = low, high
+
+    def sample(self, rng, n):
+        return rng.uniform(self.low, self.high, n)
+
+def normal_cov(mean, cov):
+    """Normal distribution from a coefficient of variation, truncated at zero"""
+    return Normal(mean, abs(mean) * cov, lower=0.0)
+
+def draw(inputs, rng, n):
+    """Sample a batch: distributions are drawn, anything else is passed through as fixed"""
+    return {name: spec.sample(rng, n) if hasattr(spec, 'sample') else spec
+            for name, spec in inputs.items()}
+
+class RunningStats:
+    """Count, mean, variance, min and max merged batch by batch (Chan/Welford)"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = values.mean()
+        batch_m2 = np.sum((values - batch_mean)**2)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta**2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+class QuantileDigest:
+    """Merging t-digest: weighted centroids, dense at the tails
+
+    Each update sorts the batch together with the current centroids and
+    merges neighbours whose cumulative weight falls in the same unit of the
+    arcsine scale function, so about compression/2 centroids are kept and
+    extreme quantiles stay sharp.
+    """
+
+    def __init__(self, compression=1000):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return self.weights.sum()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values))])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        group = np.floor(k - k[0]).astype(np.intp)
+        starts = np.flatnonzero(np.diff(group, prepend=-1))
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """Interpolated quantile(s) for q in [0, 1]"""
+        q = np.asarray(q, dtype=float)
+        if len(self.weights) == 0:
+            return np.full(q.shape, np.nan)
+        cumulative = np.cumsum(self.weights)
+        centres = (cumulative - self.weights / 2) / cumulative[-1]
+        # The exact extremes anchor the ends of the interpolation
+        positions = np.concatenate([[0.0], centres, [1.0]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(q, positions, values)
+
+class OutputStats:
+    """Streaming summary of one Monte Carlo output"""
+
+    def __init__(self, compression=1000):
+        self.moments = RunningStats()
+        self.digest = QuantileDigest(compression)
+
+    def update(self, values):
+        self.moments.update(values)
+        self.digest.update(values)
+
+    def summary(self, quantiles):
+        return {
+            'mean': self.moments.mean, 'std': self.moments.std,
+            'min': self.moments.min, 'max': self.moments.max,
+            'quantiles': dict(zip(quantiles, self.digest.quantile(quantiles).tolist())),
+        }
+
+@profiled()
+def monte_carlo(model, inputs, samples, failure=None, batch_size=500_000, seed=0,
+                quantiles=(0.01, 0.05, 0.5, 0.95, 0.99), compression=1000):
+    """Propagate input distributions through a vectorized model
+
+    inputs maps parameter names to distributions (anything with
+    sample(rng, n)) or fixed values; model takes a batch dict and returns a
+    dict of output arrays, like the sweep kernels. failure(params, outputs)
+    returns a boolean mask of failed samples. Each batch has its own child
+    seed, so a seeded run gives the same numbers every time. Returns a dict
+    with the sample count, a summary per output and, with a failure
+    criterion, the failure probability and its standard error.
+    """
+    if samples <= 0:
+        raise ValueError(f'samples must be positive, got {samples}')
+    if batch_size <= 0:
+        raise ValueError(f'batch_size must be positive, got {batch_size}')
+    batches = -(-samples // batch_size)
+    stats = {}
+    failures = 0
+    for index, child in enumerate(np.random.SeedSequence(seed).spawn(batches)):
+        n = min(batch_size, samples - index * batch_size)
+        params = draw(inputs, np.random.default_rng(child), n)
+        outputs = model(params)
+        for name, values in outputs.items():
+            stats.setdefault(name, OutputStats(compression)).update(np.broadcast_to(values, (n,)))
+        if failure is not None:
+            failures += int(np.count_nonzero(failure(params, outputs)))
+
+    result = {'samples': samples,
+              'outputs': {name: s.summary(quantiles) for name, s in stats.items()}}
+    if failure is not None:
+        p = failures / samples
+        result['failures'] = failures
+        result['failure_probability'] = p
+        result['failure_std_error'] = np.sqrt(p * (1 - p) / samples)
+    return result
+
+def format_summary(result, scales=None, units=None):
+    """Text table of a monte_carlo result; scales/units rescale outputs for display"""
+    scales, units = scales or {}, units or {}
+    quantiles = next(iter(result['outputs'].values()))['quantiles']
+    header = f'  {"output":20s} {"mean":>12s} {"std":>12s}' + ''.join(
+        f' {f"p{q*100:g}":>12s}' for q in quantiles)
+    lines = [header]
+    for name, s in result['outputs'].items():
+        scale = scales.get(name, 1.0)
+        row = f'  {name + units.get(name, ""):20s} {s["mean"]*scale:12.4g} {s["std"]*scale:12.4g}'
+        row += ''.join(f' {value*scale:12.4g}' for value in s['quantiles'].values())
+        lines.append(row)
+    if 'failure_probability' in result:
+        lines.append(f'  Failure probability: {result["failure_probability"]:.3e} '
+                     f'(± {result["failure_std_error"]:.1e}, {result["failures"]} of {result["samples"]:,})')
+    return '\n'.join(lines)
+
+def arguments():
+    """Parent parser of the --monte-carlo / --mc-seed flags
+
+    IPS_MONTE_CARLO sets the sample count without a flag.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    group = parser.add_argument_group('Monte Carlo')
+    group.add_argument('--monte-carlo', type=lambda s: int(float(s)), metavar='SAMPLES',
+                       default=int(float(os.environ.get('IPS_MONTE_CARLO', 0))),
+                       help='propagate property and dimension scatter with this many samples')
+    group.add_argument('--mc-seed', type=int, default=0, help='Monte Carlo random seed')
+    return parser
+
+def configure(args):
+    """(samples, seed) from flags parsed with arguments(); samples is 0 when the mode is off"""
+    return args.monte_carlo, args.mc_seed
@@ -0,0 +1,149 @@
+"""
+Time-domain vibration of frame arms under varying motor thrust
+Each arm is a cantilever of Euler-Bernoulli beam elements with mass from
+the material density and EI from the section, carrying the motor at its
+tip. Thousands of arms and thrust histories are integrated together with a
+fixed-step Newmark scheme over state arrays shaped (batch, modes)
+"""
+
+import numpy as np
+
+import frame_design
+from instrument import profiled
+
+def _element_matrices():
+    """Beam element stiffness and consistent mass for DOFs [w1, θ1*h, w2, θ2*h]
+
+    With rotations scaled by the element length h, an element of stiffness
+    EI and mass per length m is EI/h^3 * K and m*h * M.
+    """
+    K = np.array([[12, 6, -12, 6],
+                  [6, 4, -6, 2],
+                  [-12, -6, 12, -6],
+                  [6, 2, -6, 4]], dtype=float)
+    M = np.array([[156, 22, 54, -13],
+                  [22, 4, 13, -3],
+                  [54, 13, 156, -22],
+                  [-13, -3, -22, 4]], dtype=float) / 420
+    return K, M
+
+def cantilever_matrices(elements):
+    """Normalized stiffness and mass of a clamped arm, root DOFs removed
+
+    Returns (K, M) of shape (2*elements, 2*elements); the last-but-one DOF
+    is the tip deflection.
+    """
+    k, m = _element_matrices()
+    n = 2 * (elements + 1)
+    K = np.zeros((n, n))
+    M = np.zeros((n, n))
+    for e in range(elements):
+        dofs = slice(2 * e, 2 * e + 4)
+        K[dofs, dofs] += k
+        M[dofs, dofs] += m
+    return K[2:, 2:], M[2:, 2:]
+
+@profiled()
+def arm_modes(length, E, I, density, area, tip_mass=0.0, elements=8, n_modes=4):
+    """Natural frequencies (Hz) and mass-normalized tip participation of arms
+
+    Arguments broadcast to a batch of arms. Returns (frequencies, tip) both
+    shaped (batch, n_modes): tip[:, i] is mode i's tip deflection, which is
+    also the modal force of a unit tip load.
+    """
+    length, E, I, density, area, tip_mass = (
+        a.ravel() for a in np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                                 for v in (length, E, I, density, area, tip_mass))))
+    h = length / elements
+    K_unit, M_unit = cantilever_matrices(elements)
+    stiffness = E * I / h**3
+    mass = density * area * h
+    tip_dof = K_unit.shape[0] - 2
+    # Scale to mass units of the beam so a point mass is a ratio on the tip DOF
+    M = np.broadcast_to(M_unit, (len(length),) + M_unit.shape).copy()
+    M[:, tip_dof, tip_dof] += tip_mass / mass
+    # Generalized eigenproblem K φ = λ M φ through the Cholesky factor of M
+    L = np.linalg.cholesky(M)
+    L_inv = np.linalg.inv(L)
+    A = L_inv @ K_unit @ np.swapaxes(L_inv, -1, -2)
+    eigenvalues, vectors = np.linalg.eigh(A)
+    modes = np.swapaxes(L_inv, -1, -2) @ vectors[..., :n_modes]
+    omega = np.sqrt(eigenvalues[:, :n_modes] * (stiffness / mass)[:, None])
+    # Back to physical units: φ_phys = φ / sqrt(m h)
+    tip = modes[:, tip_dof, :] / np.sqrt(mass)[:, None]
+    return omega / (2 * np.pi), tip
+
+@profiled()
+def simulate_arms(length, E, I, density, area, thrust, dt, tip_mass=0.0, damping_ratio=0.02,
+                  elements=8, n_modes=4, start='static', return_history=False):
+    """Tip deflection of a batch of arms driven by thrust histories
+
+    thrust is (steps,) for one history shared by every arm or (batch, steps);
+    the other arguments broadcast to the batch. Modal coordinates are
+    integrated with the average-acceleration Newmark scheme, which is
+    unconditionally stable at any fixed step dt. With start='static' the
+    arms begin at rest in their deflected shape under the first thrust
+    sample, otherwise undeflected. Deflection is positive in the thrust
+    direction, like analyze_frame. Returns a dict with 'peak_deflection',
+    'rms_deflection', 'natural_frequencies' (batch, n_modes) and, with
+    return_history, 'tip_deflection' (batch, steps).
+    """
+    frequencies, tip = arm_modes(length, E, I, density, area, tip_mass, elements, n_modes)
+    thrust = np.asarray(thrust, dtype=float)
+    thrust = np.broadcast_to(thrust, (len(tip),) + thrust.shape[-1:]) if thrust.ndim == 1 else thrust
+    if thrust.shape[0] != len(tip):
+        raise ValueError(f'thrust has {thrust.shape[0]} histories for {len(tip)} arms')
+    steps = thrust.shape[1]
+
+    omega = 2 * np.pi * frequencies
+    damping = 2 * np.asarray(damping_ratio) * omega
+    stiffness = omega**2
+    # Average acceleration: beta = 1/4, gamma = 1/2
+    a0, a1 = 4 / dt**2, 2 / dt
+    effective = stiffness + a1 * damping + a0
+
+    force = thrust[:, 0, None] * tip
+    q = force / stiffness if start == 'static' else np.zeros_like(tip)
+    v = np.zeros_like(q)
+    a = force - damping * v - stiffness * q
+
+    deflection = np.einsum('bm,bm->b', tip, q)
+    peak = np.abs(deflection)
+    square_sum = deflection**2
+    history = np.empty((len(tip), steps)) if return_history else None
+    if return_history:
+        history[:, 0] = deflection
+    for n in range(1, steps):
+        force = thrust[:, n, None] * tip
+        q_new = (force + damping * (a1 * q + v) + a0 * q + (4 / dt) * v + a) / effective
+        v_new = a1 * (q_new - q) - v
+        a = a0 * (q_new - q) - (4 / dt) * v - a
+        q, v = q_new, v_new
+        deflection = np.einsum('bm,bm->b', tip, q)
+        np.maximum(peak, np.abs(deflection), out=peak)
+        square_sum += deflection**2
+        if return_history:
+            history[:, n] = deflection
+
+    result = {
+        'peak_deflection': peak,
+        'rms_deflection': np.sqrt(square_sum / steps),
+        'natural_frequencies': frequencies,
+    }
+    if return_history:
+        result['tip_deflection'] = history
+    return result
+
+def simulate_frames(frame_type, arm_length, width, thrust, dt, E=frame_design.youngs_modulus,
+                    I=frame_design.moment_of_inertia, density=None, area=frame_design.cross_section_area,
+                    **kwargs):
+    """simulate_arms for whole frames: arm lengths follow the frame geometry
+
+    frame_type, arm_length and width describe a batch of frames as in
+    analyze_frame_batch; every arm of a frame sees the same thrust, so one
+    arm per frame is simulated. density defaults to the base frame material.
+    """
+    if density is None:
+        density = frame_design.MATERIALS[frame_design.frame_material]['density']
+    _, _, _, arm_lengths = frame_design.analyze_frame_batch(frame_type, arm_length, width, 0.0, 1.0, 1.0)
+    return simulate_arms(np.ravel(arm_lengths[..., 0]), E, I, density, area, thrust, dt, **kwargs)